@@ -16,9 +16,12 @@ ntf-db-export-error =
     <blockquote>{ $error }</blockquote>
 ntf-db-save-success = <i>✅ Datenbank-Backup erfolgreich gespeichert!</i>
 ntf-db-save-failed = <i>❌ Fehler beim Speichern des Datenbank-Backups.</i>
+ntf-db-save-started = <i>💾 Datenbank-Backup wird erstellt...</i>
+ntf-db-save-progress = <i>💾 Datenbank-Backup wird erstellt... { $size } MB</i>
 ntf-db-convert-success = <i>✅ Datei wurde konvertiert!</i>
 ntf-db-convert-in-progress = ⚠️ Konvertierung zu SQL...
 ntf-db-convert-in-progress = <i>⚠️ Konvertierung in SQL</i>
+ntf-db-convert-progress = <i>⚠️ Konvertierung in SQL... { $percent }%</i>
 ntf-db-restore-success =
     <i>✅ Database successfully restored from uploaded dump.</i>
 
@@ -38,7 +41,9 @@ ntf-db-sync-stats-errors = Fehler: { $errors }
 ntf-db-sync-error = ❌ Synchronisierungsfehler: { $error }
 ntf-db-import-started = <i>⚠️ Datenbankimport läuft. Bitte warten...</i>
 ntf-db-import-failed = <i>❌ Error importing database.</i>
+ntf-db-import-success = <i>✅ Datenbankimport abgeschlossen! Importierte Zeilen: { $rows }</i>
 ntf-db-restore-preparing = <i>🔄 Preparing for data restore...</i>
+ntf-db-restore-progress = <i>🔄 Datenbank wird wiederhergestellt... { $percent }%</i>
 
 # Database Clear
 ntf-db-clear-all-warning = 
@@ -676,6 +681,9 @@ ntf-plan-no-user-found = <i>❌ User not found.</i>
 ntf-plan-user-already-allowed = <i>❌ User already added to allowed list.</i>
 ntf-plan-confirm-delete = <i>⚠️ Press again to delete.</i>
 ntf-plan-updated-success = <i>✅ Plan updated successfully.</i>
+ntf-plan-sync-started = <i>🔄 Plan wird auf { $total } Abonnements übertragen...</i>
+ntf-plan-sync-progress = <i>🔄 Plan wird übertragen... { $processed }/{ $total }</i>
+ntf-plan-sync-completed = <i>✅ Plan auf Abonnements übertragen. Synchronisiert: { $synced }, Fehler: { $failed }</i>
 ntf-plan-created-success = <i>✅ Plan created successfully.</i>
 ntf-plan-deleted-success = <i>✅ Plan deleted successfully.</i>
 ntf-plan-tag-updated = <i>✅ Plan tag updated.</i>
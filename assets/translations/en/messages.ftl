@@ -921,9 +921,18 @@ msg-statistics-promocodes =
 
 msg-statistics-referrals =
     <b>👪 Referral System Statistics</b>
-    
+
+    <blockquote>
+    • <b>Total referrals</b>: { $total_referrals }
+    • <b>Level 1 referrals</b>: { $first_level_referrals }
+    • <b>Level 2 referrals</b>: { $second_level_referrals }
+    • <b>Inviting users</b>: { $total_referrers }
+    </blockquote>
+
     <blockquote>
-    • <b></b>:
+    • <b>Bonuses issued</b>: { $issued_money_rewards }
+    • <b>Days issued</b>: { $issued_days_rewards }
+    • <b>Bonuses pending</b>: { $pending_money_rewards }
     </blockquote>
 
 msg-statistics-transactions-gateway =
@@ -16,9 +16,12 @@ ntf-db-export-error =
     <blockquote>{ $error }</blockquote>
 ntf-db-save-success = <i>✅ Database backup saved successfully!</i>
 ntf-db-save-failed = <i>❌ Error saving database backup.</i>
+ntf-db-save-started = <i>💾 Creating database backup...</i>
+ntf-db-save-progress = <i>💾 Creating database backup... { $size } MB</i>
 ntf-db-convert-success = <i>✅ File was converted!</i>
 ntf-db-convert-in-progress = ⚠️ Converting to SQL...
 ntf-db-convert-in-progress = <i>⚠️ Converting to SQL</i>
+ntf-db-convert-progress = <i>⚠️ Converting to SQL... { $percent }%</i>
 ntf-db-restore-success =
     <i>✅ Database successfully restored from uploaded dump.</i>
 
@@ -38,7 +41,9 @@ ntf-db-sync-stats-errors = Errors: { $errors }
 ntf-db-sync-error = ❌ Sync error: { $error }
 ntf-db-import-started = <i>⚠️ Database import in progress. Please wait...</i>
 ntf-db-import-failed = <i>❌ Error importing database.</i>
+ntf-db-import-success = <i>✅ Database import completed! Rows imported: { $rows }</i>
 ntf-db-restore-preparing = <i>🔄 Preparing for data restore...</i>
+ntf-db-restore-progress = <i>🔄 Restoring database... { $percent }%</i>
 
 # Database Clear
 ntf-db-clear-all-warning = 
@@ -678,6 +683,9 @@ ntf-plan-no-user-found = <i>❌ User not found.</i>
 ntf-plan-user-already-allowed = <i>❌ User already added to allowed list.</i>
 ntf-plan-confirm-delete = <i>⚠️ Press again to delete.</i>
 ntf-plan-updated-success = <i>✅ Plan updated successfully.</i>
+ntf-plan-sync-started = <i>🔄 Applying plan to { $total } subscriptions...</i>
+ntf-plan-sync-progress = <i>🔄 Applying plan... { $processed }/{ $total }</i>
+ntf-plan-sync-completed = <i>✅ Plan applied to subscriptions. Synced: { $synced }, failed: { $failed }</i>
 ntf-plan-created-success = <i>✅ Plan created successfully.</i>
 ntf-plan-deleted-success = <i>✅ Plan deleted successfully.</i>
 ntf-plan-tag-updated = <i>✅ Plan tag updated.</i>
@@ -16,9 +16,12 @@ ntf-db-export-error =
     <blockquote>{ $error }</blockquote>
 ntf-db-save-success = <i>✅ Бэкап базы данных успешно сохранён!</i>
 ntf-db-save-failed = <i>❌ Ошибка при сохранении бэкапа базы данных.</i>
+ntf-db-save-started = <i>💾 Создаётся бэкап базы данных...</i>
+ntf-db-save-progress = <i>💾 Создаётся бэкап базы данных... { $size } МБ</i>
 ntf-db-convert-success = <i>✅ Файл был сконвертирован!</i>
 ntf-db-convert-in-progress = ⚠️ Происходит конвертация в SQL...
 ntf-db-convert-in-progress = <i>⚠️ Происходит конвертация в SQL</i>
+ntf-db-convert-progress = <i>⚠️ Происходит конвертация в SQL... { $percent }%</i>
 ntf-db-restore-success =
     <i>✅ База данных успешно восстановлена из загруженного дампа.</i>
 
@@ -38,7 +41,9 @@ ntf-db-sync-stats-errors = Ошибок: { $errors }
 ntf-db-sync-error = ❌ Ошибка синхронизации: { $error }
 ntf-db-import-started = <i>⚠️ Происходит импорт базы данных. Ожидайте...</i>
 ntf-db-import-failed = <i>❌ Ошибка при импорте базы данных.</i>
+ntf-db-import-success = <i>✅ Импорт базы данных завершён! Загружено строк: { $rows }</i>
 ntf-db-restore-preparing = <i>🔄 Идет подготовка к восстановлению данных...</i>
+ntf-db-restore-progress = <i>🔄 Идет восстановление базы данных... { $percent }%</i>
 
 # Database Clear
 ntf-db-clear-all-warning = 
@@ -702,6 +707,9 @@ ntf-plan-no-user-found = <i>❌ Пользователь не найден.</i>
 ntf-plan-user-already-allowed = <i>❌ Пользователь уже добавлен в список разрешенных.</i>
 ntf-plan-confirm-delete = <i>⚠️ Нажмите еще раз, чтобы удалить.</i>
 ntf-plan-updated-success = <i>✅ План успешно обновлен.</i>
+ntf-plan-sync-started = <i>🔄 План применяется к { $total } подпискам...</i>
+ntf-plan-sync-progress = <i>🔄 План применяется... { $processed }/{ $total }</i>
+ntf-plan-sync-completed = <i>✅ План применён к подпискам. Синхронизировано: { $synced }, ошибок: { $failed }</i>
 ntf-plan-created-success = <i>✅ План успешно создан.</i>
 ntf-plan-deleted-success = <i>✅ План успешно удален.</i>
 ntf-plan-tag-updated = <i>✅ Тег плана обновлен.</i>
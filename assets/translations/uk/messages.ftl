@@ -920,9 +920,18 @@ msg-statistics-promocodes =
 
 msg-statistics-referrals =
     <b>👪 Статистика по реферальной системе</b>
-    
+
+    <blockquote>
+    • <b>Всего рефералов</b>: { $total_referrals }
+    • <b>Рефералов 1 уровня</b>: { $first_level_referrals }
+    • <b>Рефералов 2 уровня</b>: { $second_level_referrals }
+    • <b>Пригласивших пользователей</b>: { $total_referrers }
+    </blockquote>
+
     <blockquote>
-    • <b></b>:
+    • <b>Выдано бонусов</b>: { $issued_money_rewards }
+    • <b>Выдано дней</b>: { $issued_days_rewards }
+    • <b>Ожидает выдачи бонусов</b>: { $pending_money_rewards }
     </blockquote>
 
 msg-statistics-transactions-gateway =
@@ -16,9 +16,12 @@ ntf-db-export-error =
     <blockquote>{ $error }</blockquote>
 ntf-db-save-success = <i>✅ Резервну копію бази даних успішно збережено!</i>
 ntf-db-save-failed = <i>❌ Помилка збереження резервної копії бази даних.</i>
+ntf-db-save-started = <i>💾 Створюється резервна копія бази даних...</i>
+ntf-db-save-progress = <i>💾 Створюється резервна копія бази даних... { $size } МБ</i>
 ntf-db-convert-success = <i>✅ Файл було сконвертовано!</i>
 ntf-db-convert-in-progress = ⚠️ Відбувається конвертація в SQL...
 ntf-db-convert-in-progress = <i>⚠️ Відбувається конвертація в SQL</i>
+ntf-db-convert-progress = <i>⚠️ Відбувається конвертація в SQL... { $percent }%</i>
 ntf-db-restore-success =
     <i>✅ Базу даних успішно відновлено з завантаженого дампу.</i>
 
@@ -38,7 +41,9 @@ ntf-db-sync-stats-errors = Помилок: { $errors }
 ntf-db-sync-error = ❌ Помилка синхронізації: { $error }
 ntf-db-import-started = <i>⚠️ Виконується імпорт бази даних. Зачекайте...</i>
 ntf-db-import-failed = <i>❌ Помилка імпорту бази даних.</i>
+ntf-db-import-success = <i>✅ Імпорт бази даних завершено! Завантажено рядків: { $rows }</i>
 ntf-db-restore-preparing = <i>🔄 Підготовка до відновлення даних...</i>
+ntf-db-restore-progress = <i>🔄 Відновлення бази даних... { $percent }%</i>
 
 # Database Clear
 ntf-db-clear-all-warning = 
@@ -676,6 +681,9 @@ ntf-plan-no-user-found = <i>❌ Користувача не знайдено.</i
 ntf-plan-user-already-allowed = <i>❌ Користувача вже додано до списку дозволених.</i>
 ntf-plan-confirm-delete = <i>⚠️ Натисніть ще раз для видалення.</i>
 ntf-plan-updated-success = <i>✅ План успішно оновлено.</i>
+ntf-plan-sync-started = <i>🔄 План застосовується до { $total } підписок...</i>
+ntf-plan-sync-progress = <i>🔄 План застосовується... { $processed }/{ $total }</i>
+ntf-plan-sync-completed = <i>✅ План застосовано до підписок. Синхронізовано: { $synced }, помилок: { $failed }</i>
 ntf-plan-created-success = <i>✅ План успішно створено.</i>
 ntf-plan-deleted-success = <i>✅ План успішно видалено.</i>
 ntf-plan-tag-updated = <i>✅ Тег плану оновлено.</i>
@@ -10,4 +10,4 @@ fi
 
 echo "Migrations deployed successfully, starting taskiq scheduler"
 
-exec taskiq scheduler src.infrastructure.taskiq.scheduler:scheduler --tasks-pattern src/infrastructure/taskiq/tasks -fsd
+exec taskiq scheduler src.infrastructure.taskiq.scheduler:scheduler --tasks-pattern src/infrastructure/taskiq/tasks -fsd --update-interval 1
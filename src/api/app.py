@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from src.api.endpoints import TelegramWebhookEndpoint, connect_router, payments_router, remnawave_router
+from src.bot.update_scheduler import UpdateScheduler
 from src.core.config import AppConfig
 from src.lifespan import lifespan
 from src.services.mirror_bot_manager import MirrorBotManager
@@ -21,16 +22,28 @@ def create_app(config: AppConfig, dispatcher: Dispatcher) -> FastAPI:
     app.include_router(payments_router)
     app.include_router(remnawave_router)
 
+    # Общий планировщик апдейтов для основного и зеркальных ботов
+    update_scheduler = UpdateScheduler(
+        max_concurrency=config.bot.update_concurrency,
+        max_pending=config.bot.update_queue_size,
+    )
+    app.state.update_scheduler = update_scheduler
+
     telegram_webhook_endpoint = TelegramWebhookEndpoint(
         dispatcher=dispatcher,
         secret_token=config.bot.secret_token.get_secret_value(),
+        scheduler=update_scheduler,
     )
     telegram_webhook_endpoint.register(app=app, path=config.bot.webhook_path)
     app.state.telegram_webhook_endpoint = telegram_webhook_endpoint
     app.state.dispatcher = dispatcher
 
     # Mirror bot manager — handles additional bot webhooks
-    mirror_bot_manager = MirrorBotManager(dispatcher=dispatcher, domain=config.domain)
+    mirror_bot_manager = MirrorBotManager(
+        dispatcher=dispatcher,
+        domain=config.domain,
+        scheduler=update_scheduler,
+    )
     mirror_bot_manager.register_routes(app)
     app.state.mirror_bot_manager = mirror_bot_manager
     dispatcher["mirror_bot_manager"] = mirror_bot_manager
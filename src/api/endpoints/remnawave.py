@@ -2,18 +2,19 @@ import traceback
 from typing import cast
 
 from aiogram.utils.formatting import Text
-from dishka import FromDishka
+from dishka import AsyncContainer, FromDishka, Scope
 from dishka.integrations.fastapi import inject
 from fastapi import APIRouter, HTTPException, Request, Response, status
 from loguru import logger
 from remnapy.controllers import WebhookUtility
-from remnapy.models.webhook import NodeDto, UserDto, UserHwidDeviceEventDto
+from remnapy.models.webhook import NodeDto, UserDto, UserHwidDeviceEventDto, WebhookPayloadDto
 
 from src.core.config import AppConfig
 from src.core.constants import API_V1, REMNAWAVE_WEBHOOK_PATH
 from src.core.utils.message_payload import MessagePayload
 from src.services.notification import NotificationService
 from src.services.remnawave import RemnawaveService
+from src.services.remnawave_events import RemnawaveEventQueue
 
 router = APIRouter(prefix=API_V1)
 
@@ -23,15 +24,12 @@ router = APIRouter(prefix=API_V1)
 async def remnawave_webhook(
     request: Request,
     config: FromDishka[AppConfig],
-    remnawave_service: FromDishka[RemnawaveService],
-    notification_service: FromDishka[NotificationService],
+    event_queue: FromDishka[RemnawaveEventQueue],
 ) -> Response:
+    raw_body = (await request.body()).decode("utf-8")
     try:
-        raw_body = await request.body()
-        data = await request.json()
-        logger.debug(f"Received Remnawave webhook payload: '{data}'")
         payload = WebhookUtility.parse_webhook(
-            body=raw_body.decode("utf-8"),
+            body=raw_body,
             headers=dict(request.headers),
             webhook_secret=config.remnawave.webhook_secret.get_secret_value(),
             validate=True,
@@ -44,41 +42,50 @@ async def remnawave_webhook(
         logger.warning("Payload is empty after validation")
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    try:
-        if WebhookUtility.is_user_event(payload.event):
-            user = cast(UserDto, WebhookUtility.get_typed_data(payload))
-            await remnawave_service.handle_user_event(payload.event, user)
+    logger.debug(f"Received Remnawave webhook '{payload.event}'")
+    # Обработка идёт в фоне, см. process_remnawave_event
+    await event_queue.push(raw_body, payload)
+    return Response(status_code=status.HTTP_200_OK)
 
-        elif WebhookUtility.is_user_hwid_devices_event(payload.event):
-            event = cast(UserHwidDeviceEventDto, WebhookUtility.get_typed_data(payload))
-            await remnawave_service.handle_device_event(
-                payload.event,
-                event.user,
-                event.hwid_user_device,
-            )
 
-        elif WebhookUtility.is_node_event(payload.event):
-            node = cast(NodeDto, WebhookUtility.get_typed_data(payload))
-            await remnawave_service.handle_node_event(payload.event, node)
+async def process_remnawave_event(container: AsyncContainer, payload: WebhookPayloadDto) -> None:
+    async with container(scope=Scope.REQUEST) as request_container:
+        remnawave_service = await request_container.get(RemnawaveService)
+        notification_service = await request_container.get(NotificationService)
 
-        else:
-            logger.warning(f"Unhandled Remnawave event type '{payload.event}'")
+        try:
+            if WebhookUtility.is_user_event(payload.event):
+                user = cast(UserDto, WebhookUtility.get_typed_data(payload))
+                await remnawave_service.handle_user_event(payload.event, user)
 
-    except Exception as exception:
-        logger.exception(f"Failed to process Remnawave webhook due to '{exception}'")
-        traceback_str = traceback.format_exc()
-        error_type_name = type(exception).__name__
-        error_message = Text(str(exception)[:512])
+            elif WebhookUtility.is_user_hwid_devices_event(payload.event):
+                event = cast(UserHwidDeviceEventDto, WebhookUtility.get_typed_data(payload))
+                await remnawave_service.handle_device_event(
+                    payload.event,
+                    event.user,
+                    event.hwid_user_device,
+                )
 
-        await notification_service.error_notify(
-            traceback_str=traceback_str,
-            payload=MessagePayload.not_deleted(
-                i18n_key="ntf-event-error",
-                i18n_kwargs={
-                    "user": False,
-                    "error": f"{error_type_name}: {error_message.as_html()}",
-                },
-            ),
-        )
+            elif WebhookUtility.is_node_event(payload.event):
+                node = cast(NodeDto, WebhookUtility.get_typed_data(payload))
+                await remnawave_service.handle_node_event(payload.event, node)
 
-    return Response(status_code=status.HTTP_200_OK)
+            else:
+                logger.warning(f"Unhandled Remnawave event type '{payload.event}'")
+
+        except Exception as exception:
+            logger.exception(f"Failed to process Remnawave webhook due to '{exception}'")
+            traceback_str = traceback.format_exc()
+            error_type_name = type(exception).__name__
+            error_message = Text(str(exception)[:512])
+
+            await notification_service.error_notify(
+                traceback_str=traceback_str,
+                payload=MessagePayload.not_deleted(
+                    i18n_key="ntf-event-error",
+                    i18n_kwargs={
+                        "user": False,
+                        "error": f"{error_type_name}: {error_message.as_html()}",
+                    },
+                ),
+            )
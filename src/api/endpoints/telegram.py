@@ -1,6 +1,5 @@
-import asyncio
 import secrets
-from typing import Annotated, Any
+from typing import Annotated
 
 from aiogram import Bot, Dispatcher
 from aiogram.methods import TelegramMethod
@@ -10,29 +9,30 @@ from fastapi import Body, FastAPI, Header, HTTPException, Response, status
 from loguru import logger
 
 from src.bot.storage import current_bot_id_var
+from src.bot.update_scheduler import UpdateScheduler
 
 
 class TelegramWebhookEndpoint:
     dispatcher: Dispatcher
     secret_token: str
-    _feed_update_tasks: set[asyncio.Task[Any]]
+    scheduler: UpdateScheduler
 
-    def __init__(self, dispatcher: Dispatcher, secret_token: str) -> None:
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        secret_token: str,
+        scheduler: UpdateScheduler,
+    ) -> None:
         self.dispatcher = dispatcher
         self.secret_token = secret_token
-        self._feed_update_tasks = set()
+        self.scheduler = scheduler
 
     async def startup(self) -> None:
         await self.dispatcher.emit_startup(**self.dispatcher.workflow_data)
 
     async def shutdown(self) -> None:
         await self.dispatcher.emit_shutdown(**self.dispatcher.workflow_data)
-
-        for task in list(self._feed_update_tasks):
-            if not task.done():
-                task.cancel()
-
-        await asyncio.gather(*self._feed_update_tasks, return_exceptions=True)
+        await self.scheduler.shutdown()
 
     def register(self, app: FastAPI, path: str) -> None:
         app.add_api_route(path=path, endpoint=self._handle_request, methods=["POST"])
@@ -60,9 +60,9 @@ class TelegramWebhookEndpoint:
             logger.warning(f"Invalid secret token for update '{update.update_id}'")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
 
-        task = asyncio.create_task(self._feed_update(bot=bot, update=update))
-        self._feed_update_tasks.add(task)
-        task.add_done_callback(self._feed_update_tasks.discard)
+        if not self.scheduler.submit(bot, update, self._feed_update):
+            # Telegram повторит доставку, когда очередь разгрузится
+            return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         logger.debug(f"Update '{update.update_id}' scheduled for processing")
         return Response(status_code=status.HTTP_200_OK)
@@ -6,6 +6,7 @@ from .access import AccessMiddleware
 from .channel import ChannelMiddleware
 from .error import ErrorMiddleware
 from .garbage import GarbageMiddleware
+from .request_cache import RequestCacheMiddleware
 from .rules import RulesMiddleware
 from .throttling import ThrottlingMiddleware
 from .user import UserMiddleware
@@ -17,6 +18,7 @@ __all__ = [
 
 def setup_middlewares(router: Router) -> None:
     outer_middlewares: list[EventTypedMiddleware] = [
+        RequestCacheMiddleware(),
         ErrorMiddleware(),
         AccessMiddleware(),
         UserMiddleware(),
@@ -1,5 +1,5 @@
 import traceback
-from typing import Any, Awaitable, Callable, Union
+from typing import Any, Awaitable, Callable, Optional
 
 from aiogram import Bot
 from aiogram.enums import ChatMemberStatus
@@ -13,17 +13,12 @@ from src.core.constants import CONTAINER_KEY, USER_KEY
 from src.core.enums import MiddlewareEventType
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import UserDto
+from src.services.channel_membership import ChannelMembershipService, ChatId
 from src.services.notification import NotificationService
 from src.services.settings import SettingsService
 
 from .base import EventTypedMiddleware
 
-ALLOWED_STATUSES = (
-    ChatMemberStatus.CREATOR,
-    ChatMemberStatus.ADMINISTRATOR,
-    ChatMemberStatus.MEMBER,
-)
-
 
 class ChannelMiddleware(EventTypedMiddleware):
     __event_types__ = [MiddlewareEventType.MESSAGE, MiddlewareEventType.CALLBACK_QUERY]
@@ -47,15 +42,14 @@ class ChannelMiddleware(EventTypedMiddleware):
 
         bot: Bot = await container.get(Bot)
         notification_service: NotificationService = await container.get(NotificationService)
+        membership_service: ChannelMembershipService = await container.get(
+            ChannelMembershipService
+        )
 
         settings = await settings_service.get()
 
-        chat_id: Union[str, int, None] = None
         channel_link = settings.channel_link.get_secret_value()
-        if settings.channel_has_username:
-            chat_id = channel_link
-        elif settings.channel_id:
-            chat_id = settings.channel_id
+        chat_id: Optional[ChatId] = membership_service.get_chat_id(settings)
 
         if chat_id is None:
             logger.warning(
@@ -64,9 +58,12 @@ class ChannelMiddleware(EventTypedMiddleware):
             return await handler(event, data)
 
         try:
-            member = await bot.get_chat_member(
+            # Нажатие "Я подписался" всегда перепроверяем в Telegram
+            status = await membership_service.get_status(
+                bot=bot,
                 chat_id=chat_id,
-                user_id=user.telegram_id,
+                telegram_id=user.telegram_id,
+                force=self._is_click_confirm(event),
             )
         except Exception as exception:
             traceback_str = traceback.format_exc()
@@ -91,11 +88,11 @@ class ChannelMiddleware(EventTypedMiddleware):
             )
             return await handler(event, data)
 
-        if member.status in ALLOWED_STATUSES:
+        if membership_service.is_member(status):
             if self._is_click_confirm(event):
                 await self._delete_channel_message(event)
 
-            logger.debug(f"User '{user.telegram_id}' passed channel check. Status: {member.status}")
+            logger.debug(f"User '{user.telegram_id}' passed channel check. Status: {status}")
             # TODO: Auto confirming
             return await handler(event, data)
 
@@ -113,7 +110,7 @@ class ChannelMiddleware(EventTypedMiddleware):
             logger.debug(f"User '{user.telegram_id}' failed channel check")
             return
 
-        if member.status == ChatMemberStatus.LEFT:
+        if status == ChatMemberStatus.LEFT:
             i18n_key = "ntf-channel-join-required-left"
         else:
             i18n_key = "ntf-channel-join-required"
@@ -0,0 +1,31 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram.types import TelegramObject, Update
+from loguru import logger
+
+from src.core.enums import MiddlewareEventType
+from src.infrastructure.redis import request_cache_scope
+
+from .base import EventTypedMiddleware
+
+
+class RequestCacheMiddleware(EventTypedMiddleware):
+    """Открывает `RequestCache` на время обработки апдейта."""
+
+    __event_types__ = [MiddlewareEventType.UPDATE, MiddlewareEventType.AIOGD_UPDATE]
+
+    async def middleware_logic(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        with request_cache_scope() as request_cache:
+            try:
+                return await handler(event, data)
+            finally:
+                if request_cache.stats:
+                    update_id = event.update_id if isinstance(event, Update) else None
+                    logger.debug(
+                        f"Update '{update_id}' cache calls: {dict(request_cache.stats)}"
+                    )
@@ -1,14 +1,15 @@
 from typing import Any, Awaitable, Callable, cast
 
 from aiogram.types import CallbackQuery, TelegramObject
-from cachetools import TTLCache
 from dishka import AsyncContainer
 from loguru import logger
 
 from src.core.constants import CONTAINER_KEY, USER_KEY
 from src.core.enums import MiddlewareEventType
+from src.core.storage.keys import ThrottleKey, ThrottleNotifyKey
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import UserDto
+from src.infrastructure.redis import RateLimiter
 from src.services.notification import NotificationService
 
 from .base import EventTypedMiddleware
@@ -17,11 +18,11 @@ from .base import EventTypedMiddleware
 class ThrottlingMiddleware(EventTypedMiddleware):
     __event_types__ = [MiddlewareEventType.MESSAGE, MiddlewareEventType.CALLBACK_QUERY]
 
-    def __init__(self, ttl: float = 0.5) -> None:
-        # Основной кеш: блокирует повторные запросы в течение ttl
-        self.cache: TTLCache[int, Any] = TTLCache(maxsize=10_000, ttl=ttl)
-        # Кеш для уведомлений: не спамим пользователя чаще раза в 3 секунды
-        self.notify_cache: TTLCache[int, Any] = TTLCache(maxsize=10_000, ttl=3.0)
+    def __init__(self, ttl: float = 0.5, notify_ttl: float = 3.0) -> None:
+        # Лимиты общие для всех процессов и зеркальных ботов (см. RateLimiter)
+        self.ttl = ttl
+        # Не спамим пользователя предупреждениями чаще раза в notify_ttl
+        self.notify_ttl = notify_ttl
 
     async def middleware_logic(
         self,
@@ -30,8 +31,10 @@ class ThrottlingMiddleware(EventTypedMiddleware):
         data: dict[str, Any],
     ) -> Any:
         user: UserDto = data[USER_KEY]
+        container: AsyncContainer = data[CONTAINER_KEY]
+        rate_limiter: RateLimiter = await container.get(RateLimiter)
 
-        if user.telegram_id in self.cache:
+        if not await rate_limiter.hit(ThrottleKey(telegram_id=user.telegram_id), self.ttl):
             logger.warning(f"User '{user.telegram_id}' throttled")
 
             # Для callback_query (навигация по меню) — мгновенно снимаем индикатор загрузки
@@ -43,10 +46,9 @@ class ThrottlingMiddleware(EventTypedMiddleware):
                     pass
                 return
 
-            # Для текстовых сообщений — один раз за 3 сек показываем предупреждение
-            if user.telegram_id not in self.notify_cache:
-                self.notify_cache[user.telegram_id] = None
-                container: AsyncContainer = data[CONTAINER_KEY]
+            # Для текстовых сообщений — один раз за notify_ttl показываем предупреждение
+            notify_key = ThrottleNotifyKey(telegram_id=user.telegram_id)
+            if await rate_limiter.hit(notify_key, self.notify_ttl):
                 try:
                     notification_service: NotificationService = await container.get(NotificationService)
                     await notification_service.notify_user(
@@ -57,5 +59,4 @@ class ThrottlingMiddleware(EventTypedMiddleware):
                     pass
             return
 
-        self.cache[user.telegram_id] = None
         return await handler(event, data)
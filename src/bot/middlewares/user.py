@@ -1,11 +1,11 @@
 import asyncio
 from datetime import datetime, timezone
-from typing import Any, Awaitable, Callable, Optional
+from typing import Any, Awaitable, Callable, Final, Optional
 
-from aiogram.types import TelegramObject
+from aiogram import Bot
+from aiogram.types import CallbackQuery, Message, TelegramObject
 from aiogram.types import User as AiogramUser
 from aiogram_dialog.api.internal import FakeUser
-from cachetools import TTLCache
 from dishka import AsyncContainer
 from fluentogram import TranslatorHub
 from loguru import logger
@@ -15,6 +15,7 @@ from src.bot.keyboards import get_user_keyboard
 from src.core.config import AppConfig
 from src.core.constants import CONTAINER_KEY, IS_SUPER_DEV_KEY, USER_KEY, SETTINGS_KEY
 from src.core.enums import MiddlewareEventType, PlanType, SystemNotificationType
+from src.core.storage.keys import RecentActivityDebounceKey
 from src.core.utils.formatters import format_bytes_to_gb
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import (
@@ -22,7 +23,8 @@ from src.infrastructure.database.models.dto import (
     SubscriptionDto,
     UserDto,
 )
-from src.services.notification import NotificationService
+from src.infrastructure.redis import RateLimiter
+from src.services.notification import NotificationService, set_mirror_reachable
 from src.services.plan import PlanService
 from src.services.referral import ReferralService
 from src.services.remnawave import RemnawaveService
@@ -32,9 +34,9 @@ from src.services.user import UserService
 
 from .base import EventTypedMiddleware
 
-# Debounce activity updates — skip if user was active within last 30s.
-# This saves 3 Redis commands (lrem+lpush+ltrim) per redundant update.
-_ACTIVITY_DEBOUNCE: TTLCache[int, None] = TTLCache(maxsize=10_000, ttl=30)
+# Debounce activity updates — skip if user was active within last 30s in any process.
+# Repeated updates inside the window are rejected locally without touching Redis.
+ACTIVITY_DEBOUNCE_TTL: Final[float] = 30.0
 
 
 class UserMiddleware(EventTypedMiddleware):
@@ -329,13 +331,29 @@ class UserMiddleware(EventTypedMiddleware):
         elif not isinstance(aiogram_user, FakeUser):
             await user_service.compare_and_update(user, aiogram_user, settings=settings)
 
-        # Fire-and-forget: don't block handler on 3 Redis commands for activity
+        # Fire-and-forget: don't block handler on Redis round-trips for activity
         tid = user.telegram_id
-        if tid not in _ACTIVITY_DEBOUNCE:
-            _ACTIVITY_DEBOUNCE[tid] = None
-            asyncio.create_task(user_service.update_recent_activity(telegram_id=tid))
+        rate_limiter: RateLimiter = await container.get(RateLimiter)
+        asyncio.create_task(self._update_recent_activity(rate_limiter, user_service, tid))
+
+        # User wrote to a mirror bot, so the mirror can reach them again.
+        # my_chat_member updates are handled by the member router.
+        bot: Optional[Bot] = data.get("bot")
+        is_interaction = isinstance(event, (Message, CallbackQuery))
+        if is_interaction and bot and bot.id != (await container.get(Bot)).id:
+            await set_mirror_reachable(user_service.redis_client, bot.id, tid, reachable=True)
 
         data[USER_KEY] = user
         data[IS_SUPER_DEV_KEY] = tid == config.bot.dev_id
 
         return await handler(event, data)
+
+    @staticmethod
+    async def _update_recent_activity(
+        rate_limiter: RateLimiter,
+        user_service: UserService,
+        telegram_id: int,
+    ) -> None:
+        debounce_key = RecentActivityDebounceKey(telegram_id=telegram_id)
+        if await rate_limiter.hit(debounce_key, ACTIVITY_DEBOUNCE_TTL):
+            await user_service.update_recent_activity(telegram_id=telegram_id)
@@ -25,7 +25,7 @@ from src.core.utils.message_payload import MessagePayload
 from src.core.utils.validators import is_double_click
 from src.infrastructure.database.models.dto import BroadcastDto, PlanDto, UserDto
 from src.infrastructure.taskiq.tasks.broadcast import delete_broadcast_task, send_broadcast_task
-from src.services.broadcast import BroadcastService
+from src.services.broadcast import BroadcastCheckpoint, BroadcastService
 from src.services.notification import NotificationService
 from src.services.plan import PlanService
 from src.services.settings import SettingsService
@@ -324,22 +324,26 @@ async def on_send(
         raise ValueError("BroadcastAudience not found in dialog data")
 
     if is_double_click(dialog_manager, key="broadcast_confirm", cooldown=10):
-        users = await broadcast_service.get_audience_users(audience, plan_id=plan_id)
+        total_count = await broadcast_service.get_audience_count(audience, plan_id=plan_id)
 
         task_id = uuid.uuid4()
         broadcast = BroadcastDto(
             task_id=task_id,
             status=BroadcastStatus.PROCESSING,
-            total_count=len(users),
+            total_count=total_count,
             audience=audience,
             payload=payload,
         )
         broadcast = await broadcast_service.create(broadcast)
+        await broadcast_service.save_checkpoint(
+            broadcast.id,  # type: ignore[arg-type]
+            BroadcastCheckpoint(plan_id=plan_id),
+        )
 
         task = (
             await send_broadcast_task.kicker()
             .with_task_id(str(task_id))
-            .kiq(broadcast, users, payload)
+            .kiq(broadcast.id, audience, plan_id)
         )
 
         dialog_manager.dialog_data["task_id"] = task.task_id
@@ -1,4 +1,3 @@
-import asyncio
 from aiogram.types import CallbackQuery, Message
 from aiogram_dialog import DialogManager, ShowMode, StartMode
 from aiogram_dialog.widgets.input import MessageInput
@@ -13,6 +12,7 @@ from src.core.constants import USER_KEY
 from src.core.enums import AccessMode, ReferralRewardType
 from src.core.utils.formatters import format_user_log as log
 from src.infrastructure.database.models.dto import UserDto
+from src.infrastructure.taskiq.tasks.notifications import delete_message_later
 from src.services.settings import SettingsService
 from src.services.access import AccessService
 from src.services.user import UserService
@@ -779,13 +779,7 @@ async def on_community_url_input(
         )
         
         # Удаляем сообщение через 5 секунд
-        async def delete_warning():
-            try:
-                await asyncio.sleep(5)
-                await warning_msg.delete()
-            except Exception as e:
-                logger.debug(f"Failed to delete warning message: {e}")
-        asyncio.create_task(delete_warning())
+        await delete_message_later(warning_msg, 5)
         return
     
     current = dialog_manager.dialog_data.get("current_community", {})
@@ -1725,14 +1719,7 @@ async def on_balance_min_amount_manual_value_input(
         if value < 0:
             error_msg = await message.answer("❗️ Введите положительное число!")
             # Удаляем сообщение об ошибке через 5 секунд
-            import asyncio
-            async def delete_after_delay():
-                await asyncio.sleep(5)
-                try:
-                    await error_msg.delete()
-                except Exception:
-                    pass
-            asyncio.create_task(delete_after_delay())
+            await delete_message_later(error_msg, 5)
             return
         
         # Проверяем что минимум не больше максимума
@@ -1740,14 +1727,7 @@ async def on_balance_min_amount_manual_value_input(
         if max_amount is not None and value > max_amount:
             error_msg = await message.answer(f"❗️ Минимум не может быть больше максимума ({int(max_amount)} ₽)!")
             # Удаляем сообщение об ошибке через 5 секунд
-            import asyncio
-            async def delete_after_delay():
-                await asyncio.sleep(5)
-                try:
-                    await error_msg.delete()
-                except Exception:
-                    pass
-            asyncio.create_task(delete_after_delay())
+            await delete_message_later(error_msg, 5)
             return
         
         current["balance_min_amount"] = value
@@ -1763,14 +1743,7 @@ async def on_balance_min_amount_manual_value_input(
     except ValueError:
         error_msg = await message.answer("❗️ Введите корректное число!")
         # Удаляем сообщение об ошибке через 5 секунд
-        import asyncio
-        async def delete_after_delay():
-            await asyncio.sleep(5)
-            try:
-                await error_msg.delete()
-            except Exception:
-                pass
-        asyncio.create_task(delete_after_delay())
+        await delete_message_later(error_msg, 5)
 
 
 @inject
@@ -1851,14 +1824,7 @@ async def on_balance_max_amount_manual_value_input(
         if value < 0:
             error_msg = await message.answer("❗️ Введите положительное число!")
             # Удаляем сообщение об ошибке через 5 секунд
-            import asyncio
-            async def delete_after_delay():
-                await asyncio.sleep(5)
-                try:
-                    await error_msg.delete()
-                except Exception:
-                    pass
-            asyncio.create_task(delete_after_delay())
+            await delete_message_later(error_msg, 5)
             return
         
         # Проверяем что максимум не меньше минимума
@@ -1866,14 +1832,7 @@ async def on_balance_max_amount_manual_value_input(
         if min_amount is not None and value < min_amount:
             error_msg = await message.answer(f"❗️ Максимум не может быть меньше минимума ({int(min_amount)} ₽)!")
             # Удаляем сообщение об ошибке через 5 секунд
-            import asyncio
-            async def delete_after_delay():
-                await asyncio.sleep(5)
-                try:
-                    await error_msg.delete()
-                except Exception:
-                    pass
-            asyncio.create_task(delete_after_delay())
+            await delete_message_later(error_msg, 5)
             return
         
         current["balance_max_amount"] = value
@@ -1889,14 +1848,7 @@ async def on_balance_max_amount_manual_value_input(
     except ValueError:
         error_msg = await message.answer("❗️ Введите корректное число!")
         # Удаляем сообщение об ошибке через 5 секунд
-        import asyncio
-        async def delete_after_delay():
-            await asyncio.sleep(5)
-            try:
-                await error_msg.delete()
-            except Exception:
-                pass
-        asyncio.create_task(delete_after_delay())
+        await delete_message_later(error_msg, 5)
 
 
 @inject
@@ -2007,13 +1959,7 @@ async def on_tos_url_input(
     if not url.startswith(("http://", "https://")):
         warning_msg = await message.answer("⚠️ URL должен начинаться с http:// или https://")
         # Удаляем сообщение через 5 секунд
-        async def delete_warning():
-            try:
-                await asyncio.sleep(5)
-                await warning_msg.delete()
-            except Exception as e:
-                logger.debug(f"Failed to delete warning message: {e}")
-        asyncio.create_task(delete_warning())
+        await delete_message_later(warning_msg, 5)
         return
     
     current["url"] = url
@@ -13,20 +13,17 @@ from remnapy import RemnawaveSDK
 from remnapy.enums.users import TrafficLimitStrategy
 
 from src.bot.states import TelegramPlans
-from src.core.config import AppConfig
 from src.core.constants import TAG_REGEX, USER_KEY
-from src.core.enums import Currency, PlanAvailability, PlanType, SubscriptionStatus
+from src.core.enums import Currency, PlanAvailability, PlanType
 from src.core.utils.adapter import DialogDataAdapter
 from src.core.utils.formatters import format_user_log as log
 from src.core.utils.message_payload import MessagePayload
 from src.core.utils.validators import is_double_click, parse_int
 from src.infrastructure.database.models.dto import PlanDto, PlanDurationDto, PlanPriceDto, UserDto
-from src.infrastructure.taskiq.tasks.redirects import redirect_to_main_menu_task
+from src.infrastructure.taskiq.tasks.plans import propagate_plan_task
 from src.services.notification import NotificationService
 from src.services.plan import PlanService
 from src.services.pricing import PricingService
-from src.services.remnawave import RemnawaveService
-from src.services.subscription import SubscriptionService
 from src.services.user import UserService
 
 
@@ -1201,12 +1198,8 @@ async def on_confirm_plan(  # noqa: C901
     callback: CallbackQuery,
     widget: Button,
     dialog_manager: DialogManager,
-    config: FromDishka[AppConfig],
     notification_service: FromDishka[NotificationService],
     plan_service: FromDishka[PlanService],
-    subscription_service: FromDishka[SubscriptionService],
-    remnawave_service: FromDishka[RemnawaveService],
-    user_service: FromDishka[UserService],
 ) -> None:
     user: UserDto = dialog_manager.middleware_data[USER_KEY]
 
@@ -1319,14 +1312,12 @@ async def on_confirm_plan(  # noqa: C901
         await plan_service.update(plan_dto)
         logger.info(f"{log(user)} Plan '{plan_dto.name}' updated successfully")
         
-        # Проверяем изменились ли сквады
-        squads_changed = False
+        # Изменение сквадов только логируется: подписки обновляются задачей целиком
         if original_plan:
             # Сравниваем внутренние сквады
             new_internal = set(plan_dto.internal_squads or [])
             old_internal = set(original_internal_squads or [])
             if new_internal != old_internal:
-                squads_changed = True
                 logger.info(
                     f"{log(user)} Internal squads changed: {list(old_internal)} -> {list(new_internal)}"
                 )
@@ -1335,108 +1326,13 @@ async def on_confirm_plan(  # noqa: C901
             new_external = set(plan_dto.external_squad or [])
             old_external = set(original_external_squad or [])
             if new_external != old_external:
-                squads_changed = True
                 logger.info(
                     f"{log(user)} External squad changed: {list(old_external)} -> {list(new_external)}"
                 )
         
-        # Синхронизируем всех пользователей с этим планом в Remnawave
-        # (обновляем их параметры в панели согласно новым настройкам плана)
-        logger.info(f"{log(user)} Synchronizing all users with plan '{plan_dto.name}' to Remnawave")
-        all_subscriptions = await subscription_service.get_all()
-        synced_count = 0
-        failed_count = 0
-        
-        for subscription in all_subscriptions:
-                # Синхронизируем только АКТИВНЫЕ подписки с этим планом
-                if (subscription.plan and subscription.plan.id == plan_dto.id 
-                    and subscription.status == SubscriptionStatus.ACTIVE):
-                    try:
-                        # Получаем пользователя если его нет в подписке
-                        target_user = subscription.user
-                        if not target_user:
-                            target_user = await user_service.get(telegram_id=subscription.user_telegram_id)
-                        
-                        if not target_user:
-                            logger.warning(
-                                f"{log(user)} User not found for subscription '{subscription.id}', skipping sync"
-                            )
-                            continue
-                        
-                        # Обновляем snapshot плана в подписке с новыми параметрами
-                        subscription.plan.internal_squads = list(plan_dto.internal_squads) if plan_dto.internal_squads else []
-                        if plan_dto.external_squad:
-                            subscription.plan.external_squad = list(plan_dto.external_squad)
-                        subscription.plan.traffic_limit = plan_dto.traffic_limit
-                        subscription.plan.device_limit = plan_dto.device_limit
-                        subscription.plan.tag = plan_dto.tag
-                        subscription.plan.traffic_limit_strategy = plan_dto.traffic_limit_strategy
-                        
-                        # Обновляем параметры на уровне подписки (используются в remnawave_service.updated_user)
-                        subscription.internal_squads = list(plan_dto.internal_squads) if plan_dto.internal_squads else []
-                        if plan_dto.external_squad:
-                            subscription.external_squad = list(plan_dto.external_squad)
-                        subscription.traffic_limit = plan_dto.traffic_limit
-                        subscription.device_limit = plan_dto.device_limit
-                        subscription.tag = plan_dto.tag
-                        subscription.traffic_limit_strategy = plan_dto.traffic_limit_strategy
-                        
-                        logger.debug(
-                            f"{log(user)} Before update - subscription external_squad: {subscription.external_squad}, "
-                            f"plan external_squad: {plan_dto.external_squad}"
-                        )
-                        
-                        # Сохраняем обновлённую подписку в БД
-                        await subscription_service.update(subscription)
-                        
-                        # Синхронизируем с Remnawave
-                        if subscription.user_remna_id:
-                            await remnawave_service.updated_user(
-                                user=target_user,
-                                uuid=subscription.user_remna_id,
-                                subscription=subscription,
-                                reset_traffic=False,  # Не сбрасываем трафик при изменении плана
-                            )
-                            synced_count += 1
-                            logger.debug(
-                                f"{log(user)} Synced user '{target_user.telegram_id}' "
-                                f"with plan '{plan_dto.name}' to Remnawave"
-                            )
-                        else:
-                            logger.warning(
-                                f"{log(user)} Subscription '{subscription.id}' has no user_remna_id, skipping Remnawave sync"
-                            )
-                            failed_count += 1
-                    except Exception as e:
-                        failed_count += 1
-                        logger.error(
-                            f"{log(user)} Failed to sync subscription '{subscription.id}': {e}",
-                            exc_info=True
-                        )
-        
-        logger.info(
-            f"{log(user)} Remnawave synchronization completed: {synced_count} synced, {failed_count} failed"
-        )
-        
-        # Notify all users with this plan to update their interface
-        all_subscriptions = await subscription_service.get_all()
-        users_to_notify = set()
-        
-        for subscription in all_subscriptions:
-            if subscription.plan and subscription.plan.id == plan_dto.id:
-                telegram_id = subscription.user.telegram_id if subscription.user else None
-                # Exclude test bot from automatic updates
-                if telegram_id and telegram_id != config.bot.dev_id:
-                    users_to_notify.add(telegram_id)
-        
-        # Send update notification to all affected users
-        for telegram_id in users_to_notify:
-            await redirect_to_main_menu_task.kiq(telegram_id)
-            logger.debug(
-                f"{log(user)} Sent interface update notification to user '{telegram_id}' "
-                f"after plan '{plan_dto.name}' modification"
-            )
-        
+        # Подписки, панель и интерфейс пользователей обновляются в фоновой задаче
+        await propagate_plan_task.kiq(user, plan_dto.id)
+
         await notification_service.notify_user(
             user=user,
             payload=MessagePayload(i18n_key="ntf-plan-updated-success"),
@@ -1,6 +1,20 @@
 from aiogram_dialog import Dialog, StartMode, Window
 from aiogram_dialog.widgets.input import MessageInput
-from aiogram_dialog.widgets.kbd import Button, Row, ScrollingGroup, Select, Start, SwitchTo
+from aiogram_dialog.widgets.kbd import (
+    Button,
+    Column,
+    CurrentPage,
+    FirstPage,
+    LastPage,
+    NextPage,
+    PrevPage,
+    Row,
+    ScrollingGroup,
+    Select,
+    Start,
+    StubScroll,
+    SwitchTo,
+)
 from aiogram_dialog.widgets.text import Format
 from magic_filter import F
 
@@ -152,7 +166,7 @@ recent_activity = Window(
 all_users = Window(
     Banner(),
     I18nFormat("msg-users-all"),
-    ScrollingGroup(
+    Column(
         Select(
             text=Format("{item.telegram_id} ({item.name})"),
             id="user",
@@ -161,10 +175,15 @@ all_users = Window(
             type_factory=int,
             on_click=on_user_select,
         ),
-        id="scroll",
-        width=1,
-        height=7,
-        hide_on_single_page=True,
+    ),
+    StubScroll(id="scroll", pages="pages"),
+    Row(
+        FirstPage(scroll="scroll"),
+        PrevPage(scroll="scroll"),
+        CurrentPage(scroll="scroll"),
+        NextPage(scroll="scroll"),
+        LastPage(scroll="scroll"),
+        when=F["pages"] > 1,
     ),
     Row(
         ColoredSwitchTo(
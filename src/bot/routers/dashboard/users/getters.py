@@ -1,6 +1,8 @@
-from typing import Any, cast
+from math import ceil
+from typing import Any, Final, Optional, cast
 
 from aiogram_dialog import DialogManager
+from aiogram_dialog.widgets.common import ManagedScroll
 from dishka import FromDishka
 from dishka.integrations.aiogram_dialog import inject
 
@@ -8,6 +10,8 @@ from src.core.utils.formatters import format_percent
 from src.infrastructure.database.models.dto import UserDto
 from src.services.user import UserService
 
+USERS_PAGE_SIZE: Final[int] = 7
+
 
 async def search_results_getter(dialog_manager: DialogManager, **kwargs: Any) -> dict[str, Any]:
     start_data = cast(dict[str, Any], dialog_manager.start_data)
@@ -51,11 +55,42 @@ async def all_users_getter(
     user_service: FromDishka[UserService],
     **kwargs: Any,
 ) -> dict[str, Any]:
-    """Получает всех пользователей из базы данных."""
-    users = await user_service.get_all()
-    # Сортируем по ID (последние зарегистрированные первые)
-    sorted_users = sorted(users, key=lambda u: u.telegram_id, reverse=True)
-    return {"all_users": sorted_users}
+    """Страница списка пользователей (последние зарегистрированные первые).
+
+    Постраничный вывод по ключу `telegram_id DESC`: в `dialog_data` хранятся
+    последние ID уже открытых страниц, дальние страницы находятся по индексу.
+    """
+    widget: Optional[ManagedScroll] = dialog_manager.find("scroll")
+
+    if not widget:
+        raise ValueError()
+
+    count_users = await user_service.count()
+    pages = max(ceil(count_users / USERS_PAGE_SIZE), 1)
+    page = min(await widget.get_page(), pages - 1)
+
+    # Курсор страницы N хранится в cursors[N - 1], на первой странице сбрасываем кэш
+    cursors: list[int] = dialog_manager.dialog_data.setdefault("all_users_cursors", [])
+    if page == 0:
+        cursors.clear()
+
+    before_telegram_id: Optional[int] = None
+    if page > 0 and len(cursors) >= page:
+        before_telegram_id = cursors[page - 1]
+    elif page > 0:
+        before_telegram_id = await user_service.get_page_cursor(
+            skip=(page - len(cursors)) * USERS_PAGE_SIZE,
+            before_telegram_id=cursors[-1] if cursors else None,
+        )
+
+    users = await user_service.get_page(USERS_PAGE_SIZE, before_telegram_id)
+    if users and len(cursors) == page:
+        cursors.append(users[-1].telegram_id)
+
+    return {
+        "all_users": users,
+        "pages": pages,
+    }
 
 
 @inject
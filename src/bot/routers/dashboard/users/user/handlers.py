@@ -17,7 +17,7 @@ from src.bot.keyboards import get_contact_support_keyboard
 from src.bot.states import DashboardUser
 from src.core.config import AppConfig
 from src.core.constants import USER_KEY
-from src.core.enums import SubscriptionStatus, UserRole
+from src.core.enums import BalanceEntryReason, SubscriptionStatus, UserRole
 from src.core.utils.formatters import format_user_log as log
 from src.core.utils.message_payload import MessagePayload
 from src.core.utils.time import datetime_now
@@ -406,9 +406,13 @@ async def on_points_input(
         )
         return
 
-    new_balance = target_user.balance + number
+    new_balance = await user_service.add_to_balance(
+        target_user,
+        number,
+        BalanceEntryReason.ADMIN,
+    )
 
-    if new_balance < 0:
+    if new_balance is None:
         await notification_service.notify_user(
             user=user,
             payload=MessagePayload(
@@ -419,7 +423,6 @@ async def on_points_input(
         return
 
     target_user.balance = new_balance
-    await user_service.update(user=target_user)
 
     logger.info(
         f"{log(user)} {'Added' if number > 0 else 'Subtracted'} "
@@ -446,9 +449,13 @@ async def on_points_select(
     if not target_user:
         raise ValueError(f"User '{target_telegram_id}' not found")
 
-    new_balance = target_user.balance + selected_points
+    new_balance = await user_service.add_to_balance(
+        target_user,
+        selected_points,
+        BalanceEntryReason.ADMIN,
+    )
 
-    if new_balance < 0:
+    if new_balance is None:
         await notification_service.notify_user(
             user=user,
             payload=MessagePayload(
@@ -459,7 +466,6 @@ async def on_points_select(
         return
 
     target_user.balance = new_balance
-    await user_service.update(target_user)
 
     logger.info(
         f"{log(user)} {'Added' if selected_points > 0 else 'Subtracted'} "
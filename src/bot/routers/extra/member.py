@@ -1,4 +1,5 @@
-from aiogram import Router
+from aiogram import Bot, Router
+from aiogram.enums import ChatMemberStatus
 from aiogram.filters import JOIN_TRANSITION, LEAVE_TRANSITION, ChatMemberUpdatedFilter
 from aiogram.types import ChatMemberUpdated
 from dishka import FromDishka
@@ -6,6 +7,9 @@ from loguru import logger
 
 from src.core.utils.formatters import format_user_log as log
 from src.infrastructure.database.models.dto import UserDto
+from src.services.channel_membership import ChannelMembershipService
+from src.services.notification import NotificationService
+from src.services.settings import SettingsService
 from src.services.user import UserService
 
 # For only ChatType.PRIVATE (app/bot/filters/private.py)
@@ -15,9 +19,17 @@ router = Router(name=__name__)
 @router.my_chat_member(ChatMemberUpdatedFilter(JOIN_TRANSITION))
 async def on_unblocked(
     member: ChatMemberUpdated,
+    bot: Bot,
     user: UserDto,
     user_service: FromDishka[UserService],
+    notification_service: FromDishka[NotificationService],
 ) -> None:
+    # Зеркало отмечает только свою доступность, флаг блокировки относится к основному боту
+    if notification_service.is_mirror_bot(bot):
+        logger.info(f"{log(user)} Mirror bot '{bot.id}' unblocked")
+        await notification_service.set_mirror_reachable(bot.id, user.telegram_id, reachable=True)
+        return
+
     logger.info(f"{log(user)} Bot unblocked")
     await user_service.set_bot_blocked(user=user, blocked=False)
 
@@ -25,8 +37,35 @@ async def on_unblocked(
 @router.my_chat_member(ChatMemberUpdatedFilter(LEAVE_TRANSITION))
 async def on_blocked(
     member: ChatMemberUpdated,
+    bot: Bot,
     user: UserDto,
     user_service: FromDishka[UserService],
+    notification_service: FromDishka[NotificationService],
 ) -> None:
+    if notification_service.is_mirror_bot(bot):
+        logger.info(f"{log(user)} Mirror bot '{bot.id}' blocked")
+        await notification_service.set_mirror_reachable(bot.id, user.telegram_id, reachable=False)
+        return
+
     logger.info(f"{log(user)} Bot blocked")
     await user_service.set_bot_blocked(user=user, blocked=True)
+
+
+@router.chat_member()
+async def on_channel_member_updated(
+    member: ChatMemberUpdated,
+    bot: Bot,
+    settings_service: FromDishka[SettingsService],
+    membership_service: FromDishka[ChannelMembershipService],
+) -> None:
+    # Приходит, только если бот администратор обязательного канала
+    settings = await settings_service.get()
+    chat_id = membership_service.get_chat_id(settings)
+
+    if chat_id is None or not membership_service.matches_chat(settings, member.chat):
+        return
+
+    telegram_id = member.new_chat_member.user.id
+    status = ChatMemberStatus(member.new_chat_member.status)
+    await membership_service.set_status(bot.id, chat_id, telegram_id, status)
+    logger.debug(f"Channel membership of user '{telegram_id}' changed to '{status}'")
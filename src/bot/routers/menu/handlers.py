@@ -31,8 +31,12 @@ from src.core.utils.formatters import (
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import PlanSnapshotDto, SubscriptionDto, UserDto
 from src.infrastructure.taskiq.tasks.redirects import redirect_to_main_menu_task
-from src.infrastructure.taskiq.tasks.notifications import send_delayed_transfer_notification_task
-from src.services.balance_transfer import BalanceTransferService
+from src.infrastructure.taskiq.schedule_source import kiq_delayed
+from src.infrastructure.taskiq.tasks.notifications import (
+    delete_message_later,
+    send_delayed_transfer_notification_task,
+)
+from src.services.balance import BalanceService
 from src.services.extra_device import ExtraDeviceService
 from src.services.notification import NotificationService
 from src.services.payment_gateway import PaymentGatewayService
@@ -104,12 +108,7 @@ async def validate_balance_amount_input(
         )
         
         # Delete error message after 5 seconds
-        try:
-            import asyncio
-            await asyncio.sleep(5)
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         
         # Stop propagation to dialog handler
         return
@@ -440,7 +439,6 @@ async def on_device_delete(
 ) -> None:
     """Удаление устройства или пометка extra слота на удаление."""
     import time
-    import asyncio
     
     await sub_manager.load_data()
     slot_id = sub_manager.item_id  # Получаем индекс слота
@@ -487,14 +485,7 @@ async def on_device_delete(
             sub_manager.dialog_data["warning_message_id"] = warning_msg.message_id
             
             # Удаляем сообщение через 5 секунд
-            async def delete_warning():
-                await asyncio.sleep(5)
-                try:
-                    await warning_msg.delete()
-                except Exception:
-                    pass
-            
-            asyncio.create_task(delete_warning())
+            await delete_message_later(warning_msg, 5)
             await callback.answer()
             return
         
@@ -781,7 +772,7 @@ async def on_withdraw_points(
     dialog_manager: DialogManager,
     i18n: FromDishka[TranslatorRunner],
     referral_service: FromDishka[ReferralService],
-    user_service: FromDishka[UserService],
+    balance_service: FromDishka[BalanceService],
     notification_service: FromDishka[NotificationService],
 ) -> None:
     from src.core.enums import ReferralRewardType
@@ -801,22 +792,14 @@ async def on_withdraw_points(
                 chat_id=callback.from_user.id,
                 text=i18n.get("ntf-invite-withdraw-no-balance"),
             )
-            # Delete message after 5 seconds
-            await asyncio.sleep(5)
-            await error_msg.delete()
+            await delete_message_later(error_msg, 5)
         except Exception:
             pass
         
         return
     
-    # Withdraw rewards (mark as issued)
-    withdrawn_amount = await referral_service.withdraw_pending_rewards(
-        user.telegram_id,
-        ReferralRewardType.MONEY,
-    )
-    
-    # Add to user balance
-    await user_service.add_to_balance(user, withdrawn_amount)
+    # Withdraw rewards to user balance in one transaction
+    withdrawn_amount = await balance_service.withdraw_bonus(user.telegram_id)
     
     # Обновляем баланс пользователя в middleware_data, чтобы окно отобразило новый баланс
     user.balance += withdrawn_amount
@@ -831,9 +814,7 @@ async def on_withdraw_points(
             chat_id=callback.from_user.id,
             text=i18n.get("ntf-invite-withdraw-success", amount=withdrawn_amount),
         )
-        # Delete message after 5 seconds
-        await asyncio.sleep(5)
-        await success_msg.delete()
+        await delete_message_later(success_msg, 5)
     except Exception:
         pass
 
@@ -1026,15 +1007,7 @@ async def on_balance_amount_input(
         )
         
         # Delete error message after 5 seconds in background task
-        import asyncio
-        async def delete_after_delay():
-            await asyncio.sleep(5)
-            try:
-                await error_msg.delete()
-            except Exception:
-                pass
-        
-        asyncio.create_task(delete_after_delay())
+        await delete_message_later(error_msg, 5)
         
         # Prevent dialog from re-rendering by setting show mode
         dialog_manager.show_mode = ShowMode.NO_UPDATE
@@ -1160,7 +1133,7 @@ async def on_accept_bonus_amount(
     callback: CallbackQuery,
     widget: Button,
     dialog_manager: DialogManager,
-    user_service: FromDishka[UserService],
+    balance_service: FromDishka[BalanceService],
     referral_service: FromDishka[ReferralService],
     i18n: FromDishka[TranslatorRunner],
 ) -> None:
@@ -1200,33 +1173,16 @@ async def on_accept_bonus_amount(
             text=i18n.get("ntf-bonus-insufficient"),
         )
         
-        # Удаляем сообщение через 5 секунд в фоне
-        async def delete_error():
-            try:
-                await asyncio.sleep(5)
-                await callback.bot.delete_message(
-                    chat_id=callback.from_user.id,
-                    message_id=error_msg.message_id,
-                )
-            except Exception:
-                pass
-        
-        asyncio.create_task(delete_error())
+        # Удаляем сообщение через 5 секунд
+        await delete_message_later(error_msg, 5)
         return
     
     # Получаем пользователя
     user = dialog_manager.middleware_data[USER_KEY]
     
     try:
-        # Зачисляем только выбранную сумму бонусов на основной баланс
-        await referral_service.withdraw_pending_rewards(
-            user.telegram_id,
-            ReferralRewardType.MONEY,
-            amount=amount,
-        )
-        
-        # Добавляем на основной баланс
-        await user_service.add_to_balance(user, amount)
+        # Зачисляем только выбранную сумму бонусов на основной баланс одной транзакцией
+        amount = await balance_service.withdraw_bonus(user.telegram_id, amount=amount)
         
         # Обновляем данные пользователя в middleware
         user.balance += amount
@@ -1245,11 +1201,7 @@ async def on_accept_bonus_amount(
                     chat_id=callback.from_user.id,
                     text=i18n.get("ntf-bonus-activated", amount=amount),
                 )
-                await asyncio.sleep(5)
-                await callback.bot.delete_message(
-                    chat_id=callback.from_user.id,
-                    message_id=success_msg.message_id,
-                )
+                await delete_message_later(success_msg, 5)
             except Exception:
                 pass
         
@@ -1396,11 +1348,7 @@ async def on_balance_transfer_recipient_input(
         error_msg = await message.answer(
             text=i18n.get("ntf-balance-transfer-invalid-id"),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         try:
             await message.delete()
         except Exception:
@@ -1414,11 +1362,7 @@ async def on_balance_transfer_recipient_input(
         error_msg = await message.answer(
             text=i18n.get("ntf-balance-transfer-user-not-found"),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         try:
             await message.delete()
         except Exception:
@@ -1430,11 +1374,7 @@ async def on_balance_transfer_recipient_input(
         error_msg = await message.answer(
             text=i18n.get("ntf-balance-transfer-self"),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         try:
             await message.delete()
         except Exception:
@@ -1571,11 +1511,7 @@ async def on_balance_transfer_amount_manual_value_input(
         error_msg = await message.answer(
             text=i18n.get("ntf-balance-invalid-amount"),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         try:
             await message.delete()
         except Exception:
@@ -1593,11 +1529,7 @@ async def on_balance_transfer_amount_manual_value_input(
         error_msg = await message.answer(
             text=i18n.get("ntf-balance-transfer-amount-range", min=min_amount, max=max_amount),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         try:
             await message.delete()
         except Exception:
@@ -1716,12 +1648,11 @@ async def on_balance_transfer_send(
     user_service: FromDishka[UserService],
     settings_service: FromDishka[SettingsService],
     notification_service: FromDishka[NotificationService],
-    balance_transfer_service: FromDishka[BalanceTransferService],
+    balance_service: FromDishka[BalanceService],
     referral_service: FromDishka[ReferralService],
     i18n: FromDishka[TranslatorRunner],
 ) -> None:
     """Отправка перевода - валидация и выполнение."""
-    from src.services.balance_transfer import BalanceTransferService
     from src.core.enums import ReferralRewardType
     
     # Ответим на callback как можно раньше чтобы не истёк ID
@@ -1741,11 +1672,7 @@ async def on_balance_transfer_send(
         error_msg = await callback.message.answer(
             text=i18n.get("ntf-balance-transfer-incomplete"),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         return
     
     # Получаем настройки для расчета комиссии
@@ -1775,11 +1702,7 @@ async def on_balance_transfer_send(
         error_msg = await callback.message.answer(
             text=i18n.get("ntf-balance-transfer-insufficient", required=total, balance=available_balance),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         return
     
     # Получаем получателя ПЕРЕД снятием средств
@@ -1788,71 +1711,28 @@ async def on_balance_transfer_send(
         error_msg = await callback.message.answer(
             text=i18n.get("ntf-balance-transfer-user-not-found"),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
         return
     
     # ВСЕ ПРОВЕРКИ ПРОЙДЕНЫ - выполняем перевод
     try:
-        # Списываем у отправителя с учетом режима баланса
-        from_main, from_bonus = await user_service.subtract_from_combined_balance(
-            user=user,
-            amount=total,
-            referral_balance=referral_balance,
+        # Списание у отправителя, зачисление получателю и запись в историю переводов
+        # проходят одной транзакцией. Повторная доставка того же нажатия не
+        # проведёт перевод второй раз.
+        from_main, from_bonus = await balance_service.transfer(
+            sender_telegram_id=user.telegram_id,
+            recipient_telegram_id=recipient.telegram_id,
+            amount=amount,
+            commission=commission,
             is_combined=is_balance_combined,
+            message=transfer_data.get("message"),
+            idempotency_key=f"transfer:{user.telegram_id}:{callback.id}",
         )
         
-        # Если списали с бонусного баланса, нужно вывести награды
-        if from_bonus > 0:
-            withdrawn = await referral_service.withdraw_pending_rewards(
-                telegram_id=user.telegram_id,
-                reward_type=ReferralRewardType.MONEY,
-                amount=from_bonus,
-            )
-            logger.info(
-                f"Withdrawn {withdrawn} from referral rewards for transfer "
-                f"(user={user.telegram_id}, total={total})"
-            )
-        
-        # Зачисляем получателю - в отдельном try-catch с откатом
-        try:
-            await user_service.add_to_balance(recipient, amount)
-        except Exception as e:
-            # Откатываем снятие денег со счета отправителя
-            logger.error(f"Failed to add balance to recipient: {e}. Rolling back sender balance.")
-            # Возвращаем деньги на основной баланс
-            await user_service.add_to_balance(user, from_main)
-            # Если были списаны бонусные деньги, их откат сложнее - просто логируем ошибку
-            if from_bonus > 0:
-                logger.error(
-                    f"Cannot rollback bonus withdrawal of {from_bonus} for user {user.telegram_id}. "
-                    f"Manual intervention may be required."
-                )
-            raise
-        
         # Обновляем баланс в middleware_data
         user.balance -= from_main
         dialog_manager.middleware_data[USER_KEY] = user
-        
-        logger.info(
-            f"Balance transfer: {user.telegram_id} -> {recipient.telegram_id}, "
-            f"amount={amount}, commission={commission}, from_main={from_main}, from_bonus={from_bonus}"
-        )
-        
-        # Сохраняем запись о переводе в историю
-        try:
-            await balance_transfer_service.create_transfer(
-                sender_telegram_id=user.telegram_id,
-                recipient_telegram_id=recipient.telegram_id,
-                amount=amount,
-                commission=commission,
-                message=transfer_data.get("message"),
-            )
-        except Exception as e:
-            logger.error(f"Failed to save transfer history: {e}")
+        recipient.balance += amount
         
         # Получаем сообщение если оно есть и экранируем HTML-символы
         message_text = transfer_data.get("message", "")
@@ -1884,11 +1764,12 @@ async def on_balance_transfer_send(
                 message=escaped_message,
             )
             
-            # Запускаем отложенную задачу (НЕ ждём результата - fire and forget)
-            await send_delayed_transfer_notification_task.kiq(
+            # Ставим задачу в очередь отложенных (НЕ занимает воркер на время задержки)
+            await kiq_delayed(
+                send_delayed_transfer_notification_task,
+                8,
                 recipient_telegram_id=recipient.telegram_id,
                 notification_text=notification_text,
-                delay_seconds=8,
             )
             logger.debug(f"Scheduled delayed notification for {recipient.telegram_id} (+8 sec)")
         except Exception as e:
@@ -1967,11 +1848,7 @@ async def on_balance_transfer_send(
         error_msg = await callback.message.answer(
             text=i18n.get("ntf-balance-transfer-error"),
         )
-        await asyncio.sleep(5)
-        try:
-            await error_msg.delete()
-        except Exception:
-            pass
+        await delete_message_later(error_msg, 5)
 
 
 async def on_balance_transfer_cancel(
@@ -17,11 +17,21 @@ from loguru import logger
 from src.bot.keyboards import get_user_keyboard
 from src.bot.states import Subscription, MainMenu
 from src.core.constants import PURCHASE_PREFIX, USER_KEY
-from src.core.enums import Currency, PaymentGatewayType, PurchaseType, ReferralLevel, ReferralRewardType, TransactionStatus
+from src.core.enums import (
+    BalanceEntryReason,
+    Currency,
+    PaymentGatewayType,
+    PurchaseType,
+    ReferralLevel,
+    ReferralRewardType,
+    TransactionStatus,
+)
 from src.core.utils.adapter import DialogDataAdapter
 from src.core.utils.formatters import format_user_log as log, i18n_format_bytes_to_unit, i18n_format_traffic_limit
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import PlanDto, PlanSnapshotDto, UserDto, TransactionDto
+from src.infrastructure.taskiq.tasks.notifications import delete_message_later
+from src.services.balance import BalanceService, InsufficientBalanceError
 from src.services.notification import NotificationService
 from src.services.payment_gateway import PaymentGatewayService
 from src.services.plan import PlanService
@@ -724,6 +734,7 @@ async def on_confirm_balance_payment(
     settings_service: FromDishka[SettingsService],
     extra_device_service: FromDishka[ExtraDeviceService],
     referral_service: FromDishka[ReferralService],
+    balance_service: FromDishka[BalanceService],
 ) -> None:
     """Handle confirmation of balance payment."""
     middleware_user: UserDto = dialog_manager.middleware_data[USER_KEY]
@@ -800,22 +811,15 @@ async def on_confirm_balance_payment(
             purchase_type=purchase_type,
         )
         
-        # Deduct from balance (with COMBINED mode support)
-        from_main, from_bonus = await user_service.subtract_from_combined_balance(
-            user=fresh_user,
+        # Deduct from main and bonus balance (with COMBINED mode support) in one transaction
+        from_main, from_bonus = await balance_service.debit(
+            telegram_id=fresh_user.telegram_id,
             amount=int(price.final_amount),
-            referral_balance=referral_balance,
             is_combined=is_balance_combined,
+            reason=BalanceEntryReason.PURCHASE,
+            idempotency_key=f"purchase:{result.id}",
         )
         
-        # Если списали с бонусного, отмечаем награды как использованные
-        if from_bonus > 0:
-            await referral_service.withdraw_pending_rewards(
-                telegram_id=fresh_user.telegram_id,
-                reward_type=ReferralRewardType.MONEY,
-                amount=from_bonus,
-            )
-        
         try:
             # Запускаем обработку оплаты СИНХРОННО (для мгновенного обновления данных)
             # Это гарантирует, что подписка уже обновлена к моменту показа экрана успеха
@@ -824,17 +828,13 @@ async def on_confirm_balance_payment(
             # При ошибке обработки подписки - возвращаем деньги на баланс
             logger.error(f"{log(user)} Failed to process subscription, refunding balance: {process_error}", exc_info=True)
             
-            # Возвращаем деньги на основной баланс
-            if from_main > 0:
-                await user_service.add_to_balance(user=fresh_user, amount=from_main)
-            
-            # Возвращаем бонусы (восстанавливаем pending rewards)
-            if from_bonus > 0:
-                await referral_service.restore_pending_rewards(
-                    telegram_id=fresh_user.telegram_id,
-                    reward_type=ReferralRewardType.MONEY,
-                    amount=from_bonus,
-                )
+            # Возвращаем деньги на основной баланс и бонусы (pending rewards)
+            await balance_service.refund(
+                telegram_id=fresh_user.telegram_id,
+                from_main=from_main,
+                from_bonus=from_bonus,
+                idempotency_key=f"refund:{result.id}",
+            )
             
             await notification_service.notify_user(
                 user=user,
@@ -1416,7 +1416,6 @@ async def on_device_delete(
 ) -> None:
     """Удаление устройства или пометка extra слота на удаление."""
     import time
-    import asyncio
     
     await sub_manager.load_data()
     slot_id = sub_manager.item_id  # Получаем индекс слота
@@ -1463,14 +1462,7 @@ async def on_device_delete(
             sub_manager.dialog_data["warning_message_id"] = warning_msg.message_id
             
             # Удаляем сообщение через 5 секунд
-            async def delete_warning():
-                await asyncio.sleep(5)
-                try:
-                    await warning_msg.delete()
-                except Exception:
-                    pass
-            
-            asyncio.create_task(delete_warning())
+            await delete_message_later(warning_msg, 5)
             await callback.answer()
             return
         
@@ -1854,6 +1846,7 @@ async def on_add_device_confirm(
     pricing_service: FromDishka[PricingService],
     transaction_service: FromDishka[TransactionService],
     referral_service: FromDishka[ReferralService],
+    balance_service: FromDishka[BalanceService],
     i18n: FromDishka[TranslatorRunner],
 ) -> None:
     """Обработка подтверждения покупки устройств."""
@@ -1933,21 +1926,20 @@ async def on_add_device_confirm(
             )
             return
         
-        # Списываем с баланса (with COMBINED mode support)
-        from_main, from_bonus = await user_service.subtract_from_combined_balance(
-            user=fresh_user,
-            amount=total_price,
-            referral_balance=referral_balance,
-            is_combined=is_balance_combined,
-        )
-        
-        # Если списали с бонусного, отмечаем награды как использованные
-        if from_bonus > 0:
-            await referral_service.withdraw_pending_rewards(
+        # Списываем с основного и бонусного баланса (with COMBINED mode support)
+        try:
+            await balance_service.debit(
                 telegram_id=fresh_user.telegram_id,
-                reward_type=ReferralRewardType.MONEY,
-                amount=from_bonus,
+                amount=total_price,
+                is_combined=is_balance_combined,
+                reason=BalanceEntryReason.EXTRA_DEVICES,
+            )
+        except InsufficientBalanceError:
+            await notification_service.notify_user(
+                user=user,
+                payload=MessagePayload(i18n_key="ntf-subscription-insufficient-balance"),
             )
+            return
         
         # Увеличиваем лимит устройств
         subscription = fresh_user.current_subscription
@@ -2136,7 +2128,6 @@ async def on_delete_extra_device_purchase(
 ) -> None:
     """Пометить покупку дополнительных устройств на удаление."""
     import time
-    import asyncio
     from aiogram_dialog import SubManager
     
     user: UserDto = dialog_manager.middleware_data[USER_KEY]
@@ -2183,14 +2174,7 @@ async def on_delete_extra_device_purchase(
         )
         
         # Удаляем сообщение через 5 секунд
-        async def delete_warning():
-            await asyncio.sleep(5)
-            try:
-                await warning_msg.delete()
-            except Exception:
-                pass
-        
-        asyncio.create_task(delete_warning())
+        await delete_message_later(warning_msg, 5)
         await callback.answer()
         return
     
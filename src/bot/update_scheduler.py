@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Final, Hashable, Optional
+
+from aiogram import Bot
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+from loguru import logger
+
+UpdateHandler = Callable[[Bot, Update], Awaitable[None]]
+
+# Ожидание в очереди дольше этого времени попадает в лог как признак перегрузки
+WAIT_WARNING: Final[float] = 5.0
+# Не чаще одного предупреждения о перегрузке за этот интервал
+WARNING_INTERVAL: Final[float] = 60.0
+
+
+class UpdateScheduler:
+    """Планировщик обработки апдейтов, пришедших вебхуками основного и зеркальных ботов.
+
+    Апдейты одного чата обрабатываются строго по очереди, а одновременно
+    обрабатывается не больше `max_concurrency` апдейтов, чтобы всплеск не занимал
+    весь пул соединений с БД. Когда принято `max_pending` необработанных апдейтов,
+    новые отклоняются и Telegram повторяет их доставку позже.
+    """
+
+    def __init__(self, max_concurrency: int, max_pending: int) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task[None]] = set()
+        # Последний принятый апдейт каждого чата, следующий ждёт его завершения
+        self._tails: dict[Hashable, asyncio.Task[None]] = {}
+
+        self._active = 0
+        self._processed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._warned_at = 0.0
+
+    def submit(self, bot: Bot, update: Update, handler: UpdateHandler) -> bool:
+        if len(self._tasks) >= self.max_pending:
+            self._rejected += 1
+            self._warn(f"Update scheduler is full, update '{update.update_id}' rejected")
+            return False
+
+        key = self._get_key(bot, update)
+        previous = self._tails.get(key) if key else None
+        task = asyncio.create_task(self._run(key, previous, bot, update, handler))
+
+        if key:
+            self._tails[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            if not task.done():
+                task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tails.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._tasks),
+            "active": self._active,
+            "chats": len(self._tails),
+            "processed": self._processed,
+            "rejected": self._rejected,
+            "avg_wait": self._wait_total / self._processed if self._processed else 0.0,
+            "max_wait": self._wait_max,
+        }
+
+    async def _run(
+        self,
+        key: Optional[Hashable],
+        previous: Optional[asyncio.Task[None]],
+        bot: Bot,
+        update: Update,
+        handler: UpdateHandler,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+
+        try:
+            if previous and not previous.done():
+                await asyncio.wait([previous])
+
+            async with self._semaphore:
+                wait = loop.time() - queued_at
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+                if wait >= WAIT_WARNING:
+                    self._warn(f"Update '{update.update_id}' waited {wait:.1f}s for processing")
+
+                self._active += 1
+                try:
+                    await handler(bot, update)
+                finally:
+                    self._active -= 1
+                    self._processed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as exception:
+            logger.exception(f"Error processing update '{update.update_id}': {exception}")
+        finally:
+            if key and self._tails.get(key) is asyncio.current_task():
+                del self._tails[key]
+
+    def _warn(self, message: str) -> None:
+        now = asyncio.get_running_loop().time()
+        if now - self._warned_at < WARNING_INTERVAL:
+            return
+        self._warned_at = now
+        logger.warning(f"{message}. Stats: {self.get_stats()}")
+
+    @staticmethod
+    def _get_key(bot: Bot, update: Update) -> Optional[Hashable]:
+        context = UserContextMiddleware.resolve_event_context(event=update)
+        if context.chat:
+            return bot.id, context.chat.id
+        if context.user:
+            return bot.id, context.user.id
+        return None
@@ -22,6 +22,10 @@ class BotConfig(BaseConfig, env_prefix="BOT_"):
     setup_commands: bool = True
     use_banners: bool = True
 
+    # Одновременно обрабатываемые апдейты и предел очереди, после которого они отклоняются
+    update_concurrency: int = 40
+    update_queue_size: int = 2000
+
     @property
     def webhook_path(self) -> str:
         return f"{API_V1}{BOT_WEBHOOK_PATH}"
@@ -68,9 +68,8 @@ IS_SUPER_DEV_KEY: Final[str] = "is_super_dev"
 TIME_1M: Final[int] = 60
 TIME_5M: Final[int] = TIME_1M * 5
 TIME_10M: Final[int] = TIME_1M * 10
+TIME_1H: Final[int] = TIME_1M * 60
+TIME_1D: Final[int] = TIME_1H * 24
 
 RECENT_REGISTERED_MAX_COUNT: Final[int] = 25
 RECENT_ACTIVITY_MAX_COUNT: Final[int] = 25
-
-BATCH_SIZE: Final[int] = 20
-BATCH_DELAY: Final[int] = 1
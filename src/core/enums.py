@@ -37,6 +37,18 @@ class BalanceMode(UpperStrEnum):
     SEPARATE = auto()  # Раздельный баланс с активацией бонусов
 
 
+class BalanceEntryReason(UpperStrEnum):
+    """Причина изменения основного баланса в журнале."""
+    TOPUP = auto()
+    PURCHASE = auto()
+    EXTRA_DEVICES = auto()
+    TRANSFER = auto()
+    REFERRAL_REWARD = auto()
+    BONUS_WITHDRAWAL = auto()
+    REFUND = auto()
+    ADMIN = auto()
+
+
 class BroadcastStatus(UpperStrEnum):
     PROCESSING = auto()
     COMPLETED = auto()
@@ -31,3 +31,77 @@ class UpdateInProgressKey(StorageKey, prefix="update_in_progress"): ...
 
 
 class CloseableMessagesKey(StorageKey, prefix="closeable_messages"): ...
+
+
+class StatisticsRollupKey(StorageKey, prefix="stats_rollup"):
+    bucket: str
+
+
+class StatisticsPayersKey(StorageKey, prefix="stats_payers"):
+    bucket: str
+
+
+class StatisticsTrialUsersKey(StorageKey, prefix="stats_trial_users"):
+    bucket: str
+
+
+class StatisticsConvertedUsersKey(StorageKey, prefix="stats_converted_users"):
+    bucket: str
+
+
+class ChannelMemberKey(StorageKey, prefix="channel_member"):
+    bot_id: int
+    chat_id: str
+    telegram_id: int
+
+
+class BroadcastLockKey(StorageKey, prefix="broadcast_lock"):
+    broadcast_id: int
+
+
+class BroadcastCheckpointKey(StorageKey, prefix="broadcast_checkpoint"):
+    broadcast_id: int
+
+
+class BroadcastClaimsKey(StorageKey, prefix="broadcast_claims"):
+    broadcast_id: int
+
+
+class RemnawaveEventsKey(StorageKey, prefix="remnawave_events"): ...
+
+
+class RemnawaveEventIdKey(StorageKey, prefix="remnawave_event_id"):
+    digest: str
+
+
+class RemnawaveUserModifiedKey(StorageKey, prefix="remnawave_user_modified"):
+    uuid: str
+
+
+class RemnawaveUserModifiedPendingKey(StorageKey, prefix="remnawave_user_modified_pending"):
+    uuid: str
+
+
+class ThrottleKey(StorageKey, prefix="throttle"):
+    telegram_id: int
+
+
+class ThrottleNotifyKey(StorageKey, prefix="throttle_notify"):
+    telegram_id: int
+
+
+class RecentActivityDebounceKey(StorageKey, prefix="recent_activity_debounce"):
+    telegram_id: int
+
+
+class MirrorUnreachableKey(StorageKey, prefix="mirror_unreachable"):
+    bot_id: int
+
+
+class DelayedTasksKey(StorageKey, prefix="delayed_tasks"): ...
+
+
+class DelayedTaskPayloadsKey(StorageKey, prefix="delayed_task_payloads"): ...
+
+
+class PlanCatalogVersionKey(StorageKey, prefix="plan_catalog_version"): ...
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Optional
+
+
+class AdaptiveTokenBucket:
+    """Token bucket с подстройкой скорости под лимиты Telegram (AIMD).
+
+    Каждая успешная отправка постепенно поднимает скорость до `max_rate`,
+    `RetryAfter` вдвое снижает её и приостанавливает выдачу токенов на
+    рекомендованное Telegram время.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        max_rate: float,
+        min_rate: float = 1.0,
+        increase_step: float = 1.0,
+        capacity: Optional[float] = None,
+    ) -> None:
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase_step = increase_step
+        self.capacity = capacity or max_rate
+
+        self._tokens = min(rate, self.capacity)
+        self._updated_at = asyncio.get_running_loop().time()
+        self._paused_until = 0.0
+        self._successes = 0
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            now = loop.time()
+            if self._paused_until > now:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self) -> None:
+        self._successes += 1
+        # Прибавляем шаг примерно раз в секунду работы без ошибок
+        if self._successes >= self.rate:
+            self._successes = 0
+            self.rate = min(self.rate + self.increase_step, self.max_rate)
+
+    def on_retry_after(self, retry_after: float) -> None:
+        now = asyncio.get_running_loop().time()
+        self._paused_until = max(self._paused_until, now + retry_after)
+        self._updated_at = self._paused_until
+        self.rate = max(self.rate / 2, self.min_rate)
+        self._tokens = 0
+        self._successes = 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self._updated_at, 0.0)
+        self._tokens = min(self._tokens + elapsed * self.rate, self.capacity)
+        self._updated_at = now
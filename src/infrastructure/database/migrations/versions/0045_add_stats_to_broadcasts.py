@@ -0,0 +1,34 @@
+"""Add stats column to broadcasts table.
+
+Revision ID: 0045
+Revises: 0044
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0045"
+down_revision: Union[str, None] = "0044"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add stats column to broadcasts."""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        ALTER TABLE broadcasts
+        ADD COLUMN IF NOT EXISTS stats JSON
+    """))
+
+
+def downgrade() -> None:
+    """Remove stats column from broadcasts."""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        ALTER TABLE broadcasts DROP COLUMN IF EXISTS stats
+    """))
@@ -0,0 +1,41 @@
+"""Add unique (broadcast_id, user_id) index to broadcast_messages table.
+
+Revision ID: 0046
+Revises: 0045
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0046"
+down_revision: Union[str, None] = "0045"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """One broadcast message per recipient, used to resume broadcasts."""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        DELETE FROM broadcast_messages a
+        USING broadcast_messages b
+        WHERE a.broadcast_id = b.broadcast_id
+          AND a.user_id = b.user_id
+          AND a.id > b.id
+    """))
+    conn.execute(sa.text("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_broadcast_messages_broadcast_id_user_id
+        ON broadcast_messages (broadcast_id, user_id)
+    """))
+
+
+def downgrade() -> None:
+    """Remove unique (broadcast_id, user_id) index."""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        DROP INDEX IF EXISTS ux_broadcast_messages_broadcast_id_user_id
+    """))
@@ -0,0 +1,34 @@
+"""Add index on plan id from subscriptions plan snapshot.
+
+Revision ID: 0047
+Revises: 0046
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0047"
+down_revision: Union[str, None] = "0046"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Subscriptions of a plan are selected when the plan is edited."""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_subscriptions_plan_id
+        ON subscriptions (((plan ->> 'id')::integer))
+    """))
+
+
+def downgrade() -> None:
+    """Remove index on plan id."""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        DROP INDEX IF EXISTS ix_subscriptions_plan_id
+    """))
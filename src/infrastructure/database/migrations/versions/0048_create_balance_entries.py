@@ -0,0 +1,63 @@
+"""Create balance entries ledger.
+
+Revision ID: 0048
+Revises: 0047
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0048"
+down_revision: Union[str, None] = "0047"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Append-only journal of main balance changes."""
+    balance_entry_reason_enum = sa.Enum(
+        "TOPUP",
+        "PURCHASE",
+        "EXTRA_DEVICES",
+        "TRANSFER",
+        "REFERRAL_REWARD",
+        "BONUS_WITHDRAWAL",
+        "REFUND",
+        "ADMIN",
+        name="balance_entry_reason",
+    )
+
+    op.create_table(
+        "balance_entries",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_telegram_id", sa.BigInteger(), nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("balance_after", sa.Integer(), nullable=False),
+        sa.Column("reason", balance_entry_reason_enum, nullable=False),
+        sa.Column("idempotency_key", sa.String(128), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('UTC', now())"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_telegram_id"], ["users.telegram_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("idempotency_key", name="uq_balance_entries_idempotency_key"),
+    )
+    op.create_index(
+        "ix_balance_entries_user_created",
+        "balance_entries",
+        ["user_telegram_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Remove balance entries ledger."""
+    op.drop_index("ix_balance_entries_user_created", table_name="balance_entries")
+    op.drop_table("balance_entries")
+    sa.Enum(name="balance_entry_reason").drop(op.get_bind(), checkfirst=True)
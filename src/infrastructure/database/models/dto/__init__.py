@@ -18,6 +18,17 @@ from .plan import PlanDto, PlanDurationDto, PlanPriceDto, PlanSnapshotDto
 from .promocode import PromocodeActivationDto, PromocodeDto
 from .referral import ReferralDto, ReferralRewardDto
 from .settings import ExtraDeviceSettingsDto, FeatureSettingsDto, GlobalDiscountSettingsDto, ReferralSettingsDto, SettingsDto, SystemNotificationDto, UserNotificationDto
+from .squad import SquadCatalogDto, SquadDto
+from .statistics import (
+    GatewayStatisticsDto,
+    PlansStatisticsDto,
+    PlanStatisticsDto,
+    PromocodesStatisticsDto,
+    ReferralsStatisticsDto,
+    SubscriptionsStatisticsDto,
+    TransactionsStatisticsDto,
+    UsersStatisticsDto,
+)
 from .subscription import BaseSubscriptionDto, RemnaSubscriptionDto, SubscriptionDto
 from .transaction import BaseTransactionDto, PriceDetailsDto, TransactionDto
 from .user import BaseUserDto, UserDto
@@ -60,9 +71,19 @@ __all__ = [
     "ReferralDto",
     "ReferralRewardDto",
     "SettingsDto",
+    "SquadCatalogDto",
+    "SquadDto",
     "ReferralSettingsDto",
     "SystemNotificationDto",
     "UserNotificationDto",
+    "GatewayStatisticsDto",
+    "PlansStatisticsDto",
+    "PlanStatisticsDto",
+    "PromocodesStatisticsDto",
+    "ReferralsStatisticsDto",
+    "SubscriptionsStatisticsDto",
+    "TransactionsStatisticsDto",
+    "UsersStatisticsDto",
     "SubscriptionDto",
     "RemnaSubscriptionDto",
     "PriceDetailsDto",
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
 from pydantic import Field
@@ -22,6 +22,7 @@ class BroadcastDto(TrackableDto):
     success_count: int = 0
     failed_count: int = 0
     payload: MessagePayload
+    stats: Optional[dict[str, Any]] = None
 
     messages: Optional[list["BroadcastMessageDto"]] = []
 
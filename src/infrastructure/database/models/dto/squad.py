@@ -0,0 +1,23 @@
+from uuid import UUID
+
+from pydantic import Field
+
+from .base import BaseDto
+
+
+class SquadDto(BaseDto):
+    uuid: UUID
+    name: str
+
+
+class SquadCatalogDto(BaseDto):
+    internal_squads: list[SquadDto] = Field(default_factory=list)
+    external_squads: list[SquadDto] = Field(default_factory=list)
+
+    @property
+    def internal_uuids(self) -> set[UUID]:
+        return {squad.uuid for squad in self.internal_squads}
+
+    @property
+    def external_uuids(self) -> set[UUID]:
+        return {squad.uuid for squad in self.external_squads}
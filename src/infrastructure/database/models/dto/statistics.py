@@ -0,0 +1,99 @@
+from typing import Optional
+
+from src.core.enums import Currency, PaymentGatewayType, PromocodeRewardType
+
+from .base import BaseDto
+
+
+class UsersStatisticsDto(BaseDto):
+    total_users: int = 0
+    new_users_daily: int = 0
+    new_users_weekly: int = 0
+    new_users_monthly: int = 0
+
+    users_with_subscription: int = 0
+    users_with_trial: int = 0
+
+    blocked_users: int = 0
+    bot_blocked_users: int = 0
+
+    paying_users: int = 0
+    trial_users: int = 0
+    converted_from_trial: int = 0
+
+    @property
+    def users_without_subscription(self) -> int:
+        return self.total_users - self.users_with_subscription
+
+
+class GatewayStatisticsDto(BaseDto):
+    gateway_type: PaymentGatewayType
+
+    total: float = 0.0
+    daily: float = 0.0
+    weekly: float = 0.0
+    monthly: float = 0.0
+    discount: float = 0.0
+
+    completed: int = 0
+    paid_count: int = 0
+
+    @property
+    def average_check(self) -> int:
+        return round(self.total / self.paid_count) if self.paid_count > 0 else 0
+
+
+class TransactionsStatisticsDto(BaseDto):
+    total_transactions: int = 0
+    completed_transactions: int = 0
+    free_transactions: int = 0
+
+    gateways: list[GatewayStatisticsDto] = []
+
+
+class SubscriptionsStatisticsDto(BaseDto):
+    total_active_subscriptions: int = 0
+    total_expire_subscriptions: int = 0
+    active_trial_subscriptions: int = 0
+    expiring_subscriptions: int = 0
+    total_unlimited: int = 0
+    total_traffic: int = 0
+    total_devices: int = 0
+
+
+class PlanStatisticsDto(BaseDto):
+    plan_id: int
+
+    total_subscriptions: int = 0
+    active_subscriptions: int = 0
+    popular_duration: int = 0
+
+    income: dict[Currency, float] = {}
+
+
+class PlansStatisticsDto(BaseDto):
+    plans: list[PlanStatisticsDto] = []
+
+    def get(self, plan_id: int) -> Optional[PlanStatisticsDto]:
+        return next((p for p in self.plans if p.plan_id == plan_id), None)
+
+
+class PromocodesStatisticsDto(BaseDto):
+    total_promo_activations: int = 0
+    most_popular_promo: Optional[str] = None
+
+    rewards: dict[PromocodeRewardType, int] = {}
+
+    def get_reward_total(self, reward_type: PromocodeRewardType) -> int:
+        return self.rewards.get(reward_type, 0)
+
+
+class ReferralsStatisticsDto(BaseDto):
+    total_referrals: int = 0
+    first_level_referrals: int = 0
+    second_level_referrals: int = 0
+    total_referrers: int = 0
+
+    issued_money_rewards: int = 0
+    issued_days_rewards: int = 0
+    pending_money_rewards: int = 0
@@ -1,3 +1,4 @@
+from .balance_entry import BalanceEntry
 from .balance_transfer import BalanceTransfer
 from .base import BaseSql
 from .broadcast import Broadcast, BroadcastMessage
@@ -13,6 +14,7 @@ from .transaction import Transaction
 from .user import User
 
 __all__ = [
+    "BalanceEntry",
     "BalanceTransfer",
     "BaseSql",
     "Broadcast",
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.enums import BalanceEntryReason
+
+from .base import BaseSql
+from .timestamp import NOW_FUNC
+
+
+class BalanceEntry(BaseSql):
+    """Запись журнала изменений основного баланса.
+
+    Журнал только дополняется: каждое изменение `users.balance` пишется сюда
+    тем же запросом, что и само изменение. Ключ идемпотентности не даёт
+    провести одну операцию дважды.
+    """
+
+    __tablename__ = "balance_entries"
+    __table_args__ = (Index("ix_balance_entries_user_created", "user_telegram_id", "created_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_telegram_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.telegram_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # Изменение со знаком и баланс после него
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    balance_after: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    reason: Mapped[BalanceEntryReason] = mapped_column(
+        Enum(
+            BalanceEntryReason,
+            name="balance_entry_reason",
+            create_constraint=True,
+            validate_strings=True,
+        ),
+        nullable=False,
+    )
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(128), nullable=True, unique=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=NOW_FUNC,
+        nullable=False,
+    )
@@ -1,6 +1,7 @@
+from typing import Any, Optional
 from uuid import UUID
 
-from sqlalchemy import JSON, BigInteger, Enum, ForeignKey, Integer
+from sqlalchemy import JSON, BigInteger, Enum, ForeignKey, Index, Integer
 from sqlalchemy import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -41,6 +42,7 @@ class Broadcast(BaseSql, TimestampMixin):
     success_count: Mapped[int] = mapped_column(Integer, nullable=False)
     failed_count: Mapped[int] = mapped_column(Integer, nullable=False)
     payload: Mapped[MessagePayload] = mapped_column(JSON, nullable=False)
+    stats: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
 
     messages: Mapped[list["BroadcastMessage"]] = relationship(
         back_populates="broadcast",
@@ -51,6 +53,14 @@ class Broadcast(BaseSql, TimestampMixin):
 
 class BroadcastMessage(BaseSql):
     __tablename__ = "broadcast_messages"
+    __table_args__ = (
+        Index(
+            "ux_broadcast_messages_broadcast_id_user_id",
+            "broadcast_id",
+            "user_id",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
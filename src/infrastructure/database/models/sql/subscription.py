@@ -10,7 +10,19 @@ from datetime import datetime
 from uuid import UUID
 
 from remnapy.enums import TrafficLimitStrategy
-from sqlalchemy import ARRAY, JSON, BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -23,6 +35,7 @@ from .timestamp import TimestampMixin
 
 class Subscription(BaseSql, TimestampMixin):
     __tablename__ = "subscriptions"
+    __table_args__ = (Index("ix_subscriptions_plan_id", text("((plan ->> 'id')::integer)")),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
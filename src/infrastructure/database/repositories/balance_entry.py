@@ -0,0 +1,90 @@
+from typing import Optional
+
+from sqlalchemy import BigInteger, Row, String, exists, func, insert, literal, select, update
+
+from src.core.enums import BalanceEntryReason
+from src.infrastructure.database.models.sql import BalanceEntry, User
+
+from .base import BaseRepository
+
+
+class BalanceEntryRepository(BaseRepository):
+    """Журнал баланса: изменение `users.balance` и запись о нём одним запросом."""
+
+    async def apply(
+        self,
+        telegram_id: int,
+        amount: int,
+        reason: BalanceEntryReason,
+        idempotency_key: Optional[str] = None,
+        up_to: bool = False,
+    ) -> Optional[Row[tuple[int, int]]]:
+        """Меняет баланс на `amount` и возвращает (изменение, баланс после).
+
+        Списание проходит целиком, только если баланс не уйдёт в минус. С `up_to`
+        списывается сколько есть, но не больше `-amount`. `None`, если средств
+        не хватило, пользователь не найден или операция с таким ключом уже была.
+        """
+        conditions = [User.telegram_id == telegram_id]
+        if idempotency_key is not None:
+            conditions.append(~exists().where(BalanceEntry.idempotency_key == idempotency_key))
+
+        if up_to and amount < 0:
+            # Прежний баланс нужен для суммы списания, строка блокируется в том же запросе
+            previous = (
+                select(User.telegram_id, User.balance.label("balance"))
+                .where(User.telegram_id == telegram_id)
+                .with_for_update()
+                .subquery("previous")
+            )
+            conditions.append(User.telegram_id == previous.c.telegram_id)
+            updated = (
+                update(User)
+                .where(*conditions)
+                .values(balance=User.balance - func.least(User.balance, -amount))
+                .returning(
+                    (User.balance - previous.c.balance).label("amount"),
+                    User.balance.label("balance_after"),
+                )
+                .cte("updated")
+            )
+        else:
+            conditions.append(User.balance + amount >= 0)
+            updated = (
+                update(User)
+                .where(*conditions)
+                .values(balance=User.balance + amount)
+                .returning(
+                    literal(amount).label("amount"),
+                    User.balance.label("balance_after"),
+                )
+                .cte("updated")
+            )
+
+        query = (
+            insert(BalanceEntry)
+            .from_select(
+                ["user_telegram_id", "amount", "balance_after", "reason", "idempotency_key"],
+                select(
+                    literal(telegram_id, BigInteger),
+                    updated.c.amount,
+                    updated.c.balance_after,
+                    literal(reason, BalanceEntry.reason.type),
+                    literal(idempotency_key, String),
+                ),
+            )
+            .returning(BalanceEntry.amount, BalanceEntry.balance_after)
+        )
+        result = await self.session.execute(query)
+        return result.one_or_none()
+
+    async def get_by_idempotency_key(self, idempotency_key: str) -> Optional[BalanceEntry]:
+        return await self._get_one(BalanceEntry, BalanceEntry.idempotency_key == idempotency_key)
+
+    async def get_by_user(self, telegram_id: int, limit: int = 50) -> list[BalanceEntry]:
+        return await self._get_many(
+            BalanceEntry,
+            BalanceEntry.user_telegram_id == telegram_id,
+            order_by=BalanceEntry.id.desc(),
+            limit=limit,
+        )
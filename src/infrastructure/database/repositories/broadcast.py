@@ -1,8 +1,11 @@
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import update
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import noload
 
+from src.core.enums import BroadcastMessageStatus, BroadcastStatus
 from src.infrastructure.database.models.sql import Broadcast, BroadcastMessage
 
 from .base import BaseRepository
@@ -12,12 +15,46 @@ class BroadcastRepository(BaseRepository):
     async def create(self, broadcast: Broadcast) -> Broadcast:
         return await self.create_instance(broadcast)
 
-    async def create_messages(self, messages: list[BroadcastMessage]) -> list[BroadcastMessage]:
-        return await self.create_instances(messages)
+    async def insert_messages(self, data: list[dict[str, Any]]) -> None:
+        if not data:
+            return
+
+        # Получатель, уже записанный до перезапуска рассылки, не перезаписывается
+        await self.session.execute(insert(BroadcastMessage).on_conflict_do_nothing(), data)
+
+    async def count_messages(self, broadcast_id: int) -> dict[BroadcastMessageStatus, int]:
+        result = await self.session.execute(
+            select(BroadcastMessage.status, func.count())
+            .where(BroadcastMessage.broadcast_id == broadcast_id)
+            .group_by(BroadcastMessage.status)
+        )
+        return dict(result.all())
 
     async def get(self, task_id: UUID) -> Optional[Broadcast]:
         return await self._get_one(Broadcast, Broadcast.task_id == task_id)
 
+    async def get_by_id(self, broadcast_id: int) -> Optional[Broadcast]:
+        # Сообщения не нужны для отправки, а у большой рассылки их сотни тысяч
+        return await self.session.scalar(
+            select(Broadcast)
+            .options(noload(Broadcast.messages))
+            .where(Broadcast.id == broadcast_id)
+        )
+
+    async def get_processing(self) -> Sequence[Row[Any]]:
+        result = await self.session.execute(
+            select(Broadcast.id, Broadcast.audience).where(
+                Broadcast.status == BroadcastStatus.PROCESSING
+            )
+        )
+        return result.all()
+
+    async def get_status(self, task_id: UUID) -> Optional[BroadcastStatus]:
+        # Без загрузки сообщений рассылки (relationship с selectin)
+        return await self.session.scalar(
+            select(Broadcast.status).where(Broadcast.task_id == task_id)
+        )
+
     async def get_all(self) -> list[Broadcast]:
         return await self._get_many(Broadcast, order_by=Broadcast.id.asc())
 
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .balance_entry import BalanceEntryRepository
 from .balance_transfer import BalanceTransferRepository
 from .broadcast import BroadcastRepository
 from .extra_device_purchase import ExtraDevicePurchaseRepository
@@ -9,6 +10,7 @@ from .plan import PlanRepository
 from .promocode import PromocodeRepository
 from .referral import ReferralRepository
 from .settings import SettingsRepository
+from .statistics import StatisticsRepository
 from .subscription import SubscriptionRepository
 from .transaction import TransactionRepository
 from .user import UserRepository
@@ -17,6 +19,7 @@ from .user import UserRepository
 class RepositoriesFacade:
     session: AsyncSession
 
+    balance_entries: BalanceEntryRepository
     balance_transfers: BalanceTransferRepository
     gateways: PaymentGatewayRepository
     plans: PlanRepository
@@ -29,10 +32,12 @@ class RepositoriesFacade:
     referrals: ReferralRepository
     extra_device_purchases: ExtraDevicePurchaseRepository
     mirror_bots: MirrorBotRepository
+    statistics: StatisticsRepository
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
+        self.balance_entries = BalanceEntryRepository(session)
         self.balance_transfers = BalanceTransferRepository(session)
         self.gateways = PaymentGatewayRepository(session)
         self.plans = PlanRepository(session)
@@ -45,3 +50,4 @@ class RepositoriesFacade:
         self.referrals = ReferralRepository(session)
         self.extra_device_purchases = ExtraDevicePurchaseRepository(session)
         self.mirror_bots = MirrorBotRepository(session)
+        self.statistics = StatisticsRepository(session)
@@ -46,5 +46,8 @@ class PlanRepository(BaseRepository):
     async def get_by_tag(self, tag: str) -> Optional[Plan]:
         return await self._get_one(Plan, Plan.tag == tag)
 
+    async def set_order_index(self, plan_id: int, order_index: int) -> None:
+        await self._update(Plan, Plan.id == plan_id, load_result=False, order_index=order_index)
+
     async def get_max_index(self) -> Optional[int]:
         return await self.session.scalar(select(func.max(Plan.order_index)))
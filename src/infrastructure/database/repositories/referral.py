@@ -84,13 +84,23 @@ class ReferralRepository(BaseRepository):
     async def get_pending_rewards_by_user(
         self, telegram_id: int, reward_type: ReferralRewardType
     ) -> List[ReferralReward]:
-        """Get rewards that have not been issued yet."""
-        conditions = [
-            ReferralReward.user_telegram_id == telegram_id,
-            ReferralReward.type == reward_type,
-            ReferralReward.is_issued == False,
-        ]
-        return await self._get_many(ReferralReward, *conditions)
+        """Get rewards that have not been issued yet.
+
+        Rows are locked until the end of the transaction, so concurrent
+        withdrawals cannot issue the same reward twice.
+        """
+        query = (
+            select(ReferralReward)
+            .where(
+                ReferralReward.user_telegram_id == telegram_id,
+                ReferralReward.type == reward_type,
+                ReferralReward.is_issued == False,
+            )
+            .order_by(ReferralReward.id)
+            .with_for_update()
+        )
+        result = await self.session.execute(query)
+        return list(result.unique().scalars().all())
 
     async def update_reward(self, reward_id: int, **data: Any) -> Optional[ReferralReward]:
         return await self._update(ReferralReward, ReferralReward.id == reward_id, **data)
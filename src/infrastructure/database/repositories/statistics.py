@@ -0,0 +1,294 @@
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Final, Sequence
+
+from sqlalchemy import Date, Row, and_, cast, distinct, exists, extract, func, or_, select
+from sqlalchemy.orm import aliased
+
+from src.core.enums import (
+    ReferralLevel,
+    ReferralRewardType,
+    SubscriptionStatus,
+    TransactionStatus,
+)
+from src.infrastructure.database.models.sql import (
+    Promocode,
+    PromocodeActivation,
+    Referral,
+    ReferralReward,
+    Subscription,
+    Transaction,
+    User,
+)
+
+from .base import BaseRepository
+
+WEEKLY_WINDOW: Final[timedelta] = timedelta(days=8)
+
+UNLIMITED_EXPIRE_YEAR: Final[int] = 2099
+
+STREAM_PARTITION_SIZE: Final[int] = 5000
+
+
+class StatisticsRepository(BaseRepository):
+    """Агрегирующие запросы для статистики панели управления.
+
+    Все подсчёты выполняются в Postgres (COUNT/SUM с FILTER и GROUP BY),
+    наружу возвращаются только компактные строки без загрузки ORM-моделей.
+    Накопительные счётчики ведёт `StatisticsRollups`, здесь для них остаются
+    только посуточные запросы сверки.
+    """
+
+    final_amount = Transaction.pricing["final_amount"].as_float()
+    original_amount = Transaction.pricing["original_amount"].as_float()
+    subscription_plan_id = Subscription.plan["id"].as_integer()
+    subscription_duration = Subscription.plan["duration"].as_integer()
+    transaction_plan_id = Transaction.plan["id"].as_integer()
+
+    async def get_users_statistics(self) -> Row[Any]:
+        query = (
+            select(
+                func.count(User.id).label("total_users"),
+                func.count(User.current_subscription_id).label("users_with_subscription"),
+                func.count(Subscription.id)
+                .filter(Subscription.is_trial.is_(True))
+                .label("users_with_trial"),
+                func.count(User.id).filter(User.is_blocked.is_(True)).label("blocked_users"),
+                func.count(User.id)
+                .filter(User.is_bot_blocked.is_(True))
+                .label("bot_blocked_users"),
+            )
+            .select_from(User)
+            .outerjoin(Subscription, Subscription.id == User.current_subscription_id)
+        )
+        result = await self.session.execute(query)
+        return result.one()
+
+    async def get_subscriptions_statistics(self, now: datetime) -> Row[Any]:
+        is_active = and_(
+            Subscription.status == SubscriptionStatus.ACTIVE,
+            Subscription.expire_at >= now,
+        )
+        is_expired = or_(
+            Subscription.expire_at < now,
+            Subscription.status == SubscriptionStatus.EXPIRED,
+        )
+        is_unlimited = or_(
+            Subscription.device_limit <= 0,
+            Subscription.traffic_limit <= 0,
+            extract("year", Subscription.expire_at) == UNLIMITED_EXPIRE_YEAR,
+        )
+
+        query = select(
+            func.count(Subscription.id).filter(is_active).label("total_active_subscriptions"),
+            func.count(Subscription.id).filter(is_expired).label("total_expire_subscriptions"),
+            func.count(Subscription.id)
+            .filter(is_active, Subscription.is_trial.is_(True))
+            .label("active_trial_subscriptions"),
+            func.count(Subscription.id)
+            .filter(is_active, Subscription.expire_at < now + WEEKLY_WINDOW)
+            .label("expiring_subscriptions"),
+            func.count(Subscription.id).filter(is_active, is_unlimited).label("total_unlimited"),
+            func.count(Subscription.id)
+            .filter(is_active, Subscription.traffic_limit != -1)
+            .label("total_traffic"),
+            func.count(Subscription.id)
+            .filter(is_active, Subscription.device_limit != -1)
+            .label("total_devices"),
+        )
+        result = await self.session.execute(query)
+        return result.one()
+
+    async def get_plans_subscriptions(self) -> Sequence[Row[Any]]:
+        # Группировка по алиасу: JSON-ключ рендерится bind-параметром,
+        # и повтор выражения в GROUP BY Postgres не сопоставит с SELECT
+        query = (
+            select(
+                self.subscription_plan_id.label("plan_id"),
+                func.count(Subscription.id).label("total_subscriptions"),
+                func.count(Subscription.id)
+                .filter(Subscription.status == SubscriptionStatus.ACTIVE)
+                .label("active_subscriptions"),
+            )
+            .where(self._is_counted_subscription())
+            .group_by("plan_id")
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_plans_durations(self) -> Sequence[Row[Any]]:
+        query = (
+            select(
+                self.subscription_plan_id.label("plan_id"),
+                self.subscription_duration.label("duration"),
+                func.count(Subscription.id).label("count"),
+            )
+            .where(self._is_counted_subscription())
+            .group_by("plan_id", "duration")
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_promocodes_activations(self) -> Sequence[Row[Any]]:
+        query = (
+            select(
+                Promocode.code.label("code"),
+                Promocode.reward_type.label("reward_type"),
+                Promocode.reward.label("reward"),
+                func.count(PromocodeActivation.id).label("activations"),
+            )
+            .select_from(Promocode)
+            .outerjoin(PromocodeActivation, PromocodeActivation.promocode_id == Promocode.id)
+            .group_by(Promocode.id)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_referrals_statistics(self) -> Row[Any]:
+        query = select(
+            func.count(Referral.id).label("total_referrals"),
+            func.count(Referral.id)
+            .filter(Referral.level == ReferralLevel.FIRST)
+            .label("first_level_referrals"),
+            func.count(Referral.id)
+            .filter(Referral.level == ReferralLevel.SECOND)
+            .label("second_level_referrals"),
+            func.count(distinct(Referral.referrer_telegram_id)).label("total_referrers"),
+        )
+        result = await self.session.execute(query)
+        return result.one()
+
+    async def get_referral_rewards_statistics(self) -> Row[Any]:
+        is_money = ReferralReward.type == ReferralRewardType.MONEY
+        is_days = ReferralReward.type == ReferralRewardType.EXTRA_DAYS
+
+        query = select(
+            func.coalesce(
+                func.sum(ReferralReward.amount).filter(
+                    is_money, ReferralReward.is_issued.is_(True)
+                ),
+                0,
+            ).label("issued_money_rewards"),
+            func.coalesce(
+                func.sum(ReferralReward.amount).filter(
+                    is_days, ReferralReward.is_issued.is_(True)
+                ),
+                0,
+            ).label("issued_days_rewards"),
+            func.coalesce(
+                func.sum(ReferralReward.amount).filter(
+                    is_money, ReferralReward.is_issued.is_(False)
+                ),
+                0,
+            ).label("pending_money_rewards"),
+        )
+        result = await self.session.execute(query)
+        return result.one()
+
+    # Сверка счётчиков статистики (см. StatisticsRollups)
+
+    async def get_daily_new_users(self) -> Sequence[Row[Any]]:
+        query = (
+            select(
+                self._day(User.created_at).label("day"),
+                func.count(User.id).label("new_users"),
+            )
+            .group_by("day")
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_daily_transactions(self) -> Sequence[Row[Any]]:
+        query = (
+            select(
+                self._day(Transaction.created_at).label("day"),
+                func.count(Transaction.id).label("transactions"),
+                func.count(Transaction.id)
+                .filter(self.final_amount == 0)
+                .label("free_transactions"),
+            )
+            .group_by("day")
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_daily_payments(self) -> Sequence[Row[Any]]:
+        query = (
+            select(
+                self._day(Transaction.created_at).label("day"),
+                Transaction.gateway_type.label("gateway_type"),
+                Transaction.currency.label("currency"),
+                func.coalesce(self.transaction_plan_id, 0).label("plan_id"),
+                func.count(Transaction.id).label("completed"),
+                func.count(Transaction.id).filter(self.final_amount != 0).label("paid_count"),
+                func.coalesce(func.sum(self.final_amount), 0).label("total"),
+                func.coalesce(
+                    func.sum(self.original_amount - self.final_amount),
+                    0,
+                ).label("discount"),
+            )
+            .where(Transaction.status == TransactionStatus.COMPLETED)
+            .group_by("day", "gateway_type", "currency", "plan_id")
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    def stream_daily_payers(self) -> AsyncIterator[Sequence[Row[Any]]]:
+        query = (
+            select(
+                self._day(Transaction.created_at).label("day"),
+                Transaction.user_telegram_id.label("telegram_id"),
+            )
+            .where(
+                Transaction.status == TransactionStatus.COMPLETED,
+                self.final_amount != 0,
+            )
+            .distinct()
+        )
+        return self._stream_partitions(query)
+
+    def stream_daily_trial_users(self) -> AsyncIterator[Sequence[Row[Any]]]:
+        query = (
+            select(
+                self._day(Subscription.created_at).label("day"),
+                Subscription.user_telegram_id.label("telegram_id"),
+            )
+            .where(Subscription.is_trial.is_(True))
+            .distinct()
+        )
+        return self._stream_partitions(query)
+
+    def stream_daily_converted_users(self) -> AsyncIterator[Sequence[Row[Any]]]:
+        trial = aliased(Subscription)
+        had_trial = exists().where(
+            trial.user_telegram_id == Subscription.user_telegram_id,
+            trial.is_trial.is_(True),
+            trial.created_at <= Subscription.created_at,
+        )
+        query = (
+            select(
+                self._day(Subscription.created_at).label("day"),
+                Subscription.user_telegram_id.label("telegram_id"),
+            )
+            .where(Subscription.is_trial.is_(False), had_trial)
+            .distinct()
+        )
+        return self._stream_partitions(query)
+
+    async def _stream_partitions(self, query: Any) -> AsyncIterator[Sequence[Row[Any]]]:
+        result = await self.session.stream(
+            query.execution_options(yield_per=STREAM_PARTITION_SIZE)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    def _day(column: Any) -> Any:
+        # Календарные сутки в UTC, как и корзины счётчиков в Redis
+        return cast(func.timezone("UTC", column), Date)
+
+    @staticmethod
+    def _is_counted_subscription() -> Any:
+        # Удалённые и деактивированные подписки не участвуют в статистике тарифов
+        return Subscription.status.notin_(
+            [SubscriptionStatus.DELETED, SubscriptionStatus.DISABLED]
+        )
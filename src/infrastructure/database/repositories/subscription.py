@@ -1,9 +1,20 @@
 from typing import Any, Optional
 
-from src.infrastructure.database.models.sql import Subscription
+from sqlalchemy import JSON, Integer, Select, cast, literal, literal_column, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import noload
+
+from src.core.enums import SubscriptionStatus
+from src.infrastructure.database.models.sql import Subscription, User
 
 from .base import BaseRepository
 
+# Ключ подставляется литералом, чтобы выражение совпадало с индексом ix_subscriptions_plan_id
+PLAN_ID = cast(Subscription.plan.op("->>")(literal_column("'id'")), Integer)
+
+# Для текущей подписки пользователь и доп. устройства не нужны, их selectin-загрузка отключается
+CURRENT_OPTIONS = (noload(Subscription.user), noload(Subscription.extra_device_purchases))
+
 
 class SubscriptionRepository(BaseRepository):
     async def create(self, subscription: Subscription) -> Subscription:
@@ -21,8 +32,64 @@ class SubscriptionRepository(BaseRepository):
     async def update(self, subscription_id: int, **data: Any) -> Optional[Subscription]:
         return await self._update(Subscription, Subscription.id == subscription_id, **data)
 
+    async def update_many(self, values: list[dict[str, Any]]) -> None:
+        """Обновление пачки подписок по первичному ключу (в каждом словаре есть `id`)."""
+        if values:
+            await self.session.execute(update(Subscription), values)
+
+    async def get_current(self, telegram_id: int) -> Optional[Subscription]:
+        """Текущая подписка пользователя одним запросом, без связанных объектов."""
+        query = self._current_query().where(User.telegram_id == telegram_id)
+        return await self.session.scalar(query)
+
+    async def get_current_many(self, telegram_ids: list[int]) -> list[tuple[int, Subscription]]:
+        """Текущие подписки перечисленных пользователей, у кого они есть."""
+        query = (
+            self._current_query()
+            .add_columns(User.telegram_id)
+            .where(User.telegram_id.in_(telegram_ids))
+        )
+        result = await self.session.execute(query)
+        return [(telegram_id, subscription) for subscription, telegram_id in result.all()]
+
+    async def get_current_index(self) -> list[tuple[int, Optional[Subscription]]]:
+        """Текущая подписка каждого пользователя (или None) одним запросом."""
+        query = (
+            select(User.telegram_id, Subscription)
+            .outerjoin(Subscription, Subscription.id == User.current_subscription_id)
+            .options(*CURRENT_OPTIONS)
+        )
+        result = await self.session.execute(query)
+        return [(telegram_id, subscription) for telegram_id, subscription in result.all()]
+
     async def filter_by_plan_id(self, plan_id: int) -> list[Subscription]:
-        return await self._get_many(Subscription, Subscription.plan["id"].as_integer() == plan_id)
+        return await self._get_many(Subscription, PLAN_ID == plan_id)
+
+    async def apply_plan(
+        self,
+        plan_id: int,
+        plan_data: dict[str, Any],
+        **data: Any,
+    ) -> list[tuple[int, int]]:
+        """Обновление активных подписок плана одним запросом, возвращает (id, telegram_id)."""
+        plan = cast(cast(Subscription.plan, JSONB).op("||")(literal(plan_data, JSONB)), JSON)
+        query = (
+            update(Subscription)
+            .where(PLAN_ID == plan_id, Subscription.status == SubscriptionStatus.ACTIVE)
+            .values(plan=plan, **data)
+            .returning(Subscription.id, Subscription.user_telegram_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return [(subscription_id, telegram_id) for subscription_id, telegram_id in result.all()]
 
     async def get_by_url(self, url: str) -> Optional[Subscription]:
         return await self._get_one(Subscription, Subscription.url == url)
+
+    @staticmethod
+    def _current_query() -> Select[tuple[Subscription]]:
+        return (
+            select(Subscription)
+            .join(User, User.current_subscription_id == Subscription.id)
+            .options(*CURRENT_OPTIONS)
+        )
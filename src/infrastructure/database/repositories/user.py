@@ -1,11 +1,11 @@
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
-from sqlalchemy import func, or_
+from sqlalchemy import Row, func, or_, select
 
 from src.core.enums import UserRole
 from src.infrastructure.database.models.sql import User
 
-from .base import BaseRepository
+from .base import BaseRepository, ConditionType
 
 
 class UserRepository(BaseRepository):
@@ -37,6 +37,44 @@ class UserRepository(BaseRepository):
     async def get_all(self) -> list[User]:
         return await self._get_many(User)
 
+    async def get_page(self, limit: int, before_telegram_id: Optional[int] = None) -> list[User]:
+        conditions = []
+        if before_telegram_id is not None:
+            conditions.append(User.telegram_id < before_telegram_id)
+
+        return await self._get_many(
+            User,
+            *conditions,
+            order_by=User.telegram_id.desc(),
+            limit=limit,
+        )
+
+    async def get_page_cursor(
+        self,
+        skip: int,
+        before_telegram_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """Telegram ID, на котором заканчиваются `skip` пользователей после курсора."""
+        query = select(User.telegram_id).order_by(User.telegram_id.desc())
+        if before_telegram_id is not None:
+            query = query.where(User.telegram_id < before_telegram_id)
+
+        return await self.session.scalar(query.offset(skip - 1).limit(1))
+
+    async def get_recipients(
+        self,
+        *conditions: ConditionType,
+        limit: int,
+        after_telegram_id: Optional[int] = None,
+    ) -> Sequence[Row[Any]]:
+        """Только поля, нужные для отправки сообщений, по возрастанию Telegram ID."""
+        query = select(User.telegram_id, User.name, User.language).where(*conditions)
+        if after_telegram_id is not None:
+            query = query.where(User.telegram_id > after_telegram_id)
+
+        result = await self.session.execute(query.order_by(User.telegram_id.asc()).limit(limit))
+        return result.all()
+
     async def update(self, telegram_id: int, **data: Any) -> Optional[User]:
         return await self._update(User, User.telegram_id == telegram_id, **data)
 
@@ -5,7 +5,7 @@ from loguru import logger
 from redis.asyncio import ConnectionPool, Redis
 
 from src.core.config import AppConfig
-from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis import RateLimiter, RedisRepository
 
 
 class RedisProvider(Provider):
@@ -37,3 +37,4 @@ class RedisProvider(Provider):
         await connection_pool.disconnect()
 
     redis_repository = provide(source=RedisRepository)
+    rate_limiter = provide(source=RateLimiter)
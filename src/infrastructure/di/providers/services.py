@@ -1,8 +1,11 @@
 from dishka import Provider, Scope, provide
 
 from src.services.access import AccessService
+from src.services.backup import BackupService
+from src.services.balance import BalanceService
 from src.services.balance_transfer import BalanceTransferService
 from src.services.broadcast import BroadcastService
+from src.services.channel_membership import ChannelMembershipService
 from src.services.command import CommandService
 from src.services.extra_device import ExtraDeviceService
 from src.services.importer import ImporterService
@@ -14,7 +17,9 @@ from src.services.pricing import PricingService
 from src.services.promocode import PromocodeService
 from src.services.referral import ReferralService
 from src.services.remnawave import RemnawaveService
+from src.services.remnawave_events import RemnawaveEventQueue
 from src.services.settings import SettingsService
+from src.services.statistics import StatisticsService
 from src.services.subscription import SubscriptionService
 from src.services.transaction import TransactionService
 from src.services.update_checker import UpdateCheckerService
@@ -26,18 +31,23 @@ class ServicesProvider(Provider):
     scope = Scope.APP
 
     command_service = provide(source=CommandService)
+    channel_membership_service = provide(source=ChannelMembershipService)
     access_service = provide(source=AccessService, scope=Scope.REQUEST)
+    backup_service = provide(source=BackupService)
+    balance_service = provide(source=BalanceService, scope=Scope.REQUEST)
     balance_transfer_service = provide(source=BalanceTransferService, scope=Scope.REQUEST)
     notification_service = provide(source=NotificationService, scope=Scope.REQUEST)
     gateway_service = provide(source=PaymentGatewayService, scope=Scope.REQUEST)
     plan_service = provide(source=PlanService, scope=Scope.REQUEST)
     promocode_service = provide(source=PromocodeService, scope=Scope.REQUEST)
     remnawave_service = provide(source=RemnawaveService, scope=Scope.REQUEST)
+    remnawave_event_queue = provide(source=RemnawaveEventQueue)
     subscription_service = provide(source=SubscriptionService, scope=Scope.REQUEST)
     transaction_service = provide(source=TransactionService, scope=Scope.REQUEST)
     user_service = provide(source=UserService, scope=Scope.REQUEST)
     webhook_service = provide(source=WebhookService)
     settings_service = provide(source=SettingsService, scope=Scope.REQUEST)
+    statistics_service = provide(source=StatisticsService, scope=Scope.REQUEST)
     broadcast_service = provide(source=BroadcastService, scope=Scope.REQUEST)
     pricing_service = provide(source=PricingService)
     importer_service = provide(source=ImporterService)
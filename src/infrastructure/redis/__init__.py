@@ -1,7 +1,21 @@
-from .cache import redis_cache
+from .cache import delete_cache_keys, get_cache_stats, invalidate_cache_dependents, redis_cache
+from .local_cache import listen_cache_invalidation, publish_cache_clear
+from .rate_limiter import RateLimiter
 from .repository import RedisRepository
+from .request_cache import RequestCache, get_request_cache, request_cache_scope
+from .rollups import StatisticsRollups
 
 __all__ = [
+    "delete_cache_keys",
+    "get_cache_stats",
+    "get_request_cache",
+    "invalidate_cache_dependents",
+    "listen_cache_invalidation",
+    "publish_cache_clear",
+    "RateLimiter",
     "redis_cache",
     "RedisRepository",
+    "RequestCache",
+    "request_cache_scope",
+    "StatisticsRollups",
 ]
@@ -1,5 +1,16 @@
+from collections import defaultdict
 from functools import wraps
-from typing import Any, Awaitable, Callable, Optional, ParamSpec, TypeVar, get_type_hints
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Final,
+    Iterable,
+    Optional,
+    ParamSpec,
+    TypeVar,
+    get_type_hints,
+)
 
 from loguru import logger
 from pydantic import SecretStr, TypeAdapter
@@ -7,11 +18,22 @@ from redis.asyncio import Redis
 from redis.typing import ExpiryT
 
 from src.core.constants import TIME_1M
+from src.core.storage.key_builder import build_key
 from src.core.utils import json_utils
 
+from .local_cache import local_cache, publish_cache_invalidation
+from .request_cache import get_request_cache
+
 T = TypeVar("T", bound=Any)
 P = ParamSpec("P")
 
+CACHE_INDEX_PREFIX: Final[str] = "cache_index"
+CACHE_STATS_KEY: Final[str] = "cache_stats"
+
+# Зависимость -> префиксы кэша. Зависимость "user" сбрасывается при создании
+# и удалении сущности, "user.role" - при изменении поля role
+_cache_dependencies: dict[str, set[str]] = defaultdict(set)
+
 
 def prepare_for_cache(obj: Any) -> Any:
     if isinstance(obj, SecretStr):
@@ -26,46 +48,177 @@ def prepare_for_cache(obj: Any) -> Any:
 def redis_cache(
     prefix: Optional[str] = None,
     ttl: ExpiryT = TIME_1M,
+    depends_on: Iterable[str] = (),
+    local_ttl: Optional[float] = None,
 ) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Кэширует результат метода сервиса в Redis.
+
+    `depends_on` перечисляет зависимости вида `user` или `user.role`: ключи такого
+    кэша попадают в индекс `cache_index:<prefix>` и удаляются через
+    `invalidate_cache_dependents` только при изменении этих данных.
+
+    `local_ttl` включает in-process кэш (L1) перед Redis для горячих объектов:
+    повторные вызовы в процессе обходятся без сетевого запроса и валидации.
+    Ключи L1 сбрасываются через `delete_cache_keys` во всех процессах.
+    """
+
     def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
         return_type: Any = get_type_hints(func)["return"]
         type_adapter: TypeAdapter[T] = TypeAdapter(return_type)
+        cache_prefix: str = prefix or func.__name__
+        dependencies = tuple(depends_on)
+
+        for dependency in dependencies:
+            _cache_dependencies[dependency].add(cache_prefix)
 
         @wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
             self: Any = args[0]
             redis: Redis = self.redis_client
+            key = _build_cache_key(cache_prefix, args[1:], kwargs)
+
+            if local_ttl:
+                found, local_value = local_cache.get(key)
+                if found:
+                    _track_request("local")
+                    return local_value  # type: ignore[no-any-return]
+
+            found, value = await _read_cached(redis, key, cache_prefix, type_adapter)
+            if found:
+                _track_request("redis")
+            else:
+                # logger.debug(f"Cache miss: '{key}'. Executing function")  # Disabled: log spam
+                value = await func(*args, **kwargs)
+                _track_request("miss")
+                index_key = build_key(CACHE_INDEX_PREFIX, cache_prefix) if dependencies else None
+                await _write_cached(redis, key, value, type_adapter, ttl, cache_prefix, index_key)
 
-            # Build cache key
-            key_parts = [
-                "cache",
-                prefix or func.__name__,
-                *map(str, args[1:]),
-                *map(str, kwargs.values()),
-            ]
-            key: str = ":".join(key_parts)
-
-            try:
-                cached_value: Optional[bytes] = await redis.get(key)
-                if cached_value is not None:
-                    # logger.debug(f"Cache hit: '{key}'")  # Disabled to reduce log spam
-                    parsed = json_utils.decode(cached_value.decode())
-                    return type_adapter.validate_python(parsed)
-            except Exception as exception:
-                logger.warning(f"Cache read failed for key '{key}': {exception}")
-
-            # logger.debug(f"Cache miss: '{key}'. Executing function")  # Disabled to reduce log spam
-            result: T = await func(*args, **kwargs)
-
-            try:
-                safe_result = prepare_for_cache(type_adapter.dump_python(result))
-                await redis.setex(key, ttl, json_utils.encode(safe_result))
-                # logger.debug(f"Result cached: '{key}' (ttl={ttl})")  # Disabled to reduce log spam
-            except Exception as exception:
-                logger.warning(f"Cache write failed for key '{key}': {exception}")
-
-            return result
+            if local_ttl:
+                local_cache.set(key, value, local_ttl)
+            return value  # type: ignore[no-any-return]
 
         return wrapper
 
     return decorator
+
+
+def _build_cache_key(prefix: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    return ":".join(["cache", prefix, *map(str, args), *map(str, kwargs.values())])
+
+
+def _track_request(source: str) -> None:
+    request_cache = get_request_cache()
+    if request_cache:
+        request_cache.track(source)
+
+
+async def _read_cached(
+    redis: Redis,
+    key: str,
+    prefix: str,
+    type_adapter: TypeAdapter[Any],
+) -> tuple[bool, Any]:
+    """Значение из Redis; ошибки чтения считаются промахом."""
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.hincrby(CACHE_STATS_KEY, f"{prefix}:calls", 1)
+            cached_value: Optional[bytes] = (await pipe.execute())[0]
+
+        if cached_value is not None:
+            # logger.debug(f"Cache hit: '{key}'")  # Disabled to reduce log spam
+            parsed = json_utils.decode(cached_value.decode())
+            return True, type_adapter.validate_python(parsed)
+    except Exception as exception:
+        logger.warning(f"Cache read failed for key '{key}': {exception}")
+
+    return False, None
+
+
+async def _write_cached(
+    redis: Redis,
+    key: str,
+    value: Any,
+    type_adapter: TypeAdapter[Any],
+    ttl: ExpiryT,
+    prefix: str,
+    index_key: Optional[str],
+) -> None:
+    try:
+        safe_result = prepare_for_cache(type_adapter.dump_python(value))
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, json_utils.encode(safe_result))
+            pipe.hincrby(CACHE_STATS_KEY, f"{prefix}:misses", 1)
+            if index_key:
+                pipe.sadd(index_key, key)
+                pipe.expire(index_key, ttl)
+            await pipe.execute()
+        # logger.debug(f"Result cached: '{key}' (ttl={ttl})")  # Disabled to reduce log spam
+    except Exception as exception:
+        logger.warning(f"Cache write failed for key '{key}': {exception}")
+
+
+async def delete_cache_keys(redis: Redis, *keys: str) -> None:
+    """Удаляет ключи кэша из Redis и из L1 всех процессов."""
+    if not keys:
+        return
+
+    await redis.delete(*keys)
+    await publish_cache_invalidation(redis, keys)
+
+
+async def invalidate_cache_dependents(
+    redis: Redis,
+    entity: str,
+    fields: Optional[Iterable[str]] = None,
+) -> None:
+    """Удаляет кэши, зависящие от сущности.
+
+    Без `fields` (создание или удаление) сбрасываются все зависимости сущности,
+    иначе только объявленные на изменённые поля.
+    """
+    if fields is None:
+        prefixes = {
+            prefix
+            for dependency, dependency_prefixes in _cache_dependencies.items()
+            if dependency == entity or dependency.startswith(f"{entity}.")
+            for prefix in dependency_prefixes
+        }
+    else:
+        prefixes = {
+            prefix
+            for field in fields
+            for prefix in _cache_dependencies.get(f"{entity}.{field}", ())
+        }
+
+    if not prefixes:
+        return
+
+    index_keys = [build_key(CACHE_INDEX_PREFIX, prefix) for prefix in sorted(prefixes)]
+
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for index_key in index_keys:
+                pipe.smembers(index_key)
+            members: list[set[bytes]] = await pipe.execute()
+
+        keys = [key.decode() for index_members in members for key in index_members]
+        await delete_cache_keys(redis, *keys, *index_keys)
+        logger.debug(f"Invalidated '{len(keys)}' cache keys for prefixes {sorted(prefixes)}")
+    except Exception as exception:
+        logger.warning(f"Cache invalidation failed for '{entity}': {exception}")
+
+
+async def get_cache_stats(redis: Redis) -> dict[str, dict[str, int]]:
+    """Счётчики обращений и промахов кэша по префиксам."""
+    raw: dict[bytes, bytes] = await redis.hgetall(CACHE_STATS_KEY)  # type: ignore[misc]
+    stats: dict[str, dict[str, int]] = defaultdict(lambda: {"calls": 0, "misses": 0, "hits": 0})
+
+    for field, value in raw.items():
+        prefix, _, counter = field.decode().rpartition(":")
+        stats[prefix][counter] = int(value)
+
+    for counters in stats.values():
+        counters["hits"] = max(counters["calls"] - counters["misses"], 0)
+
+    return dict(stats)
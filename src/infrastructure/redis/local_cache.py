@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Final, Iterable
+
+from loguru import logger
+from redis.asyncio import Redis
+
+CACHE_INVALIDATION_CHANNEL: Final[str] = "cache_invalidation"
+# Сообщение в канале, очищающее L1 целиком (например, после FLUSHALL)
+CACHE_INVALIDATE_ALL: Final[str] = "*"
+LOCAL_CACHE_MAXSIZE: Final[int] = 2048
+RECONNECT_DELAY: Final[int] = 5
+
+
+class LocalCache:
+    """In-process TTL/LRU кэш (L1) перед Redis.
+
+    Хранит уже провалидированные объекты и отдаёт их копии, чтобы изменения
+    DTO вызывающим кодом не попадали в кэш. Согласованность между процессами
+    поддерживается сообщениями в канале `cache_invalidation`.
+    """
+
+    def __init__(self, maxsize: int = LOCAL_CACHE_MAXSIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        # Растёт при каждой полной очистке, по нему сбрасываются другие in-process кэши
+        self.generation = 0
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, deepcopy(value))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.generation += 1
+
+
+local_cache = LocalCache()
+
+
+async def publish_cache_invalidation(redis: Redis, keys: Iterable[str]) -> None:
+    keys = list(keys)
+    local_cache.invalidate(keys)
+    if keys:
+        await redis.publish(CACHE_INVALIDATION_CHANNEL, "\n".join(keys))
+
+
+async def publish_cache_clear(redis: Redis) -> None:
+    local_cache.clear()
+    await redis.publish(CACHE_INVALIDATION_CHANNEL, CACHE_INVALIDATE_ALL)
+
+
+async def listen_cache_invalidation(redis: Redis) -> None:
+    """Фоновая подписка на инвалидации L1 от других процессов."""
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            # Пока не были подписаны, могли пропустить сообщения
+            local_cache.clear()
+            logger.debug("Subscribed to local cache invalidation channel")
+
+            async for message in pubsub.listen():
+                data = message.get("data")
+                if not isinstance(data, bytes):
+                    continue
+                if data.decode() == CACHE_INVALIDATE_ALL:
+                    local_cache.clear()
+                else:
+                    local_cache.invalidate(data.decode().split("\n"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exception:
+            local_cache.clear()
+            logger.warning(f"Cache invalidation listener failed: {exception}")
+            await asyncio.sleep(RECONNECT_DELAY)
+        finally:
+            await pubsub.aclose()
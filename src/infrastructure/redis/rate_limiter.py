@@ -0,0 +1,76 @@
+import time
+from typing import Final
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.storage.key_builder import StorageKey
+
+LOCAL_CACHE_MAXSIZE: Final[int] = 10_000
+
+# GCRA: в ключе хранится теоретическое время следующего запроса (TAT) в мс.
+# Запрос пропускается, если TAT не опережает текущее время больше чем на
+# допустимый всплеск. Возвращает {разрешён, мс до следующего разрешённого запроса}.
+GCRA_SCRIPT: Final[str] = """
+local interval = tonumber(ARGV[1])
+local tolerance = interval * (tonumber(ARGV[2]) - 1)
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or 0), now)
+
+if tat - tolerance > now then
+    return {0, tat - tolerance - now}
+end
+
+tat = tat + interval
+redis.call('SET', KEYS[1], tat, 'PX', tat - now)
+return {1, math.max(tat - tolerance - now, 0)}
+"""
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов, общий для всех процессов и ботов.
+
+    Решение принимает Lua-скрипт GCRA в Redis, поэтому лимит соблюдается
+    независимо от того, какой процесс получил апдейт. Локально запоминается
+    только время, до которого ключ заведомо заблокирован: TAT в Redis лишь
+    растёт, так что повторные запросы в этом окне отклоняются без обращения
+    к Redis. При недоступности Redis запросы пропускаются.
+    """
+
+    def __init__(self, redis_client: Redis) -> None:
+        self.redis_client = redis_client
+        self._script = redis_client.register_script(GCRA_SCRIPT)
+        self._blocked: dict[str, float] = {}
+
+    async def hit(self, key: StorageKey, interval: float, burst: int = 1) -> bool:
+        packed_key = key.pack()
+        now = time.monotonic()
+
+        blocked_until = self._blocked.get(packed_key)
+        if blocked_until is not None:
+            if blocked_until > now:
+                return False
+            del self._blocked[packed_key]
+
+        try:
+            allowed, wait_ms = await self._script(
+                keys=[packed_key],
+                args=[max(int(interval * 1000), 1), burst],
+            )
+        except Exception as exception:
+            logger.warning(f"Rate limiter unavailable for '{packed_key}': {exception}")
+            return True
+
+        if wait_ms:
+            self._block(packed_key, now + int(wait_ms) / 1000)
+        return bool(allowed)
+
+    def _block(self, key: str, until: float) -> None:
+        if len(self._blocked) >= LOCAL_CACHE_MAXSIZE:
+            now = time.monotonic()
+            self._blocked = {k: v for k, v in self._blocked.items() if v > now}
+            if len(self._blocked) >= LOCAL_CACHE_MAXSIZE:
+                self._blocked.clear()
+
+        self._blocked[key] = until
@@ -8,6 +8,8 @@ from src.core.config import AppConfig
 from src.core.storage.key_builder import StorageKey
 from src.core.utils import json_utils
 
+from .local_cache import publish_cache_invalidation
+
 T = TypeVar("T", bound=Any)
 
 TX_QUEUE_KEY: Final[str] = "tx_queue"
@@ -104,6 +106,7 @@ class RedisRepository:
         """
         Удаляет все ключи, соответствующие шаблону.
         Использует SCAN для безопасного итерирования по ключам.
+        Удалённые ключи сбрасываются и в L1 кэше всех процессов.
         Returns: количество удаленных ключей.
         """
         deleted = 0
@@ -112,6 +115,10 @@ class RedisRepository:
             cursor, keys = await self.client.scan(cursor=cursor, match=pattern, count=100)
             if keys:
                 deleted += await self.client.delete(*keys)
+                await publish_cache_invalidation(
+                    self.client,
+                    (key.decode() if isinstance(key, bytes) else key for key in keys),
+                )
             if cursor == 0:
                 break
         return deleted
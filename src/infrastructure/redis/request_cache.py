@@ -0,0 +1,36 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class RequestCache:
+    """Статистика кэшируемых вызовов в пределах одного апдейта.
+
+    `stats` считает обращения по источникам: local (L1), redis и miss (вызов
+    функции, т.е. БД). Значения здесь не хранятся: повторное чтение в том же
+    апдейте и так обслуживает L1, а отдельная копия стоила бы столько же.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Counter[str] = Counter()
+
+    def track(self, source: str) -> None:
+        self.stats[source] += 1
+
+
+_request_cache: ContextVar[Optional[RequestCache]] = ContextVar("request_cache", default=None)
+
+
+def get_request_cache() -> Optional[RequestCache]:
+    return _request_cache.get()
+
+
+@contextmanager
+def request_cache_scope() -> Iterator[RequestCache]:
+    request_cache = RequestCache()
+    token = _request_cache.set(request_cache)
+    try:
+        yield request_cache
+    finally:
+        _request_cache.reset(token)
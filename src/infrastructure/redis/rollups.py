@@ -0,0 +1,228 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Final, Iterable, Optional, Type
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.constants import TIME_1D, TIMEZONE
+from src.core.storage.key_builder import StorageKey
+from src.core.storage.keys import (
+    StatisticsConvertedUsersKey,
+    StatisticsPayersKey,
+    StatisticsRollupKey,
+    StatisticsTrialUsersKey,
+)
+from src.core.utils.time import datetime_now
+
+TOTAL_BUCKET: Final[str] = "total"
+REBUILD_SUFFIX: Final[str] = "-rebuild"
+
+# Дневные корзины покрывают окно "за месяц" с запасом на сверку
+ROLLUP_RETENTION_DAYS: Final[int] = 40
+DAILY_BUCKETS: Final[int] = 1
+WEEKLY_BUCKETS: Final[int] = 8
+MONTHLY_BUCKETS: Final[int] = 31
+
+UniqueKeyType = Type[StorageKey]
+Counters = dict[str, float]
+
+
+def day_bucket(moment: Optional[datetime] = None) -> str:
+    return (moment or datetime_now()).astimezone(TIMEZONE).date().isoformat()
+
+
+def recent_buckets(count: int, now: Optional[datetime] = None) -> list[str]:
+    today: date = (now or datetime_now()).astimezone(TIMEZONE).date()
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(count)]
+
+
+def gateway_field(gateway_type: Any, metric: str) -> str:
+    return f"gateway:{gateway_type}:{metric}"
+
+
+def currency_field(currency: Any) -> str:
+    return f"currency:{currency}:revenue"
+
+
+def plan_field(plan_id: int, metric: str) -> str:
+    return f"plan:{plan_id}:{metric}"
+
+
+class StatisticsRollups:
+    """Счётчики статистики в Redis, обновляемые при записи.
+
+    Каждое событие увеличивает поля хеша дневной корзины (`YYYY-MM-DD`) и общей
+    корзины `total`. Уникальные пользователи (плательщики, триалы, конверсии)
+    учитываются в HyperLogLog с теми же корзинами. Расхождения исправляет
+    ночная сверка из БД через `replace_counters` и `commit_unique_rebuild`.
+    """
+
+    client: Redis
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+
+    async def record_new_user(self, created_at: Optional[datetime] = None) -> None:
+        await self._increment(created_at, {"new_users": 1})
+
+    async def record_transaction(self, is_free: bool, created_at: Optional[datetime]) -> None:
+        counters: Counters = {"transactions": 1}
+        if is_free:
+            counters["free_transactions"] = 1
+        await self._increment(created_at, counters)
+
+    async def record_payment(
+        self,
+        telegram_id: int,
+        gateway_type: Any,
+        currency: Any,
+        final_amount: float,
+        original_amount: float,
+        plan_id: Optional[int],
+        created_at: Optional[datetime],
+    ) -> None:
+        is_paid = final_amount != 0
+        counters: Counters = {
+            "completed_transactions": 1,
+            gateway_field(gateway_type, "total"): final_amount,
+            gateway_field(gateway_type, "discount"): original_amount - final_amount,
+            gateway_field(gateway_type, "completed"): 1,
+            currency_field(currency): final_amount,
+        }
+
+        if is_paid:
+            counters[gateway_field(gateway_type, "paid_count")] = 1
+
+        if plan_id:
+            counters[plan_field(plan_id, "sales")] = 1
+            counters[plan_field(plan_id, f"income:{currency}")] = final_amount
+
+        await self._increment(
+            created_at,
+            counters,
+            unique={StatisticsPayersKey: telegram_id} if is_paid else None,
+        )
+
+    async def record_subscription(
+        self,
+        telegram_id: int,
+        is_trial: bool,
+        had_trial: bool,
+        created_at: Optional[datetime] = None,
+    ) -> None:
+        if is_trial:
+            await self._increment(created_at, {}, unique={StatisticsTrialUsersKey: telegram_id})
+        elif had_trial:
+            await self._increment(created_at, {}, unique={StatisticsConvertedUsersKey: telegram_id})
+
+    #
+
+    async def is_ready(self) -> bool:
+        return bool(await self.client.exists(StatisticsRollupKey(bucket=TOTAL_BUCKET).pack()))
+
+    async def read_windows(self, now: Optional[datetime] = None) -> dict[str, Counters]:
+        buckets = recent_buckets(MONTHLY_BUCKETS, now)
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(StatisticsRollupKey(bucket=TOTAL_BUCKET).pack())
+            for bucket in buckets:
+                pipe.hgetall(StatisticsRollupKey(bucket=bucket).pack())
+            raw_hashes: list[dict[bytes, bytes]] = await pipe.execute()
+
+        total, *days = [self._decode(raw) for raw in raw_hashes]
+        return {
+            "total": total,
+            "daily": self._merge(days[:DAILY_BUCKETS]),
+            "weekly": self._merge(days[:WEEKLY_BUCKETS]),
+            "monthly": self._merge(days[:MONTHLY_BUCKETS]),
+        }
+
+    async def count_unique(self, key_type: UniqueKeyType, buckets: Iterable[str]) -> int:
+        keys = [key_type(bucket=bucket).pack() for bucket in buckets]  # type: ignore[call-arg]
+        return int(await self.client.pfcount(*keys))
+
+    #
+
+    async def replace_counters(self, counters: dict[str, Counters]) -> None:
+        """Атомарно перезаписывает хеши корзин значениями, посчитанными в БД."""
+        async with self.client.pipeline(transaction=True) as pipe:
+            for bucket, values in counters.items():
+                key = StatisticsRollupKey(bucket=bucket).pack()
+                pipe.delete(key)
+                if values:
+                    pipe.hset(key, mapping=values)  # type: ignore[arg-type]
+                if bucket != TOTAL_BUCKET:
+                    pipe.expire(key, ROLLUP_RETENTION_DAYS * TIME_1D)
+            await pipe.execute()
+
+    async def add_unique_for_rebuild(
+        self,
+        key_type: UniqueKeyType,
+        values_by_bucket: dict[str, list[int]],
+    ) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for bucket, values in values_by_bucket.items():
+                if values:
+                    key = key_type(bucket=bucket + REBUILD_SUFFIX).pack()  # type: ignore[call-arg]
+                    pipe.pfadd(key, *values)
+                    pipe.expire(key, TIME_1D)
+            await pipe.execute()
+
+    async def commit_unique_rebuild(self, key_type: UniqueKeyType, buckets: Iterable[str]) -> None:
+        """Подменяет HyperLogLog корзин на пересобранные во время сверки."""
+        async with self.client.pipeline(transaction=True) as pipe:
+            for bucket in buckets:
+                key = key_type(bucket=bucket).pack()  # type: ignore[call-arg]
+                rebuild_key = key_type(bucket=bucket + REBUILD_SUFFIX).pack()  # type: ignore[call-arg]
+                pipe.delete(key)
+                pipe.copy(rebuild_key, key)
+                pipe.delete(rebuild_key)
+                if bucket != TOTAL_BUCKET:
+                    pipe.expire(key, ROLLUP_RETENTION_DAYS * TIME_1D)
+            await pipe.execute()
+
+    #
+
+    async def _increment(
+        self,
+        created_at: Optional[datetime],
+        counters: Counters,
+        unique: Optional[dict[UniqueKeyType, int]] = None,
+    ) -> None:
+        buckets = (TOTAL_BUCKET, day_bucket(created_at))
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for bucket in buckets:
+                    key = StatisticsRollupKey(bucket=bucket).pack()
+                    for field, value in counters.items():
+                        if isinstance(value, int):
+                            pipe.hincrby(key, field, value)
+                        else:
+                            pipe.hincrbyfloat(key, field, value)
+
+                    for key_type, value in (unique or {}).items():
+                        pipe.pfadd(key_type(bucket=bucket).pack(), value)  # type: ignore[call-arg]
+
+                    if bucket != TOTAL_BUCKET:
+                        pipe.expire(key, ROLLUP_RETENTION_DAYS * TIME_1D)
+                        for key_type in unique or {}:
+                            unique_key = key_type(bucket=bucket).pack()  # type: ignore[call-arg]
+                            pipe.expire(unique_key, ROLLUP_RETENTION_DAYS * TIME_1D)
+                await pipe.execute()
+        except Exception as exception:
+            # Статистика не должна ломать основной сценарий, дрейф исправит сверка
+            logger.warning(f"Failed to update statistics rollups {list(counters)}: {exception}")
+
+    @staticmethod
+    def _decode(raw: dict[bytes, bytes]) -> Counters:
+        return {field.decode(): float(value) for field, value in raw.items()}
+
+    @staticmethod
+    def _merge(hashes: list[Counters]) -> Counters:
+        merged: Counters = defaultdict(float)
+        for values in hashes:
+            for field, value in values.items():
+                merged[field] += value
+        return dict(merged)
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Final, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+from fluentogram import TranslatorRunner
+from loguru import logger
+
+# Минимальный интервал между правками сообщения с прогрессом
+PROGRESS_INTERVAL: Final[float] = 3.0
+MEGABYTE: Final[int] = 1024 * 1024
+
+
+class ProgressMessage:
+    """Сообщение администратору, которое редактируется по мере выполнения задачи.
+
+    В перевод передаются `processed`, `total`, `percent` и `size` (обработано в МБ).
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        i18n: TranslatorRunner,
+        message: Optional[Message],
+        i18n_key: str,
+    ) -> None:
+        self.bot = bot
+        self.i18n = i18n
+        self.message = message
+        self.i18n_key = i18n_key
+        self._updated_at = 0.0
+
+    async def update(self, processed: int, total: Optional[int]) -> None:
+        loop = asyncio.get_running_loop()
+        if not self.message or loop.time() - self._updated_at < PROGRESS_INTERVAL:
+            return
+        self._updated_at = loop.time()
+
+        text = self.i18n.get(
+            self.i18n_key,
+            processed=processed,
+            total=total or 0,
+            size=processed // MEGABYTE,
+            percent=min(processed * 100 // total, 100) if total else 0,
+        )
+        try:
+            await self.bot.edit_message_text(
+                text=text,
+                chat_id=self.message.chat.id,
+                message_id=self.message.message_id,
+            )
+        except TelegramBadRequest as exception:
+            logger.debug(f"Failed to update progress message: {exception}")
+
+    async def delete(self) -> None:
+        if not self.message:
+            return
+        try:
+            await self.message.delete()
+        except TelegramBadRequest as exception:
+            logger.debug(f"Failed to delete progress message: {exception}")
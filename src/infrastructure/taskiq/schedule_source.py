@@ -0,0 +1,111 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Final
+
+from loguru import logger
+from pydantic import ValidationError
+from redis.asyncio import Redis
+from taskiq import AsyncTaskiqDecoratedTask, ScheduleSource
+from taskiq.exceptions import ScheduledTaskCancelledError
+from taskiq.scheduler.scheduled_task import ScheduledTask
+
+from src.core.config import AppConfig
+from src.core.storage.keys import DelayedTaskPayloadsKey, DelayedTasksKey
+
+# Задачи со сроком в ближайшие секунды отдаются планировщику заранее,
+# чтобы он отправил их точно в срок, а не на следующем опросе
+LOOKAHEAD: Final[float] = 2.0
+FETCH_LIMIT: Final[int] = 500
+
+
+class DelayedScheduleSource(ScheduleSource):
+    """Источник отложенных разовых задач для планировщика taskiq.
+
+    Срок выполнения хранится в сортированном множестве (score - unix-время),
+    сама задача - в хэше по schedule_id. Планировщик забирает только задачи,
+    срок которых наступил, а перед отправкой снимает задачу с очереди `ZREM`:
+    отправит её тот, кто снял первым, даже если планировщиков несколько.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.redis_client: Redis = Redis.from_url(url)
+        self.queue_key = DelayedTasksKey().pack()
+        self.payloads_key = DelayedTaskPayloadsKey().pack()
+
+    async def shutdown(self) -> None:
+        await self.redis_client.aclose()
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        if schedule.time is None:
+            raise ValueError(f"Delayed schedule '{schedule.schedule_id}' has no time")
+
+        eta = schedule.time
+        if eta.tzinfo is None:
+            eta = eta.replace(tzinfo=timezone.utc)
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(self.payloads_key, schedule.schedule_id, schedule.model_dump_json())
+            pipe.zadd(self.queue_key, {schedule.schedule_id: eta.timestamp()})
+            await pipe.execute()
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.queue_key, schedule_id)
+            pipe.hdel(self.payloads_key, schedule_id)
+            await pipe.execute()
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        schedule_ids = await self.redis_client.zrangebyscore(
+            self.queue_key,
+            "-inf",
+            time.time() + LOOKAHEAD,
+            start=0,
+            num=FETCH_LIMIT,
+        )
+        if not schedule_ids:
+            return []
+
+        payloads = await self.redis_client.hmget(self.payloads_key, schedule_ids)
+        schedules: list[ScheduledTask] = []
+        broken: list[bytes] = []
+
+        for schedule_id, payload in zip(schedule_ids, payloads):
+            if payload is None:
+                broken.append(schedule_id)
+                continue
+            try:
+                schedules.append(ScheduledTask.model_validate_json(payload))
+            except ValidationError as exception:
+                logger.error(f"Dropping invalid delayed task '{schedule_id!r}': {exception}")
+                broken.append(schedule_id)
+
+        if broken:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.zrem(self.queue_key, *broken)
+                pipe.hdel(self.payloads_key, *broken)
+                await pipe.execute()
+
+        return schedules
+
+    async def pre_send(self, task: ScheduledTask) -> None:
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.queue_key, task.schedule_id)
+            pipe.hdel(self.payloads_key, task.schedule_id)
+            claimed, _ = await pipe.execute()
+
+        if not claimed:
+            raise ScheduledTaskCancelledError
+
+
+delayed_source = DelayedScheduleSource(url=AppConfig.get().redis.dsn)
+
+
+async def kiq_delayed(
+    task: AsyncTaskiqDecoratedTask[Any, Any],
+    delay: float,
+    *args: Any,
+    **kwargs: Any,
+) -> None:
+    """Поставить задачу на выполнение через delay секунд без ожидания в воркере."""
+    eta = datetime.now(timezone.utc) + timedelta(seconds=delay)
+    await task.schedule_by_time(delayed_source, eta, *args, **kwargs)
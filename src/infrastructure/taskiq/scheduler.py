@@ -4,12 +4,13 @@ from taskiq.schedule_sources import LabelScheduleSource
 from src.core.logger import setup_logger
 
 from .broker import broker
+from .schedule_source import delayed_source
 
 
 def scheduler() -> TaskiqScheduler:
     setup_logger(rotation=False)
     scheduler = TaskiqScheduler(
         broker=broker,
-        sources=[LabelScheduleSource(broker)],
+        sources=[LabelScheduleSource(broker), delayed_source],
     )
     return scheduler
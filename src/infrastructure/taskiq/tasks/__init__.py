@@ -1,4 +1,13 @@
-from . import notifications, payments, redirects, referrals, subscriptions, sync, update_checker
+from . import (
+    notifications,
+    payments,
+    redirects,
+    referrals,
+    statistics,
+    subscriptions,
+    sync,
+    update_checker,
+)
 
 __all__ = [
     "notifications",
@@ -6,6 +15,7 @@ __all__ = [
     "redirects",
     "subscriptions",
     "referrals",
+    "statistics",
     "sync",
     "update_checker",
 ]
@@ -0,0 +1,323 @@
+from pathlib import Path
+from typing import Any
+
+from aiogram import Bot
+from aiogram.types import FSInputFile, InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram_dialog import BgManagerFactory, ShowMode, StartMode
+from dishka.integrations.taskiq import FromDishka, inject
+from fluentogram import TranslatorHub, TranslatorRunner
+from loguru import logger
+
+from src.bot.states import Dashboard
+from src.core.utils.message_payload import MessagePayload
+from src.core.utils.time import datetime_now
+from src.infrastructure.database.models.dto import BaseUserDto
+from src.infrastructure.taskiq.broker import broker
+from src.infrastructure.taskiq.progress import ProgressMessage
+from src.infrastructure.taskiq.tasks.importer import sync_bot_to_panel_task
+from src.services.backup import BackupService
+from src.services.notification import NotificationService
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def create_backup_task(
+    user: BaseUserDto,
+    bot: FromDishka[Bot],
+    translator_hub: FromDishka[TranslatorHub],
+    backup_service: FromDishka[BackupService],
+    notification_service: FromDishka[NotificationService],
+) -> None:
+    i18n = translator_hub.get_translator_by_locale(locale=user.language)
+    message = await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload.not_deleted(
+            i18n_key="ntf-db-save-started",
+            add_close_button=False,
+        ),
+    )
+    progress = ProgressMessage(bot, i18n, message, "ntf-db-save-progress")
+
+    try:
+        await backup_service.create_backup(on_progress=progress.update)
+    except Exception as exception:
+        logger.exception(f"Database backup failed: {exception}")
+        await progress.delete()
+        await notification_service.notify_user(
+            user=user,
+            payload=MessagePayload(i18n_key="ntf-db-save-failed"),
+        )
+        return
+
+    await progress.delete()
+    await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload(i18n_key="ntf-db-save-success"),
+    )
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def restore_backup_task(
+    user: BaseUserDto,
+    path: str,
+    bot: FromDishka[Bot],
+    bg_manager_factory: FromDishka[BgManagerFactory],
+    translator_hub: FromDishka[TranslatorHub],
+    backup_service: FromDishka[BackupService],
+    notification_service: FromDishka[NotificationService],
+) -> None:
+    i18n = translator_hub.get_translator_by_locale(locale=user.language)
+    message = await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload.not_deleted(
+            i18n_key="ntf-db-restore-preparing",
+            add_close_button=False,
+        ),
+    )
+    progress = ProgressMessage(bot, i18n, message, "ntf-db-restore-progress")
+
+    try:
+        await backup_service.restore_backup(Path(path), on_progress=progress.update)
+    except Exception as exception:
+        logger.exception(f"Restore from backup '{path}' failed: {exception}")
+        await progress.delete()
+        await notification_service.notify_user(
+            user=user,
+            payload=MessagePayload(i18n_key="ntf-db-restore-failed"),
+        )
+        return
+
+    await progress.delete()
+
+    # Синхронизация данных из бота в панель Remnawave
+    logger.info("Starting sync from bot to Remnawave panel after restore")
+    sync_notification = await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload.not_deleted(
+            i18n_key="ntf-importer-sync-started",
+            add_close_button=False,
+        ),
+    )
+
+    try:
+        task = await sync_bot_to_panel_task.kiq()
+        result = await task.wait_result()
+        sync_result = result.return_value
+
+        if sync_notification:
+            await sync_notification.delete()
+
+        if sync_result:
+            logger.info(f"Sync completed: {sync_result}")
+            await notification_service.notify_user(
+                user=user,
+                payload=MessagePayload(
+                    text=_build_sync_report(i18n, sync_result),
+                    add_close_button=True,
+                    auto_delete_after=None,
+                ),
+            )
+        else:
+            logger.warning("Sync returned no results")
+    except Exception as sync_error:
+        logger.exception(f"Sync with panel failed: {sync_error}")
+        if sync_notification:
+            await sync_notification.delete()
+
+        await notification_service.notify_user(
+            user=user,
+            payload=MessagePayload(
+                i18n_key="ntf-db-sync-error",
+                i18n_kwargs={"error": str(sync_error)},
+                add_close_button=True,
+                auto_delete_after=None,
+            ),
+        )
+
+    bg_manager = bg_manager_factory.bg(
+        bot=bot,
+        user_id=user.telegram_id,
+        chat_id=user.telegram_id,
+    )
+    await bg_manager.start(
+        state=Dashboard.MAIN,
+        mode=StartMode.RESET_STACK,
+        show_mode=ShowMode.DELETE_AND_SEND,
+    )
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def export_database_task(
+    user: BaseUserDto,
+    backup_service: FromDishka[BackupService],
+    notification_service: FromDishka[NotificationService],
+) -> None:
+    await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload(i18n_key="ntf-db-export-start"),
+    )
+
+    try:
+        path = await backup_service.export_archive()
+    except Exception as exception:
+        logger.exception(f"Database export failed: {exception}")
+        await notification_service.notify_user(
+            user=user,
+            payload=MessagePayload(
+                i18n_key="ntf-db-export-error",
+                i18n_kwargs={"error": str(exception)},
+            ),
+        )
+        return
+
+    await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload(
+            i18n_key="ntf-db-export-success",
+            i18n_kwargs={"path": str(path)},
+        ),
+    )
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def export_backup_task(
+    user: BaseUserDto,
+    path: str,
+    bot: FromDishka[Bot],
+    translator_hub: FromDishka[TranslatorHub],
+    backup_service: FromDishka[BackupService],
+    notification_service: FromDishka[NotificationService],
+) -> None:
+    i18n = translator_hub.get_translator_by_locale(locale=user.language)
+    message = await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload.not_deleted(
+            i18n_key="ntf-db-convert-in-progress",
+            add_close_button=False,
+        ),
+    )
+    progress = ProgressMessage(bot, i18n, message, "ntf-db-convert-progress")
+    # Бэкап разворачивается во временную базу и выгружается из неё в архив
+    temp_database = f"temp_export_{datetime_now():%Y%m%d%H%M%S}"
+
+    try:
+        await backup_service.create_database(temp_database)
+        await backup_service.load_dump(Path(path), temp_database, on_progress=progress.update)
+        archive_path = await backup_service.export_archive(temp_database)
+    except Exception as exception:
+        logger.exception(f"Export of backup '{path}' failed: {exception}")
+        await progress.delete()
+        await notification_service.notify_user(
+            user=user,
+            payload=MessagePayload(
+                i18n_key="ntf-db-export-error",
+                i18n_kwargs={"error": str(exception)},
+            ),
+        )
+        return
+    finally:
+        await backup_service.drop_database(temp_database)
+
+    await progress.delete()
+    await bot.send_document(
+        chat_id=user.telegram_id,
+        document=FSInputFile(archive_path, filename=archive_path.name),
+        caption=i18n.get("ntf-db-convert-success"),
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=i18n.get("btn-db-close"),
+                        callback_data="delete_message",
+                        style="danger",
+                    )
+                ]
+            ]
+        ),
+    )
+    archive_path.unlink(missing_ok=True)
+    logger.info(f"Backup '{path}' exported and sent to '{user.telegram_id}'")
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def import_archive_task(
+    user: BaseUserDto,
+    path: str,
+    bot: FromDishka[Bot],
+    bg_manager_factory: FromDishka[BgManagerFactory],
+    backup_service: FromDishka[BackupService],
+    notification_service: FromDishka[NotificationService],
+) -> None:
+    message = await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload.not_deleted(
+            i18n_key="ntf-db-import-started",
+            add_close_button=False,
+        ),
+    )
+
+    try:
+        rows = await backup_service.import_archive(Path(path))
+    except Exception as exception:
+        logger.exception(f"Import of archive '{path}' failed: {exception}")
+        payload = MessagePayload(i18n_key="ntf-db-import-failed")
+    else:
+        payload = MessagePayload(i18n_key="ntf-db-import-success", i18n_kwargs={"rows": rows})
+
+    if message:
+        await message.delete()
+    await notification_service.notify_user(user=user, payload=payload)
+
+    bg_manager = bg_manager_factory.bg(
+        bot=bot,
+        user_id=user.telegram_id,
+        chat_id=user.telegram_id,
+    )
+    await bg_manager.start(
+        state=Dashboard.MAIN,
+        mode=StartMode.RESET_STACK,
+        show_mode=ShowMode.DELETE_AND_SEND,
+    )
+
+
+def _build_sync_report(i18n: TranslatorRunner, sync_result: dict[str, Any]) -> str:
+    total = sync_result.get("total_bot_users", 0)
+    created = sync_result.get("created", 0)
+    updated = sync_result.get("updated", 0)
+    skipped = sync_result.get("skipped", 0)
+    errors = sync_result.get("errors", 0)
+    error_users: dict[str, str] = sync_result.get("error_users", {})
+    skipped_users: list[str] = sync_result.get("skipped_users", [])
+    has_skipped = bool(skipped_users) and skipped > 0
+
+    report = f"{i18n.get('ntf-db-sync-title')}\n\n"
+
+    if has_skipped:
+        report += f"{i18n.get('ntf-db-sync-skipped-title')}\n<blockquote>"
+        report += "".join(f"• {user_info}\n" for user_info in skipped_users)
+        report += "</blockquote>"
+
+    if error_users:
+        if has_skipped:
+            report += "\n"
+        report += f"{i18n.get('ntf-db-sync-errors-title')}\n<blockquote>"
+        report += "".join(
+            f"• {user_info}\n  {error_reason}\n\n"
+            for user_info, error_reason in error_users.items()
+        )
+        report += "</blockquote>"
+
+    if error_users or has_skipped:
+        report += "\n"
+    report += f"{i18n.get('ntf-db-sync-stats-title')}\n<blockquote>"
+    report += f"{i18n.get('ntf-db-sync-stats-total', total=total)}\n"
+    report += f"{i18n.get('ntf-db-sync-stats-created', created=created)}\n"
+    report += f"{i18n.get('ntf-db-sync-stats-updated', updated=updated)}\n"
+    report += f"{i18n.get('ntf-db-sync-stats-skipped', skipped=skipped)}\n"
+    report += f"{i18n.get('ntf-db-sync-stats-errors', errors=errors)}"
+    report += "</blockquote>"
+    return report
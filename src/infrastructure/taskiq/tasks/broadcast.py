@@ -1,22 +1,44 @@
 import asyncio
-from typing import Optional, cast
+from bisect import bisect_left
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Final, Optional, cast
 
 from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramRetryAfter
 from dishka.integrations.taskiq import FromDishka, inject
 from loguru import logger
 
-from src.core.enums import BroadcastMessageStatus, BroadcastStatus
+from src.core.enums import BroadcastAudience, BroadcastMessageStatus, BroadcastStatus
 from src.core.utils.iterables import chunked
 from src.core.utils.message_payload import MessagePayload
-from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto, UserDto
+from src.core.utils.rate_limit import AdaptiveTokenBucket
+from src.infrastructure.database.models.dto import (
+    BroadcastDto,
+    BroadcastMessageDto,
+    SettingsDto,
+)
+from src.infrastructure.database.models.dto.user import BaseUserDto
 from src.infrastructure.taskiq.broker import broker
-from src.services.broadcast import BroadcastService
+from src.services.broadcast import BroadcastCheckpoint, BroadcastService
 from src.services.mirror_bot import MirrorBotService
 from src.services.notification import NotificationService
 
 
+BROADCAST_INITIAL_RATE: Final[float] = 10.0
+# Telegram допускает ~30 сообщений в секунду на бота, оставляем запас
+BROADCAST_MAX_RATE: Final[float] = 25.0
+BROADCAST_WORKERS_PER_BOT: Final[int] = 10
+BROADCAST_MAX_ATTEMPTS: Final[int] = 5
+BROADCAST_CHAT_INTERVAL: Final[float] = 1.0
+BROADCAST_FLUSH_INTERVAL: Final[float] = 1.0
+# Пополнять очередь бота, когда в ней меньше сообщений
+BROADCAST_PREFETCH: Final[int] = 250
+BROADCAST_LATENCY_BUCKETS_MS: Final[tuple[float, ...]] = (100, 250, 500, 1000, 2500)
+BROADCAST_THROUGHPUT_BUCKETS: Final[tuple[float, ...]] = (5, 10, 15, 20, 25, 30)
+
 _mirror_bots_initialized = False
 
 
@@ -33,12 +55,321 @@ class _SimpleMirrorManager:
         self._bots[bot_id] = bot
 
 
+@dataclass
+class _Chunk:
+    last_telegram_id: int
+    # Доставки порции во всех ботах, ещё не получившие итоговый статус
+    remaining: int = 0
+
+
+@dataclass
+class _Delivery:
+    user: BaseUserDto
+    chunk: _Chunk
+    # Строка рассылки есть только у основного бота, зеркала считаются отдельно
+    message: Optional[BroadcastMessageDto] = None
+    attempts: int = 0
+
+
+class _Histogram:
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    def as_dict(self) -> dict[str, int]:
+        labels = [f"le_{bound:g}" for bound in self.bounds] + ["inf"]
+        return dict(zip(labels, self.counts))
+
+
+class _BotLane:
+    """Очередь рассылки одного бота со своим token bucket и счётчиками."""
+
+    def __init__(self, name: str, bot: Bot) -> None:
+        self.name = name
+        self.bot = bot
+        self.bucket = AdaptiveTokenBucket(
+            rate=BROADCAST_INITIAL_RATE,
+            max_rate=BROADCAST_MAX_RATE,
+        )
+        self.queue: asyncio.Queue[_Delivery] = asyncio.Queue()
+        self.done = asyncio.Event()
+        self.done.set()
+        self.counters: Counter[str] = Counter()
+        # Сообщения в очереди, в отправке и ожидающие повтора после RetryAfter
+        self.pending = 0
+
+    def put(self, delivery: _Delivery) -> None:
+        self.pending += 1
+        self.done.clear()
+        self.queue.put_nowait(delivery)
+
+    def finish(self) -> None:
+        self.pending -= 1
+        if self.pending <= 0:
+            self.done.set()
+
+
+class _BroadcastEngine:
+    """Отправка рассылки с подстройкой под лимиты Telegram.
+
+    У основного бота и каждого зеркала своя очередь и token bucket: скорость
+    растёт до `BROADCAST_MAX_RATE`, а `RetryAfter` замедляет бота и возвращает
+    сообщение в очередь после рекомендованной паузы. Результаты основного бота
+    сохраняются в БД раз в `BROADCAST_FLUSH_INTERVAL`, там же проверяется отмена
+    и сохраняется чекпоинт: курсор полностью обработанных получателей.
+
+    Перед первой попыткой получатель отмечается в Redis, поэтому возобновлённая
+    рассылка не отправит ему повторно сообщение, которое уже могло уйти.
+    """
+
+    def __init__(
+        self,
+        notification_service: NotificationService,
+        broadcast_service: BroadcastService,
+        broadcast: BroadcastDto,
+        payload: MessagePayload,
+        settings: SettingsDto,
+        checkpoint: BroadcastCheckpoint,
+    ) -> None:
+        self.notification_service = notification_service
+        self.broadcast_service = broadcast_service
+        self.broadcast_id = cast(int, broadcast.id)
+        self.task_id = broadcast.task_id
+        self.payload = payload
+        self.settings = settings
+        self.checkpoint = checkpoint
+
+        self.lanes = [_BotLane("main", notification_service.bot)]
+        mirror_manager = NotificationService._mirror_bot_manager
+        if mirror_manager:
+            for mirror_id, mirror_bot in mirror_manager.active_bots.items():
+                self.lanes.append(_BotLane(f"mirror_{mirror_id}", mirror_bot))
+
+        self.latency = _Histogram(BROADCAST_LATENCY_BUCKETS_MS)
+        self.throughput = _Histogram(BROADCAST_THROUGHPUT_BUCKETS)
+        self._completed: list[BroadcastMessageDto] = []
+        self._chunks: deque[_Chunk] = deque()
+        self._window_sent = 0
+
+    async def run(self, recipients: AsyncIterator[list[BaseUserDto]]) -> bool:
+        workers = [
+            asyncio.create_task(self._worker(lane))
+            for lane in self.lanes
+            for _ in range(BROADCAST_WORKERS_PER_BOT)
+        ]
+        is_exhausted = False
+        is_canceled = False
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                self._check_workers(workers)
+
+                # Очереди пополняются порциями, чтобы память не зависела от размера аудитории
+                if not is_exhausted and self._needs_recipients():
+                    chunk = await anext(recipients, None)
+                    if chunk is None:
+                        is_exhausted = True
+                    else:
+                        self._enqueue(chunk, await self._get_unreachable(chunk))
+
+                if is_exhausted and all(lane.done.is_set() for lane in self.lanes):
+                    break
+
+                window_start = loop.time()
+                await self._wait_lanes(BROADCAST_FLUSH_INTERVAL)
+                await self._flush(loop.time() - window_start)
+                await self.broadcast_service.refresh_lock(self.broadcast_id)
+
+                status = await self.broadcast_service.get_status(self.task_id)
+                if status == BroadcastStatus.CANCELED:
+                    is_canceled = True
+                    break
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        await self._flush(0)
+        return is_canceled
+
+    def get_stats(self, elapsed: float) -> dict[str, Any]:
+        return {
+            "elapsed": round(elapsed, 2),
+            "latency_ms": self.latency.as_dict(),
+            "throughput": self.throughput.as_dict(),
+            "bots": {
+                lane.name: {**lane.counters, "rate": round(lane.bucket.rate, 2)}
+                for lane in self.lanes
+            },
+        }
+
+    @staticmethod
+    def _check_workers(workers: list[asyncio.Task[None]]) -> None:
+        # Без упавшего воркера очередь линии не опустеет и рассылка не завершится
+        for worker in workers:
+            if worker.done():
+                exception = worker.exception()
+                if exception:
+                    raise exception
+                raise RuntimeError("Broadcast worker stopped unexpectedly")
+
+    async def _worker(self, lane: _BotLane) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            delivery = await lane.queue.get()
+            telegram_id = delivery.user.telegram_id
+
+            if delivery.attempts == 0:
+                try:
+                    is_claimed = await self.broadcast_service.claim_recipient(
+                        self.broadcast_id, lane.name, telegram_id
+                    )
+                except Exception:
+                    logger.exception(
+                        f"Failed to claim broadcast recipient '{telegram_id}' via '{lane.name}'"
+                    )
+                    lane.counters["failed"] += 1
+                    self._complete(lane, delivery, BroadcastMessageStatus.FAILED)
+                    continue
+
+                if not is_claimed:
+                    # Отправка уже начиналась до перезапуска, её результат неизвестен
+                    lane.counters["skipped"] += 1
+                    self._complete(lane, delivery, BroadcastMessageStatus.PENDING)
+                    continue
+
+            await lane.bucket.acquire()
+            send_start = loop.time()
+
+            try:
+                tg_message = await self.notification_service.send_broadcast_message(
+                    user=delivery.user,
+                    payload=self.payload,
+                    settings=self.settings,
+                    bot=lane.bot,
+                )
+            except TelegramRetryAfter as exception:
+                lane.bucket.on_retry_after(exception.retry_after)
+                lane.counters["retry_after"] += 1
+                delivery.attempts += 1
+                if delivery.attempts < BROADCAST_MAX_ATTEMPTS:
+                    # Не чаще одного сообщения в секунду в один чат
+                    delay = max(exception.retry_after, BROADCAST_CHAT_INTERVAL)
+                    loop.call_later(delay, lane.queue.put_nowait, delivery)
+                    continue
+                tg_message = None
+            except Exception:
+                logger.exception(
+                    f"Failed to send broadcast message via '{lane.name}' for '{telegram_id}'"
+                )
+                tg_message = None
+
+            self.latency.observe((loop.time() - send_start) * 1000)
+
+            if tg_message:
+                lane.bucket.on_success()
+                lane.counters["sent"] += 1
+                self._window_sent += 1
+                self._complete(
+                    lane,
+                    delivery,
+                    BroadcastMessageStatus.SENT,
+                    message_id=tg_message.message_id,
+                )
+            else:
+                lane.counters["failed"] += 1
+                self._complete(lane, delivery, BroadcastMessageStatus.FAILED)
+
+    def _complete(
+        self,
+        lane: _BotLane,
+        delivery: _Delivery,
+        status: BroadcastMessageStatus,
+        message_id: Optional[int] = None,
+    ) -> None:
+        if delivery.message:
+            delivery.message.message_id = message_id
+            delivery.message.status = status
+            self._completed.append(delivery.message)
+
+        delivery.chunk.remaining -= 1
+        lane.finish()
+
+    def _needs_recipients(self) -> bool:
+        return all(lane.pending < BROADCAST_PREFETCH for lane in self.lanes)
+
+    async def _get_unreachable(self, users: list[BaseUserDto]) -> dict[str, set[int]]:
+        """Недоступные зеркалам пользователи порции: их не отправляют и не тратят лимит."""
+        telegram_ids = [user.telegram_id for user in users]
+        return {
+            lane.name: await self.notification_service.get_mirror_unreachable(
+                lane.bot.id, telegram_ids
+            )
+            for lane in self.lanes[1:]
+        }
+
+    def _enqueue(self, users: list[BaseUserDto], unreachable: dict[str, set[int]]) -> None:
+        main_lane, *mirror_lanes = self.lanes
+        chunk = _Chunk(last_telegram_id=users[-1].telegram_id)
+        self._chunks.append(chunk)
+
+        for user in users:
+            message = BroadcastMessageDto(
+                user_id=user.telegram_id,
+                status=BroadcastMessageStatus.PENDING,
+            )
+            main_lane.put(_Delivery(user=user, chunk=chunk, message=message))
+            chunk.remaining += 1
+
+            for lane in mirror_lanes:
+                if user.telegram_id in unreachable.get(lane.name, ()):
+                    lane.counters["skipped"] += 1
+                    continue
+                lane.put(_Delivery(user=user, chunk=chunk))
+                chunk.remaining += 1
+
+    async def _wait_lanes(self, timeout: float) -> None:
+        waiters = [asyncio.ensure_future(lane.done.wait()) for lane in self.lanes]
+        try:
+            await asyncio.wait(waiters, timeout=timeout)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _flush(self, window: float) -> None:
+        if window > 0:
+            self.throughput.observe(self._window_sent / window)
+        self._window_sent = 0
+
+        # Курсор считается до записи: завершённые во время неё доставки ещё не сохранены
+        cursor: Optional[int] = None
+        while self._chunks and self._chunks[0].remaining == 0:
+            cursor = self._chunks.popleft().last_telegram_id
+
+        if self._completed:
+            messages, self._completed = self._completed, []
+            await self.broadcast_service.add_messages(self.broadcast_id, messages)
+            logger.info(
+                f"Broadcast '{self.task_id}': saved {len(messages)} results, rates: "
+                + ", ".join(f"{lane.name}={lane.bucket.rate:.1f}/s" for lane in self.lanes)
+            )
+
+        if cursor is not None:
+            self.checkpoint.cursor = cursor
+            await self.broadcast_service.save_checkpoint(self.broadcast_id, self.checkpoint)
+
+
 @broker.task
 @inject
 async def send_broadcast_task(
-    broadcast: BroadcastDto,
-    users: list[UserDto],
-    payload: MessagePayload,
+    broadcast_id: int,
+    audience: BroadcastAudience,
+    plan_id: Optional[int],
     notification_service: FromDishka[NotificationService],
     broadcast_service: FromDishka[BroadcastService],
     mirror_bot_service: FromDishka[MirrorBotService],
@@ -70,81 +401,76 @@ async def send_broadcast_task(
         finally:
             _mirror_bots_initialized = True
     
-    broadcast_id = cast(int, broadcast.id)
-    total_users = len(users)
-    loop = asyncio.get_running_loop()
-    start_time = loop.time()
-
-    logger.info(f"Started sending broadcast '{broadcast_id}', total users: {total_users}")
-
-    try:
-        broadcast_messages = await broadcast_service.create_messages(
-            broadcast_id,
-            [
-                BroadcastMessageDto(user_id=user.telegram_id, status=BroadcastMessageStatus.PENDING)
-                for user in users
-            ],
-        )
-        logger.debug(
-            f"Created '{len(broadcast_messages)}' message DTOs for broadcast '{broadcast_id}'"
-        )
-    except Exception:
-        logger.exception(f"Failed to create message DTOs for broadcast '{broadcast_id}'")
-        broadcast.status = BroadcastStatus.ERROR
-        await broadcast_service.update(broadcast)
+    broadcast = await broadcast_service.get_by_id(broadcast_id)
+    if not broadcast:
+        logger.error(f"Broadcast '{broadcast_id}' not found, aborting")
         return
 
-    async def send_message(user: UserDto, message: BroadcastMessageDto) -> None:
-        try:
-            tg_message = await notification_service.notify_user(user=user, payload=payload)
-            if tg_message:
-                message.message_id = tg_message.message_id
-                message.status = BroadcastMessageStatus.SENT
-            else:
-                message.status = BroadcastMessageStatus.FAILED
-        except Exception:
-            logger.exception(
-                f"Failed to send broadcast '{broadcast_id}' message for '{user.telegram_id}'",
-            )
-            message.status = BroadcastMessageStatus.FAILED
-
-    user_message_pairs = list(zip(users, broadcast_messages))
-    last_known_status: Optional[BroadcastStatus] = broadcast.status
-
-    for i, batch in enumerate(chunked(user_message_pairs, 20), start=1):
-        batch_start = loop.time()
+    if broadcast.status != BroadcastStatus.PROCESSING:
+        logger.info(f"Broadcast '{broadcast_id}' is already '{broadcast.status}', skipping")
+        return
 
-        last_known_status = await broadcast_service.get_status(broadcast.task_id)
-        if last_known_status == BroadcastStatus.CANCELED:
-            break
+    if not await broadcast_service.acquire_lock(broadcast_id):
+        logger.info(f"Broadcast '{broadcast_id}' is already being sent by another task")
+        return
 
-        tasks = [send_message(u, m) for u, m in batch]
-        await asyncio.gather(*tasks)
+    try:
+        await _send_broadcast(broadcast, audience, plan_id, notification_service, broadcast_service)
+    finally:
+        await broadcast_service.release_lock(broadcast_id)
 
-        _, messages_batch = zip(*batch)
-        await broadcast_service.bulk_update_messages(list(messages_batch))
 
-        batch_elapsed = loop.time() - batch_start
-        logger.info(f"Batch {i}: sent {len(batch)} messages in {batch_elapsed:.2f}s")
+async def _send_broadcast(
+    broadcast: BroadcastDto,
+    audience: BroadcastAudience,
+    plan_id: Optional[int],
+    notification_service: NotificationService,
+    broadcast_service: BroadcastService,
+) -> None:
+    broadcast_id = cast(int, broadcast.id)
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
 
-        wait_time = 1.0 - batch_elapsed
-        if wait_time > 0:
-            await asyncio.sleep(wait_time)
+    checkpoint = await broadcast_service.get_checkpoint(broadcast_id)
+    if checkpoint is None:
+        checkpoint = BroadcastCheckpoint(plan_id=plan_id)
 
-    broadcast.success_count = sum(
-        1 for m in broadcast_messages if m.status == BroadcastMessageStatus.SENT
-    )
-    broadcast.failed_count = sum(
-        1 for m in broadcast_messages if m.status == BroadcastMessageStatus.FAILED
+    logger.info(
+        f"Started sending broadcast '{broadcast_id}' to audience '{audience}' "
+        f"(plan={checkpoint.plan_id}), expected users: {broadcast.total_count}, "
+        f"resuming after: {checkpoint.cursor}"
     )
 
-    broadcast.status = (
-        BroadcastStatus.CANCELED
-        if last_known_status == BroadcastStatus.CANCELED
-        else BroadcastStatus.COMPLETED
+    settings = await notification_service.settings_service.get()
+    engine = _BroadcastEngine(
+        notification_service=notification_service,
+        broadcast_service=broadcast_service,
+        broadcast=broadcast,
+        payload=broadcast.payload,
+        settings=settings,
+        checkpoint=checkpoint,
+    )
+    recipients = broadcast_service.iter_audience(
+        audience,
+        checkpoint.plan_id,
+        after_telegram_id=checkpoint.cursor,
+        skip_broadcast_id=broadcast_id,
     )
 
+    try:
+        is_canceled = await engine.run(recipients)
+    except Exception:
+        # Рассылка остаётся PROCESSING: повтор задачи продолжит её с чекпоинта
+        logger.exception(f"Broadcast '{broadcast_id}' interrupted, it will resume from checkpoint")
+        raise
+
+    counts = await broadcast_service.count_messages(broadcast_id)
+    broadcast.success_count = counts.get(BroadcastMessageStatus.SENT, 0)
+    broadcast.failed_count = counts.get(BroadcastMessageStatus.FAILED, 0)
+    broadcast.status = BroadcastStatus.CANCELED if is_canceled else BroadcastStatus.COMPLETED
+    broadcast.stats = engine.get_stats(loop.time() - start_time)
     await broadcast_service.update(broadcast)
+    await broadcast_service.clear_state(broadcast_id)
 
     total_elapsed = loop.time() - start_time
     logger.info(
@@ -153,6 +479,23 @@ async def send_broadcast_task(
     )
 
 
+@broker.task(schedule=[{"cron": "* * * * *"}])
+@inject
+async def resume_broadcasts_task(broadcast_service: FromDishka[BroadcastService]) -> None:
+    """Возобновляет рассылки, оставшиеся без задачи (например, после перезапуска воркера)."""
+    for broadcast_id, audience in await broadcast_service.get_processing():
+        if await broadcast_service.is_locked(broadcast_id):
+            continue
+
+        checkpoint = await broadcast_service.get_checkpoint(broadcast_id)
+        if checkpoint is None:
+            logger.warning(f"Broadcast '{broadcast_id}' has no checkpoint and cannot be resumed")
+            continue
+
+        logger.info(f"Resuming broadcast '{broadcast_id}' after '{checkpoint.cursor}'")
+        await send_broadcast_task.kiq(broadcast_id, audience, checkpoint.plan_id)
+
+
 @broker.task
 @inject
 async def delete_broadcast_task(
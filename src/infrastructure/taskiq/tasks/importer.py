@@ -1,10 +1,32 @@
+import asyncio
 import traceback
+from collections import Counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Final,
+    Literal,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    cast,
+)
 from uuid import UUID
 
 from dishka.integrations.taskiq import FromDishka, inject
 from loguru import logger
 from remnapy import RemnawaveSDK
-from remnapy.exceptions import BadRequestError
+from remnapy.exceptions import (
+    BadRequestError,
+    ConflictError,
+    MaintenanceError,
+    NetworkError,
+    NotFoundError,
+    RateLimitError,
+    ServerError,
+)
 from remnapy.models import CreateUserRequestDto, UserResponseDto, UpdateUserRequestDto
 
 from src.core.config import AppConfig
@@ -12,6 +34,11 @@ from src.core.storage.keys import SyncRunningKey
 from src.core.utils.formatters import format_device_count, format_gb_to_bytes
 from src.core.utils.message_payload import MessagePayload
 from src.bot.keyboards import get_user_keyboard
+from src.infrastructure.database.models.dto import (
+    RemnaSubscriptionDto,
+    SubscriptionDto,
+    UserDto,
+)
 from src.infrastructure.redis.repository import RedisRepository
 from src.infrastructure.taskiq.broker import broker
 from src.services.notification import NotificationService
@@ -20,6 +47,27 @@ from src.services.remnawave import RemnawaveService
 from src.services.subscription import SubscriptionService
 from src.services.user import UserService
 
+PANEL_PAGE_SIZE: Final[int] = 250
+# Параллельные запросы к панели, оставшиеся в синхронизации
+PANEL_CONCURRENCY: Final[int] = 10
+PANEL_RETRY_ATTEMPTS: Final[int] = 3
+PANEL_RETRY_DELAY: Final[float] = 1.0
+PANEL_RETRY_ERRORS: Final = (NetworkError, RateLimitError, MaintenanceError, ServerError)
+SYNC_PROGRESS_STEP: Final[int] = 100
+
+T = TypeVar("T")
+
+
+_PendingSync = dict[int, tuple[SubscriptionDto, RemnaSubscriptionDto, UUID]]
+
+
+class _PanelSyncJob(NamedTuple):
+    action: Literal["create", "update", "recreate"]
+    user: UserDto
+    subscription: SubscriptionDto
+    panel_user: Optional[UserResponseDto] = None
+    short_uuid: Optional[str] = None
+
 
 @broker.task(retry_on_error=False)
 @inject
@@ -52,89 +100,176 @@ async def import_exported_users_task(
     return success_count, failed_count
 
 
+async def _iter_panel_users(
+    remnawave: RemnawaveSDK,
+    size: int = PANEL_PAGE_SIZE,
+) -> AsyncIterator[list[UserResponseDto]]:
+    """Страницы пользователей панели; следующая запрашивается, пока обрабатывается текущая."""
+    start = 0
+    next_page = asyncio.create_task(remnawave.users.get_all_users(start=start, size=size))
+
+    try:
+        while True:
+            response = await next_page
+            if not response.users:
+                return
+
+            start += len(response.users)
+            # Панель может отдавать меньше `size` за раз: ориентируемся только на total
+            has_more = start < response.total
+            if has_more:
+                next_page = asyncio.create_task(
+                    remnawave.users.get_all_users(start=start, size=size)
+                )
+
+            yield response.users
+
+            if not has_more:
+                return
+    finally:
+        if not next_page.done():
+            next_page.cancel()
+
+
 @broker.task(retry_on_error=False)
 @inject
 async def sync_all_users_from_panel_task(
     redis_repository: FromDishka[RedisRepository],
     remnawave: FromDishka[RemnawaveSDK],
     remnawave_service: FromDishka[RemnawaveService],
-    user_service: FromDishka[UserService],
     subscription_service: FromDishka[SubscriptionService],
 ) -> dict[str, int]:
+    """
+    Синхронизирует пользователей ИЗ панели В бота.
+    - Текущие подписки всех пользователей бота загружаются одним запросом
+    - Страницы панели обрабатываются по мере получения
+    - Изменения существующих подписок считаются в памяти и сохраняются пачками
+    - Новые пользователи, подписки и смена тега идут через `RemnawaveService.sync_user`
+    """
     key = SyncRunningKey()
-    all_remna_users: list[UserResponseDto] = []
-    start = 0
-    size = 50
-
-    stats = await remnawave.system.get_stats()
-    total_users = stats.users.total_users
-
-    for start in range(0, total_users, size):
-        response = await remnawave.users.get_all_users(start=start, size=size)
-        if not response.users:
-            break
+    panel_semaphore = asyncio.Semaphore(PANEL_CONCURRENCY)
 
-        all_remna_users.extend(response.users)
-        start += len(response.users)
+    async def fill_subscription_url(remna_subscription: RemnaSubscriptionDto, uuid: UUID) -> None:
+        async with panel_semaphore:
+            url = await remnawave_service.get_subscription_url(uuid)
+            remna_subscription.url = url  # type: ignore[assignment]
 
-        if len(response.users) < size:
-            break
+    stats: Counter[str] = Counter()
+    changed = 0
 
-    bot_users = await user_service.get_all()
-    bot_users_map = {user.telegram_id: user for user in bot_users}
+    try:
+        current_subscriptions = await subscription_service.get_current_index()
+        logger.info(f"Total users in bot: '{len(current_subscriptions)}'")
 
-    logger.info(f"Total users in panel: '{len(all_remna_users)}'")
-    logger.info(f"Total users in bot: '{len(bot_users)}'")
+        async for remna_users in _iter_panel_users(remnawave):
+            stats["total_panel_users"] += len(remna_users)
+            pending, slow_path = _split_panel_page(remna_users, current_subscriptions, stats)
 
-    added_users = 0
-    added_subscription = 0
-    updated = 0
-    errors = 0
-    missing_telegram = 0
+            # Ссылки на подписку, которых нет в ответе панели, запрашиваются параллельно
+            url_results = await asyncio.gather(
+                *(
+                    fill_subscription_url(remna_subscription, uuid)
+                    for _, remna_subscription, uuid in pending.values()
+                    if not remna_subscription.url
+                ),
+                return_exceptions=True,
+            )
+            for result in url_results:
+                if isinstance(result, BaseException):
+                    logger.warning(f"Failed to get subscription url: {result}")
 
-    try:
-        for remna_user in all_remna_users:
+            changed_subscriptions = _collect_changed_subscriptions(pending, stats)
             try:
-                if not remna_user.telegram_id:
-                    missing_telegram += 1
-                    continue
-
-                user = bot_users_map.get(remna_user.telegram_id)
+                changed += await subscription_service.update_many(changed_subscriptions)
+            except Exception as exception:
+                logger.exception(f"Failed to update subscriptions batch: {exception}")
+                stats["errors"] += len(changed_subscriptions)
 
-                if not user:
+            for remna_user in slow_path:
+                try:
                     await remnawave_service.sync_user(remna_user)
-                    added_users += 1
-                else:
-                    current_subscription = await subscription_service.get_current(user.telegram_id)
-                    if not current_subscription:
-                        await remnawave_service.sync_user(remna_user)
-                        added_subscription += 1
-                    else:
-                        await remnawave_service.sync_user(remna_user)
-                        updated += 1
+                except Exception as exception:
+                    logger.exception(
+                        f"Error syncing RemnaUser '{remna_user.telegram_id}': {exception}"
+                    )
+                    stats["errors"] += 1
 
-            except Exception as exception:
-                logger.exception(
-                    f"Error syncing RemnaUser '{remna_user.telegram_id}' exception: {exception}"
-                )
-                errors += 1
+            logger.info(f"Processed '{stats['total_panel_users']}' panel users")
 
         result = {
-            "total_panel_users": len(all_remna_users),
-            "total_bot_users": len(bot_users),
-            "added_users": added_users,
-            "added_subscription": added_subscription,
-            "updated": updated,
-            "errors": errors,
-            "missing_telegram": missing_telegram,
+            "total_panel_users": stats["total_panel_users"],
+            "total_bot_users": len(current_subscriptions),
+            "added_users": stats["added_users"],
+            "added_subscription": stats["added_subscription"],
+            "updated": stats["updated"],
+            "errors": stats["errors"],
+            "missing_telegram": stats["missing_telegram"],
         }
 
-        logger.info(f"Sync users summary: '{result}'")
+        logger.info(f"Sync users summary: '{result}' ('{changed}' subscriptions changed)")
         return result
     finally:
         await redis_repository.delete(key)
 
 
+def _split_panel_page(
+    remna_users: list[UserResponseDto],
+    current_subscriptions: dict[int, Optional[SubscriptionDto]],
+    stats: Counter[str],
+) -> tuple[_PendingSync, list[UserResponseDto]]:
+    """Делит страницу панели на пакетное обновление подписок и `sync_user`."""
+    pending: _PendingSync = {}
+    slow_path: list[UserResponseDto] = []
+
+    for remna_user in remna_users:
+        telegram_id = remna_user.telegram_id
+        if not telegram_id:
+            stats["missing_telegram"] += 1
+            continue
+
+        if telegram_id not in current_subscriptions:
+            stats["added_users"] += 1
+            slow_path.append(remna_user)
+            continue
+
+        subscription = current_subscriptions[telegram_id]
+        if not subscription:
+            stats["added_subscription"] += 1
+            slow_path.append(remna_user)
+            continue
+
+        stats["updated"] += 1
+        remna_subscription = RemnaSubscriptionDto.from_remna_user(remna_user)
+        # Смена тега может переключить план — это логика sync_user
+        if remna_subscription.tag and remna_subscription.tag != subscription.tag:
+            slow_path.append(remna_user)
+            continue
+
+        pending[telegram_id] = (subscription, remna_subscription, remna_user.uuid)
+
+    return pending, slow_path
+
+
+def _collect_changed_subscriptions(
+    pending: _PendingSync,
+    stats: Counter[str],
+) -> dict[int, SubscriptionDto]:
+    changed_subscriptions: dict[int, SubscriptionDto] = {}
+
+    for telegram_id, (subscription, remna_subscription, _) in pending.items():
+        if not remna_subscription.url:
+            stats["errors"] += 1
+            continue
+        subscription = SubscriptionService.apply_sync(
+            target=subscription,
+            source=remna_subscription,
+        )
+        if subscription.changed_data:
+            changed_subscriptions[telegram_id] = subscription
+
+    return changed_subscriptions
+
+
 @broker.task(retry_on_error=False)
 @inject
 async def sync_bot_to_panel_task(
@@ -158,18 +293,18 @@ async def sync_bot_to_panel_task(
     # ========== ШАГ 1: Получение доступных squad'ов из панели ==========
     logger.info("Step 1: Getting available squads from Remnawave panel")
     
-    # Получаем все squad из панели
+    # Получаем свежий каталог squad'ов из панели, он же используется при создании пользователей
     try:
-        panel_squads_response = await remnawave.internal_squads.get_internal_squads()
-        if panel_squads_response and panel_squads_response.internal_squads:
-            first_squad = panel_squads_response.internal_squads[0]
+        squad_catalog = await remnawave_service.refresh_squad_catalog()
+        if squad_catalog.internal_squads:
+            first_squad = squad_catalog.internal_squads[0]
             logger.info(
-                f"Found {len(panel_squads_response.internal_squads)} internal squads in panel. "
+                f"Found {len(squad_catalog.internal_squads)} internal squads in panel. "
                 f"Will use first squad: '{first_squad.name}' ({first_squad.uuid})"
             )
             
             # Собираем множество валидных squad UUID для валидации
-            valid_squad_uuids = {squad.uuid for squad in panel_squads_response.internal_squads}
+            valid_squad_uuids = squad_catalog.internal_uuids
             
             # ========== ШАГ 1.5: Синхронизация internal_squads планов ==========
             logger.info("Step 1.5: Syncing plans internal_squads with panel")
@@ -183,358 +318,294 @@ async def sync_bot_to_panel_task(
             )
         else:
             logger.error("No internal squads found in panel - cannot sync users")
-            return {
-                "total_bot_users": 0,
-                "created": 0,
-                "updated": 0,
-                "skipped": 0,
-                "errors": 0,
-                "error_users": {},
-                "skipped_users": [],
-            }
+            return _empty_bot_to_panel_result()
     except Exception as e:
         logger.error(f"Failed to get squads from panel: {e}")
-        return {
-            "total_bot_users": 0,
-            "created": 0,
-            "updated": 0,
-            "skipped": 0,
-            "errors": 0,
-            "error_users": {},
-            "skipped_users": [],
-        }
+        return _empty_bot_to_panel_result()
     
-    # ========== ШАГ 2: Синхронизация пользователей ==========
-    logger.info("Step 2: Syncing users from bot to Remnawave panel")
-    
-    # Получаем всех пользователей бота с подписками
+    # ========== ШАГ 2: Индекс пользователей панели ==========
+    logger.info("Step 2: Building index of Remnawave panel users")
+
+    panel_index: dict[int, UserResponseDto] = {}
+    try:
+        async for remna_users in _iter_panel_users(remnawave):
+            for remna_user in remna_users:
+                if remna_user.telegram_id:
+                    panel_index.setdefault(remna_user.telegram_id, remna_user)
+    except Exception as e:
+        logger.error(f"Failed to get users from panel: {e}")
+        return _empty_bot_to_panel_result()
+
+    logger.info(f"Total users in panel index: '{len(panel_index)}'")
+
+    # ========== ШАГ 3: План синхронизации ==========
+    logger.info("Step 3: Planning sync of bot users")
+
     bot_users = await user_service.get_all()
+    current_subscriptions = await subscription_service.get_current_index()
     logger.info(f"Total users in bot: '{len(bot_users)}'")
-    
+
+    jobs: list[_PanelSyncJob] = []
+    skipped_users: list[str] = []
+
+    for user in bot_users:
+        subscription = current_subscriptions.get(user.telegram_id)
+        if not subscription:
+            logger.debug(
+                f"⊘ User skipped (no subscription): {user.name} (telegram_id: {user.telegram_id})"
+            )
+            skipped_users.append(f"{user.name} ({user.telegram_id})")
+            continue
+
+        panel_user = panel_index.get(user.telegram_id)
+        if not panel_user:
+            jobs.append(_PanelSyncJob("create", user, subscription))
+            continue
+
+        # short_uuid из бэкапа должен совпадать с панелью, иначе ссылка подписки сломается
+        short_uuid = _get_short_uuid(subscription.url)
+        if short_uuid and panel_user.short_uuid != short_uuid:
+            logger.warning(
+                f"⚠️ short_uuid MISMATCH for user {user.telegram_id}: "
+                f"panel={panel_user.short_uuid}, backup={short_uuid}. Will recreate user."
+            )
+            jobs.append(_PanelSyncJob("recreate", user, subscription, panel_user, short_uuid))
+        else:
+            jobs.append(_PanelSyncJob("update", user, subscription, panel_user))
+
+    logger.info(
+        f"Sync plan: {sum(job.action == 'create' for job in jobs)} create, "
+        f"{sum(job.action == 'update' for job in jobs)} update, "
+        f"{sum(job.action == 'recreate' for job in jobs)} recreate, "
+        f"{len(skipped_users)} skipped"
+    )
+
+    # ========== ШАГ 4: Изменения в панели ==========
+    logger.info("Step 4: Applying changes to Remnawave panel")
+
     created = 0
     updated = 0
     errors = 0
-    skipped = 0
-    
+    processed = 0
     error_users: dict[str, str] = {}  # {user_info: error_reason}
-    skipped_users: list[str] = []
-    
-    for user in bot_users:
+    # Новые user_remna_id сохраняются в базу одной пачкой после работы с панелью
+    changed_subscriptions: dict[int, SubscriptionDto] = {}
+
+    async def create(job: _PanelSyncJob) -> Optional[UserResponseDto]:
+        return await _call_with_retry(
+            lambda: remnawave_service.create_user(
+                user=job.user,
+                subscription=job.subscription,
+                force=True,
+            )
+        )
+
+    async def recreate(job: _PanelSyncJob) -> Optional[UserResponseDto]:
+        # API revoke не поддерживает установку custom short_uuid - он всегда генерирует новый,
+        # поэтому пользователь удаляется и создаётся заново с short_uuid из бэкапа
+        panel_user = cast(UserResponseDto, job.panel_user)
+        logger.info(
+            f"🔄 Recreating user {panel_user.uuid} to preserve short_uuid "
+            f"'{job.short_uuid}' (current in panel: '{panel_user.short_uuid}')"
+        )
+        active_squads = [squad.uuid for squad in (panel_user.active_internal_squads or [])]
+        create_body = CreateUserRequestDto(
+            username=str(job.user.telegram_id),
+            telegram_id=job.user.telegram_id,
+            expire_at=panel_user.expire_at,
+            status=panel_user.status,
+            traffic_limit_bytes=panel_user.traffic_limit_bytes,
+            traffic_limit_strategy=panel_user.traffic_limit_strategy,
+            description=panel_user.description,
+            tag=panel_user.tag,
+            hwid_device_limit=panel_user.hwid_device_limit,
+            active_internal_squads=active_squads or None,
+            short_uuid=job.short_uuid,
+        )
+
+        await _call_with_retry(lambda: _delete_panel_user(remnawave, panel_user.uuid))
+        created_user = await _create_panel_user(remnawave, create_body)
+
+        if created_user and created_user.short_uuid != job.short_uuid:
+            logger.error(
+                f"❌ CRITICAL: After create, short_uuid didn't match! "
+                f"Expected: '{job.short_uuid}', Got: '{created_user.short_uuid}'"
+            )
+        return created_user
+
+    async def process(job: _PanelSyncJob) -> None:
+        nonlocal created, updated, errors, processed
+        user = job.user
+        user_info = f"{user.name} ({user.telegram_id})"
+
         try:
-            # Получаем текущую подписку пользователя
-            subscription = await subscription_service.get_current(user.telegram_id)
-            
-            if not subscription:
-                logger.debug(
-                    f"⊘ User skipped (no subscription): {user.name} (telegram_id: {user.telegram_id})"
-                )
-                skipped_users.append(f"{user.name} ({user.telegram_id})")
-                skipped += 1
-                continue
-            
-            # Проверяем, есть ли пользователь в панели Remnawave
-            try:
-                panel_users = await remnawave.users.get_users_by_telegram_id(
-                    telegram_id=str(user.telegram_id)
+            if job.action == "update":
+                panel_user = cast(UserResponseDto, job.panel_user)
+                await _call_with_retry(
+                    lambda: remnawave_service.updated_user(
+                        user=user,
+                        uuid=panel_user.uuid,
+                        subscription=job.subscription,
+                    )
                 )
-            except Exception as e:
-                logger.warning(f"Error getting user from panel: {e}")
-                panel_users = []
-            
-            if panel_users:
-                # Пользователь есть в панели - проверяем short_uuid
-                panel_user = panel_users[0]
-                logger.info(f"User '{user.telegram_id}' found in panel, checking short_uuid...")
-                
-                # Проверяем, совпадает ли short_uuid
-                need_recreate = False
-                desired_short_uuid = None
-                
-                if subscription and subscription.url:
-                    try:
-                        desired_short_uuid = subscription.url.rstrip('/').split('/')[-1]
-                        panel_short_uuid = panel_user.short_uuid
-                        
-                        logger.info(
-                            f"DEBUG: Comparing short_uuid for user {user.telegram_id}: "
-                            f"panel='{panel_short_uuid}', backup='{desired_short_uuid}', "
-                            f"subscription.url='{subscription.url}'"
-                        )
-                        
-                        if panel_short_uuid != desired_short_uuid:
-                            logger.warning(
-                                f"⚠️ short_uuid MISMATCH for user {user.telegram_id}: "
-                                f"panel={panel_short_uuid}, backup={desired_short_uuid}. "
-                                f"Will use REVOKE to update short_uuid."
-                            )
-                            need_recreate = True
-                        else:
-                            logger.debug(f"✓ short_uuid matches: {desired_short_uuid}")
-                    except Exception as ex:
-                        logger.warning(f"Failed to extract short_uuid from URL '{subscription.url}': {ex}")
-                        traceback_str = traceback.format_exc()
-                        logger.warning(f"Traceback: {traceback_str}")
-                
-                if need_recreate and desired_short_uuid:
-                    # API revoke не поддерживает установку custom short_uuid - он всегда генерирует новый
-                    # Поэтому используем DELETE + CREATE с указанием short_uuid
-                    try:
-                        logger.info(
-                            f"🔄 Recreating user {panel_user.uuid} to preserve short_uuid "
-                            f"from backup: '{desired_short_uuid}' (current in panel: '{panel_user.short_uuid}')"
-                        )
-                        
-                        # Сохраняем данные пользователя перед удалением
-                        old_uuid = panel_user.uuid
-                        old_expire_at = panel_user.expire_at
-                        old_status = panel_user.status
-                        old_traffic_limit_bytes = panel_user.traffic_limit_bytes
-                        old_traffic_limit_strategy = panel_user.traffic_limit_strategy
-                        old_description = panel_user.description
-                        old_tag = panel_user.tag
-                        old_hwid_device_limit = panel_user.hwid_device_limit
-                        old_active_squads = [squad.uuid for squad in (panel_user.active_internal_squads or [])]
-                        
-                        # Удаляем пользователя
-                        logger.info(f"Deleting user {old_uuid} from panel...")
-                        await remnawave.users.delete_user(uuid=old_uuid)
-                        logger.info(f"✓ User {old_uuid} deleted successfully")
-                        
-                        # Создаем пользователя заново с тем же short_uuid из бэкапа
-                        create_body = CreateUserRequestDto(
-                            username=str(user.telegram_id),
-                            telegram_id=user.telegram_id,
-                            expire_at=old_expire_at,
-                            status=old_status,
-                            traffic_limit_bytes=old_traffic_limit_bytes,
-                            traffic_limit_strategy=old_traffic_limit_strategy,
-                            description=old_description,
-                            tag=old_tag,
-                            hwid_device_limit=old_hwid_device_limit,
-                            active_internal_squads=old_active_squads if old_active_squads else None,
-                            short_uuid=desired_short_uuid,  # КРИТИЧЕСКИ ВАЖНО: устанавливаем short_uuid из бэкапа
-                        )
-                        
-                        logger.info(f"Creating new user with short_uuid='{desired_short_uuid}'...")
-                        created_user = await remnawave.users.create_user(body=create_body)
-                        
-                        if created_user and created_user.uuid:
-                            # Проверяем, что short_uuid действительно установлен правильно
-                            if created_user.short_uuid != desired_short_uuid:
-                                logger.error(
-                                    f"❌ CRITICAL: After create, short_uuid didn't match! "
-                                    f"Expected: '{desired_short_uuid}', Got: '{created_user.short_uuid}'"
-                                )
-                            else:
-                                logger.info(f"✓ Verified: short_uuid correctly set to '{created_user.short_uuid}'")
-                            
-                            # Обновляем subscription с новыми данными из панели
-                            subscription.user_remna_id = created_user.uuid
-                            # URL остаётся прежним из бэкапа, так как short_uuid теперь совпадает
-                            await subscription_service.update(subscription)
-                            
-                            updated += 1
-                            logger.info(
-                                f"✓ User RECREATED with preserved short_uuid: {user.name} "
-                                f"(telegram_id: {user.telegram_id}, new_uuid: {created_user.uuid}, "
-                                f"short_uuid: {created_user.short_uuid})"
-                            )
-                        else:
-                            error_msg = "create_user returned None or empty response after delete"
-                            logger.error(
-                                f"✗ Failed to recreate user: {user.name} (telegram_id: {user.telegram_id}). "
-                                f"Error: {error_msg}"
-                            )
-                            error_users[f"{user.name} ({user.telegram_id})"] = error_msg
-                            errors += 1
-                    except Exception as e:
-                        error_msg = f"{type(e).__name__}: {str(e)}"
-                        traceback_str = traceback.format_exc()
-                        if "Validation failed" in str(e) or "validation" in str(e).lower():
-                            logger.debug(
-                                f"⊘ User skipped (validation error - likely inactive subscription): "
-                                f"{user.name} (telegram_id: {user.telegram_id})"
-                            )
-                        else:
-                            logger.error(
-                                f"✗ Failed to recreate user with short_uuid: {user.name} (telegram_id: {user.telegram_id}). "
-                                f"Error: {error_msg}\nTraceback:\n{traceback_str}"
-                            )
-                            error_users[f"{user.name} ({user.telegram_id})"] = error_msg
-                            errors += 1
-                            
-                            # Отправляем ошибку в файл через notification_service
-                            await notification_service.error_notify(
-                                error_id=user.telegram_id,
-                                traceback_str=traceback_str,
-                                payload=MessagePayload.not_deleted(
-                                    i18n_key="ntf-event-error",
-                                    i18n_kwargs={
-                                        "user": True,
-                                        "user_id": str(user.telegram_id),
-                                        "user_name": user.name,
-                                        "username": user.username or False,
-                                        "error": f"Sync revoke error: {error_msg}",
-                                    },
-                                    reply_markup=get_user_keyboard(user.telegram_id),
-                                ),
-                            )
-                else:
-                    # short_uuid совпадает или нет URL - просто обновляем
-                    try:
-                        await remnawave_service.updated_user(
-                            user=user,
-                            uuid=panel_user.uuid,
-                            subscription=subscription,
-                        )
-                        updated += 1
-                        logger.info(
-                            f"✓ User updated: {user.name} (telegram_id: {user.telegram_id}, "
-                            f"panel_uuid: {panel_user.uuid})"
-                        )
-                    except Exception as e:
-                        # Check if error is due to inactive subscription (Validation failed)
-                        error_msg = f"{type(e).__name__}: {str(e)}"
-                        traceback_str = traceback.format_exc()
-                        if "Validation failed" in str(e) or "validation" in str(e).lower():
-                            # This is likely an inactive subscription - skip silently without counting
-                            logger.debug(
-                                f"⊘ User skipped (validation error - likely inactive subscription): "
-                                f"{user.name} (telegram_id: {user.telegram_id})"
-                            )
-                        else:
-                            # Real error
-                            logger.error(
-                                f"✗ Failed to update user: {user.name} (telegram_id: {user.telegram_id}). "
-                                f"Error: {error_msg}\nTraceback:\n{traceback_str}"
-                            )
-                            error_users[f"{user.name} ({user.telegram_id})"] = error_msg
-                            errors += 1
-                            
-                            # Отправляем ошибку в файл через notification_service
-                            await notification_service.error_notify(
-                                error_id=user.telegram_id,
-                                traceback_str=traceback_str,
-                                payload=MessagePayload.not_deleted(
-                                    i18n_key="ntf-event-error",
-                                    i18n_kwargs={
-                                        "user": True,
-                                        "user_id": str(user.telegram_id),
-                                        "user_name": user.name,
-                                        "username": user.username or False,
-                                        "error": f"Sync update error: {error_msg}",
-                                    },
-                                    reply_markup=get_user_keyboard(user.telegram_id),
-                                ),
-                            )
+                updated += 1
+                logger.info(f"✓ User updated: {user_info}, panel_uuid: {panel_user.uuid}")
             else:
-                # Пользователя нет в панели - СОЗДАЁМ его с принудительной создачей подписки
+                remna_user = await (create(job) if job.action == "create" else recreate(job))
+                if not remna_user or not remna_user.uuid:
+                    logger.error(f"✗ Failed to {job.action} user {user_info}: empty response")
+                    error_users[user_info] = f"{job.action}_user returned None"
+                    errors += 1
+                    return
+
+                if job.subscription.user_remna_id != remna_user.uuid:
+                    job.subscription.user_remna_id = remna_user.uuid
+                    changed_subscriptions[user.telegram_id] = job.subscription
+
+                if job.action == "create":
+                    created += 1
+                else:
+                    updated += 1
                 logger.info(
-                    f"User '{user.name}' (telegram_id: {user.telegram_id}) not found in panel, "
-                    f"creating with short_uuid from URL..."
+                    f"✓ User {job.action}d: {user_info}, panel_uuid: {remna_user.uuid}, "
+                    f"short_uuid: {remna_user.short_uuid}"
                 )
-                try:
-                    new_user = await remnawave_service.create_user(
-                        user=user,
-                        subscription=subscription,
-                        force=True,
-                    )
-                    
-                    if new_user:
-                        # Обновляем remna_id в подписке если он не совпадает
-                        if subscription.user_remna_id != new_user.uuid:
-                            subscription.user_remna_id = new_user.uuid
-                            await subscription_service.update(subscription)
-                        
-                        created += 1
-                        logger.info(
-                            f"✓ User created: {user.name} (telegram_id: {user.telegram_id}, "
-                            f"panel_uuid: {new_user.uuid}, short_uuid: {new_user.short_uuid})"
-                        )
-                    else:
-                        logger.warning(
-                            f"✗ Failed to create user: {user.name} (telegram_id: {user.telegram_id}). "
-                            f"create_user returned None"
-                        )
-                        error_users[f"{user.name} ({user.telegram_id})"] = "create_user returned None"
-                        errors += 1
-                except Exception as e:
-                    # Check if error is due to inactive subscription (Validation failed)
-                    error_msg = f"{type(e).__name__}: {str(e)}"
-                    traceback_str = traceback.format_exc()
-                    if "Validation failed" in str(e) or "validation" in str(e).lower():
-                        # This is likely an inactive subscription - skip silently without counting
-                        logger.debug(
-                            f"⊘ User skipped (validation error - likely inactive subscription): "
-                            f"{user.name} (telegram_id: {user.telegram_id})"
-                        )
-                    else:
-                        # Real error
-                        logger.error(
-                            f"✗ Failed to create user: {user.name} (telegram_id: {user.telegram_id}). "
-                            f"Error: {error_msg}\nTraceback:\n{traceback_str}"
-                        )
-                        error_users[f"{user.name} ({user.telegram_id})"] = error_msg
-                        errors += 1
-                        
-                        # Отправляем ошибку в файл через notification_service
-                        await notification_service.error_notify(
-                            error_id=user.telegram_id,
-                            traceback_str=traceback_str,
-                            payload=MessagePayload.not_deleted(
-                                i18n_key="ntf-event-error",
-                                i18n_kwargs={
-                                    "user": True,
-                                    "user_id": str(user.telegram_id),
-                                    "user_name": user.name,
-                                    "username": user.username or False,
-                                    "error": f"Sync create error: {error_msg}",
-                                },
-                                reply_markup=get_user_keyboard(user.telegram_id),
-                            ),
-                        )
-            
-        except Exception as exception:
-            error_msg = f"{type(exception).__name__}: {str(exception)}"
+        except Exception as e:
+            error_msg = f"{type(e).__name__}: {str(e)}"
             traceback_str = traceback.format_exc()
-            user_name = user.name if hasattr(user, 'name') else 'Unknown'
-            user_telegram_id = user.telegram_id if hasattr(user, 'telegram_id') else 'Unknown'
-            logger.exception(
-                f"✗ Error syncing user: {user_name} "
-                f"(telegram_id: {user_telegram_id}). "
-                f"Exception: {error_msg}\nTraceback:\n{traceback_str}"
+            if "validation" in str(e).lower():
+                # Скорее всего неактивная подписка - пропускаем без учёта в ошибках
+                logger.debug(
+                    f"⊘ User skipped (validation error - likely inactive subscription): "
+                    f"{user_info}"
+                )
+                return
+
+            logger.error(
+                f"✗ Failed to {job.action} user: {user_info}. "
+                f"Error: {error_msg}\nTraceback:\n{traceback_str}"
             )
-            error_users[f"{user_name} ({user_telegram_id})"] = error_msg
+            error_users[user_info] = error_msg
             errors += 1
-            
+
             # Отправляем ошибку в файл через notification_service
-            if hasattr(user, 'telegram_id'):
-                await notification_service.error_notify(
-                    error_id=user.telegram_id,
-                    traceback_str=traceback_str,
-                    payload=MessagePayload.not_deleted(
-                        i18n_key="ntf-event-error",
-                        i18n_kwargs={
-                            "user": True,
-                            "user_id": str(user.telegram_id),
-                            "user_name": user_name,
-                            "username": getattr(user, 'username', None) or False,
-                            "error": f"Sync error: {error_msg}",
-                        },
-                        reply_markup=get_user_keyboard(user.telegram_id),
-                    ),
-                )
-    
+            await notification_service.error_notify(
+                error_id=user.telegram_id,
+                traceback_str=traceback_str,
+                payload=MessagePayload.not_deleted(
+                    i18n_key="ntf-event-error",
+                    i18n_kwargs={
+                        "user": True,
+                        "user_id": str(user.telegram_id),
+                        "user_name": user.name,
+                        "username": user.username or False,
+                        "error": f"Sync {job.action} error: {error_msg}",
+                    },
+                    reply_markup=get_user_keyboard(user.telegram_id),
+                ),
+            )
+        finally:
+            processed += 1
+            if processed % SYNC_PROGRESS_STEP == 0 or processed == len(jobs):
+                logger.info(f"Sync to panel progress: {processed}/{len(jobs)}")
+
+    # Общий итератор раздаёт задания воркерам, одновременно идёт не больше PANEL_CONCURRENCY
+    pending_jobs = iter(jobs)
+
+    async def worker() -> None:
+        for job in pending_jobs:
+            await process(job)
+
+    await asyncio.gather(*(worker() for _ in range(PANEL_CONCURRENCY)))
+
+    try:
+        await subscription_service.update_many(changed_subscriptions)
+    except Exception as e:
+        logger.exception(f"Failed to save panel uuids of synced users: {e}")
+
     result = {
         "total_bot_users": len(bot_users),
         "created": created,
         "updated": updated,
-        "skipped": skipped,
+        "skipped": len(skipped_users),
         "errors": errors,
         "error_users": error_users,
         "skipped_users": skipped_users,
     }
-    
+
     logger.info(f"Sync bot to panel completed: {result}")
     return result
 
+
+def _empty_bot_to_panel_result() -> dict[str, Any]:
+    return {
+        "total_bot_users": 0,
+        "created": 0,
+        "updated": 0,
+        "skipped": 0,
+        "errors": 0,
+        "error_users": {},
+        "skipped_users": [],
+    }
+
+
+def _get_short_uuid(url: Optional[str]) -> Optional[str]:
+    # URL формат: https://sub.domain.com/SHORT_UUID
+    if not url:
+        return None
+    return url.rstrip("/").split("/")[-1] or None
+
+
+async def _delete_panel_user(remnawave: RemnawaveSDK, uuid: UUID) -> None:
+    try:
+        await remnawave.users.delete_user(uuid=uuid)
+    except NotFoundError:
+        # Прошлая попытка могла удалить пользователя, но ответ не дошёл
+        logger.debug(f"User {uuid} already deleted from panel")
+
+
+async def _create_panel_user(
+    remnawave: RemnawaveSDK,
+    body: CreateUserRequestDto,
+) -> UserResponseDto:
+    """Создание с повтором: перед повтором и при конфликте ищется уже созданный пользователь."""
+    is_retry = False
+
+    async def create() -> UserResponseDto:
+        nonlocal is_retry
+        # Прошлая попытка могла создать пользователя, но ответ не дошёл
+        if is_retry and (existing := await _find_panel_user(remnawave, body.username)):
+            return existing
+        is_retry = True
+
+        try:
+            return await remnawave.users.create_user(body=body)
+        except ConflictError:
+            existing = await _find_panel_user(remnawave, body.username)
+            if not existing:
+                raise
+            return existing
+
+    return await _call_with_retry(create)
+
+
+async def _find_panel_user(
+    remnawave: RemnawaveSDK,
+    username: str,
+) -> Optional[UserResponseDto]:
+    try:
+        return await remnawave.users.get_user_by_username(username=username)
+    except NotFoundError:
+        return None
+
+
+async def _call_with_retry(call: Callable[[], Awaitable[T]]) -> T:
+    """Запрос к панели с повтором при временных ошибках (сеть, лимиты, 5xx)."""
+    for attempt in range(1, PANEL_RETRY_ATTEMPTS):
+        try:
+            return await call()
+        except PANEL_RETRY_ERRORS as exception:
+            delay = PANEL_RETRY_DELAY * 2 ** (attempt - 1)
+            logger.warning(f"Panel request failed ({exception}), retry {attempt} in {delay}s")
+            await asyncio.sleep(delay)
+    return await call()
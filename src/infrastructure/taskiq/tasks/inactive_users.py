@@ -49,14 +49,13 @@ async def check_inactive_users_task(
         )
         
         notified_count = 0
+        # Текущие подписки всех пользователей одним запросом на пачку
+        subscriptions = await subscription_service.get_current_many(u.telegram_id for u in users)
         
         for user in users:
             try:
-                # Проверяем, есть ли у пользователя подписка
-                subscription = await subscription_service.get_current(user)
-                
                 # Если нет подписки - пользователь не подключился
-                if not subscription:
+                if user.telegram_id not in subscriptions:
                     await notification_service.system_notify(
                         payload=MessagePayload.not_deleted(
                             i18n_key="ntf-event-user-not-connected",
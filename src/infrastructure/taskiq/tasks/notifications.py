@@ -1,24 +1,22 @@
-import asyncio
 import time
-from typing import Any, Union, cast
+from typing import Any, Optional, Union, cast
 
 from aiogram import Bot
 from aiogram.exceptions import TelegramRetryAfter
-from aiogram.types import BufferedInputFile
+from aiogram.types import BufferedInputFile, Message
 from dishka.integrations.taskiq import FromDishka, inject
 from loguru import logger
 
 from src.bot.keyboards import get_buy_keyboard, get_renew_keyboard
-from src.core.constants import BATCH_DELAY, BATCH_SIZE
 from src.core.enums import MediaType, UserNotificationType, SystemNotificationType
 from src.core.storage.keys import CloseableMessagesKey
-from src.core.utils.iterables import chunked
 from src.core.utils.message_payload import MessagePayload
 from src.core.utils.types import RemnaUserDto
 from src.infrastructure.redis.repository import RedisRepository
 from src.infrastructure.taskiq.broker import broker
+from src.infrastructure.taskiq.schedule_source import kiq_delayed
 from src.services.notification import NotificationService
-from src.services.user import UserService
+from src.services.subscription import SubscriptionService
 
 
 @broker.task
@@ -47,21 +45,16 @@ async def send_error_notification_task(
 @inject
 async def send_access_opened_notifications_task(
     waiting_user_ids: list[int],
-    user_service: FromDishka[UserService],
     notification_service: FromDishka[NotificationService],
 ) -> None:
-    for batch in chunked(waiting_user_ids, BATCH_SIZE):
-        for user_telegram_id in batch:
-            user = await user_service.get(user_telegram_id)
-            await notification_service.notify_user(
-                user=user,
-                payload=MessagePayload(
-                    i18n_key="ntf-access-allowed",
-                    auto_delete_after=None,
-                    add_close_button=True,
-                ),
-            )
-        await asyncio.sleep(BATCH_DELAY)
+    await notification_service.notify_users(
+        telegram_ids=waiting_user_ids,
+        payload=MessagePayload(
+            i18n_key="ntf-access-allowed",
+            auto_delete_after=None,
+            add_close_button=True,
+        ),
+    )
 
 
 @broker.task(retry_on_error=True)
@@ -70,7 +63,7 @@ async def send_subscription_expire_notification_task(
     remna_user: RemnaUserDto,
     ntf_type: UserNotificationType,
     i18n_kwargs: dict[str, Any],
-    user_service: FromDishka[UserService],
+    subscription_service: FromDishka[SubscriptionService],
     notification_service: FromDishka[NotificationService],
 ) -> None:
     telegram_id = cast(int, remna_user.telegram_id)
@@ -92,20 +85,17 @@ async def send_subscription_expire_notification_task(
         i18n_key = "ntf-event-user-expired-ago"
         i18n_kwargs_extra = {"value": 1}
 
-    user = await user_service.get(telegram_id)
+    subscription = await subscription_service.get_current(telegram_id)
 
-    if not user:
-        raise ValueError(f"User '{telegram_id}' not found")
-
-    if not user.current_subscription:
+    if not subscription:
         logger.warning(f"Current subscription for user '{telegram_id}' not found, skipping notification")
         return
 
-    i18n_kwargs_extra.update({"is_trial": user.current_subscription.is_trial})
-    keyboard = get_buy_keyboard() if user.current_subscription.is_trial else get_renew_keyboard()
+    i18n_kwargs_extra.update({"is_trial": subscription.is_trial})
+    keyboard = get_buy_keyboard() if subscription.is_trial else get_renew_keyboard()
 
-    await notification_service.notify_user(
-        user=user,
+    await notification_service.notify_users(
+        telegram_ids=[telegram_id],
         payload=MessagePayload(
             i18n_key=i18n_key,
             i18n_kwargs={**i18n_kwargs, **i18n_kwargs_extra},
@@ -122,29 +112,26 @@ async def send_subscription_expire_notification_task(
 async def send_subscription_limited_notification_task(
     remna_user: RemnaUserDto,
     i18n_kwargs: dict[str, Any],
-    user_service: FromDishka[UserService],
+    subscription_service: FromDishka[SubscriptionService],
     notification_service: FromDishka[NotificationService],
 ) -> None:
     telegram_id = cast(int, remna_user.telegram_id)
-    user = await user_service.get(telegram_id)
-
-    if not user:
-        raise ValueError(f"User '{telegram_id}' not found")
+    subscription = await subscription_service.get_current(telegram_id)
 
-    if not user.current_subscription:
+    if not subscription:
         logger.warning(f"Current subscription for user '{telegram_id}' not found, skipping notification")
         return
 
     i18n_kwargs_extra = {
-        "is_trial": user.current_subscription.is_trial,
-        "traffic_strategy": user.current_subscription.traffic_limit_strategy,
-        "reset_time": user.current_subscription.get_expire_time,
+        "is_trial": subscription.is_trial,
+        "traffic_strategy": subscription.traffic_limit_strategy,
+        "reset_time": subscription.get_expire_time,
     }
 
-    keyboard = get_buy_keyboard() if user.current_subscription.is_trial else get_renew_keyboard()
+    keyboard = get_buy_keyboard() if subscription.is_trial else get_renew_keyboard()
 
-    await notification_service.notify_user(
-        user=user,
+    await notification_service.notify_users(
+        telegram_ids=[telegram_id],
         payload=MessagePayload(
             i18n_key="ntf-event-user-limited",
             i18n_kwargs={**i18n_kwargs, **i18n_kwargs_extra},
@@ -170,25 +157,14 @@ async def send_system_notification_task(
 async def send_delayed_transfer_notification_task(
     recipient_telegram_id: int,
     notification_text: str,
-    delay_seconds: int,
-    user_service: FromDishka[UserService],
     notification_service: FromDishka[NotificationService],
 ) -> None:
     """
-    Отправляет уведомление о полученном переводе с задержкой.
-    Это гарантирует что меню получателя уже обновлено к моменту отправки уведомления.
+    Отправляет уведомление о полученном переводе.
+    Ставится через `kiq_delayed`, чтобы меню получателя успело обновиться к моменту отправки.
     """
-    # Ждём указанное количество секунд
-    await asyncio.sleep(delay_seconds)
-    
-    # Получаем актуальные данные пользователя
-    recipient = await user_service.get(recipient_telegram_id)
-    if not recipient:
-        return
-    
-    # Отправляем уведомление
-    await notification_service.notify_user(
-        user=recipient,
+    await notification_service.notify_users(
+        telegram_ids=[recipient_telegram_id],
         payload=MessagePayload(
             text=notification_text,
             add_close_button=True,
@@ -197,6 +173,31 @@ async def send_delayed_transfer_notification_task(
     )
 
 
+@broker.task
+@inject
+async def delete_message_task(
+    chat_id: int,
+    message_id: int,
+    bot_id: Optional[int],
+    notification_service: FromDishka[NotificationService],
+) -> None:
+    await notification_service.delete_message(chat_id, message_id, bot_id)
+
+
+async def delete_message_later(message: Message, delay: int) -> None:
+    """Удалить сообщение через delay секунд отложенной задачей, не задерживая хэндлер."""
+    try:
+        await kiq_delayed(
+            delete_message_task,
+            delay,
+            chat_id=message.chat.id,
+            message_id=message.message_id,
+            bot_id=message.bot.id if message.bot else None,
+        )
+    except Exception as exception:
+        logger.error(f"Failed to schedule deletion of message '{message.message_id}': {exception}")
+
+
 # Auto-delete closeable messages older than 45 hours (before 48h Telegram limit)
 _CLOSEABLE_MAX_AGE_SECONDS = 45 * 3600  # 45 hours
 
@@ -0,0 +1,113 @@
+import asyncio
+from typing import Final
+
+from aiogram import Bot
+from dishka.integrations.taskiq import FromDishka, inject
+from fluentogram import TranslatorHub
+from loguru import logger
+
+from src.core.config import AppConfig
+from src.core.enums import SubscriptionStatus
+from src.core.utils.message_payload import MessagePayload
+from src.infrastructure.database.models.dto import BaseUserDto, SubscriptionDto
+from src.infrastructure.taskiq.broker import broker
+from src.infrastructure.taskiq.progress import ProgressMessage
+from src.infrastructure.taskiq.tasks.redirects import redirect_to_main_menu_task
+from src.services.notification import NotificationService
+from src.services.plan import PlanService
+from src.services.remnawave import RemnawaveService
+from src.services.subscription import SubscriptionService
+
+# Одновременные запросы к панели при переносе плана
+PANEL_CONCURRENCY: Final[int] = 10
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def propagate_plan_task(
+    user: BaseUserDto,
+    plan_id: int,
+    bot: FromDishka[Bot],
+    config: FromDishka[AppConfig],
+    translator_hub: FromDishka[TranslatorHub],
+    plan_service: FromDishka[PlanService],
+    subscription_service: FromDishka[SubscriptionService],
+    remnawave_service: FromDishka[RemnawaveService],
+    notification_service: FromDishka[NotificationService],
+) -> None:
+    """Переносит изменения плана в подписки, панель Remnawave и интерфейс пользователей."""
+    plan = await plan_service.get(plan_id)
+    if not plan:
+        logger.warning(f"Plan '{plan_id}' not found, nothing to propagate")
+        return
+
+    await subscription_service.apply_plan(plan)
+    subscriptions = await subscription_service.get_all_by_plan(plan_id)
+    active_subscriptions = [s for s in subscriptions if s.status == SubscriptionStatus.ACTIVE]
+
+    i18n = translator_hub.get_translator_by_locale(locale=user.language)
+    message = await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload.not_deleted(
+            i18n_key="ntf-plan-sync-started",
+            i18n_kwargs={"total": len(active_subscriptions)},
+            add_close_button=False,
+        ),
+    )
+    progress = ProgressMessage(bot, i18n, message, "ntf-plan-sync-progress")
+
+    synced = 0
+    failed = 0
+    processed = 0
+
+    async def sync(subscription: SubscriptionDto) -> None:
+        nonlocal synced, failed, processed
+        try:
+            if not subscription.user:
+                logger.warning(f"User not found for subscription '{subscription.id}', skipping")
+                failed += 1
+            elif not subscription.user_remna_id:
+                logger.warning(f"Subscription '{subscription.id}' has no user_remna_id, skipping")
+                failed += 1
+            else:
+                await remnawave_service.updated_user(
+                    user=subscription.user,  # type: ignore[arg-type]
+                    uuid=subscription.user_remna_id,
+                    subscription=subscription,
+                    reset_traffic=False,
+                )
+                synced += 1
+        except Exception as exception:
+            failed += 1
+            logger.error(f"Failed to sync subscription '{subscription.id}': {exception}")
+        finally:
+            processed += 1
+            await progress.update(processed, len(active_subscriptions))
+
+    # Общий итератор раздаёт подписки воркерам, к панели идёт не больше PANEL_CONCURRENCY
+    pending = iter(active_subscriptions)
+
+    async def worker() -> None:
+        for subscription in pending:
+            await sync(subscription)
+
+    await asyncio.gather(*(worker() for _ in range(PANEL_CONCURRENCY)))
+    logger.info(f"Plan '{plan_id}' synced to Remnawave: {synced} synced, {failed} failed")
+
+    # Тестовый бот не получает автоматических обновлений интерфейса
+    users_to_notify = {
+        subscription.user.telegram_id
+        for subscription in subscriptions
+        if subscription.user and subscription.user.telegram_id != config.bot.dev_id
+    }
+    for telegram_id in users_to_notify:
+        await redirect_to_main_menu_task.kiq(telegram_id)
+
+    await progress.delete()
+    await notification_service.notify_user(
+        user=user,
+        payload=MessagePayload(
+            i18n_key="ntf-plan-sync-completed",
+            i18n_kwargs={"synced": synced, "failed": failed},
+        ),
+    )
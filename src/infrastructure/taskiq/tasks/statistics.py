@@ -0,0 +1,15 @@
+from dishka.integrations.taskiq import FromDishka, inject
+from loguru import logger
+
+from src.infrastructure.taskiq.broker import broker
+from src.services.statistics import StatisticsService
+
+
+@broker.task(schedule=[{"cron": "30 3 * * *"}])  # Каждый день в 03:30 UTC
+@inject
+async def reconcile_statistics_rollups_task(
+    statistics_service: FromDishka[StatisticsService],
+) -> None:
+    """Ночная сверка счётчиков статистики с БД."""
+    logger.info("[reconcile_statistics] Starting statistics rollups reconciliation")
+    await statistics_service.reconcile_rollups()
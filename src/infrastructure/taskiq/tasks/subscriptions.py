@@ -31,6 +31,7 @@ from src.infrastructure.database.models.dto import (
     UserDto,
 )
 from src.infrastructure.taskiq.broker import broker
+from src.services.balance import BalanceService
 from src.services.extra_device import ExtraDeviceService
 from src.services.notification import NotificationService
 from src.services.plan import PlanService
@@ -658,6 +659,7 @@ async def check_expired_extra_devices_task(
     remnawave_service: FromDishka[RemnawaveService],
     user_service: FromDishka[UserService],
     notification_service: FromDishka[NotificationService],
+    balance_service: FromDishka[BalanceService],
 ) -> None:
     """
     Проверяет истекшие дополнительные устройства и деактивирует их.
@@ -733,15 +735,8 @@ async def check_expired_extra_devices_task(
                     f"removed {device_count_to_remove} devices"
                 )
             else:
-                # Автопродление включено - проверяем баланс и продлеваем
-                if user.balance >= purchase.price:
-                    # Списываем с баланса и продлеваем
-                    await user_service.subtract_from_balance(user, purchase.price)
-                    await extra_device_service.renew_purchase(purchase.id, duration_days=30)
-                    
-                    # Очищаем кеш
-                    await user_service.clear_user_cache(user.telegram_id)
-                    
+                # Автопродление включено - списываем с баланса и продлеваем одной транзакцией
+                if await balance_service.renew_extra_devices(purchase, duration_days=30):
                     logger.info(
                         f"[check_expired_extra_devices] Auto-renewed purchase '{purchase.id}' for user '{user.telegram_id}', "
                         f"charged {purchase.price} ₽"
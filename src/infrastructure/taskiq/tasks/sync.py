@@ -134,3 +134,21 @@ async def sync_panel_to_bot_task(
     except Exception as e:
         logger.exception(f"Panel to bot sync failed: {e}")
         raise
+
+
+@broker.task(schedule=[{"cron": "*/5 * * * *"}])
+@inject
+async def refresh_squad_catalog_task(
+    remnawave_service: FromDishka[RemnawaveService],
+) -> None:
+    """Обновляет кэш каталога сквадов, чтобы создание пользователей не ходило в панель."""
+    try:
+        catalog = await remnawave_service.refresh_squad_catalog()
+    except Exception as exception:
+        logger.warning(f"Failed to refresh squad catalog: {exception}")
+        return
+
+    logger.debug(
+        f"Squad catalog refreshed: {len(catalog.internal_squads)} internal, "
+        f"{len(catalog.external_squads)} external"
+    )
@@ -1,9 +1,10 @@
 import asyncio
-from typing import Any
+from typing import Any, Optional
 
 from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from redis.asyncio import Redis
 from dishka.integrations.aiogram import setup_dishka as setup_aiogram_dishka
 from dishka.integrations.taskiq import setup_dishka as setup_taskiq_dishka
 from taskiq import TaskiqMiddleware
@@ -14,6 +15,7 @@ from src.bot.dispatcher import create_bg_manager_factory, create_dispatcher, set
 from src.core.config import AppConfig
 from src.core.logger import setup_logger
 from src.infrastructure.di import create_container
+from src.infrastructure.redis import listen_cache_invalidation
 from src.infrastructure.taskiq.init import init as init_consumer_group
 from src.services.mirror_bot import MirrorBotService
 from src.services.notification import NotificationService
@@ -100,6 +102,26 @@ class DishkaParamsFilterMiddleware(TaskiqMiddleware):
             logger.warning(f"Failed to initialize mirror bots: {e}")
 
 
+class CacheInvalidationMiddleware(TaskiqMiddleware):
+    """Подписывает процесс воркера на сброс in-process кэша (L1)."""
+
+    def __init__(self, container: Any) -> None:
+        self.container = container
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def startup(self) -> None:
+        redis_client: Redis = await self.container.get(Redis)
+        self._task = asyncio.create_task(listen_cache_invalidation(redis_client))
+
+    async def shutdown(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
 def worker() -> RedisStreamBroker:
     setup_logger(rotation=False)
 
@@ -124,5 +146,6 @@ def worker() -> RedisStreamBroker:
     
     # Добавляем middleware для фильтрации dishka параметров из task_hints и инициализации зеркальных ботов
     broker.add_middlewares(DishkaParamsFilterMiddleware(container=container))
+    broker.add_middlewares(CacheInvalidationMiddleware(container=container))
 
     return broker
@@ -1,6 +1,7 @@
 import asyncio
 import traceback
 from contextlib import asynccontextmanager
+from functools import partial
 from typing import Any, AsyncGenerator, Optional
 
 from aiogram import Bot, Dispatcher
@@ -15,11 +16,13 @@ from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async
 
 from src.__version__ import __version__
 from src.api.endpoints import TelegramWebhookEndpoint
+from src.api.endpoints.remnawave import process_remnawave_event
 from src.core.config.app import AppConfig
 from src.core.enums import SystemNotificationType, UserRole
 from src.core.storage.keys import ShutdownMessagesKey, UpdateInProgressKey, UpdateMessageKey
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database import UnitOfWork
+from src.infrastructure.redis import listen_cache_invalidation
 from src.infrastructure.redis.repository import RedisRepository
 from src.core.keepalive import keepalive_loop
 from src.services.command import CommandService
@@ -28,6 +31,7 @@ from src.services.mirror_bot_manager import MirrorBotManager
 from src.services.notification import NotificationService
 from src.services.payment_gateway import PaymentGatewayService
 from src.services.remnawave import RemnawaveService
+from src.services.remnawave_events import RemnawaveEventQueue
 from src.services.settings import SettingsService
 from src.services.user import UserService
 from src.services.webhook import WebhookService
@@ -642,16 +646,28 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning(f"Failed to start keepalive task: {e}")
 
+    # Сброс in-process кэша по сообщениям от воркеров и других процессов
+    app.state.cache_invalidation_task = asyncio.create_task(
+        listen_cache_invalidation(await container.get(Redis))
+    )
+
+    # Обработка вебхуков Remnawave, которые эндпоинт кладёт в очередь
+    event_queue: RemnawaveEventQueue = await container.get(RemnawaveEventQueue)
+    app.state.remnawave_events_task = asyncio.create_task(
+        event_queue.consume(partial(process_remnawave_event, container))
+    )
+
     yield
 
     # ── Cancel keepalive task ───────────────────────────────────────────
-    keepalive_task = getattr(app.state, "keepalive_task", None)
-    if keepalive_task and not keepalive_task.done():
-        keepalive_task.cancel()
-        try:
-            await keepalive_task
-        except asyncio.CancelledError:
-            pass
+    for task_name in ("keepalive_task", "cache_invalidation_task", "remnawave_events_task"):
+        background_task = getattr(app.state, task_name, None)
+        if background_task and not background_task.done():
+            background_task.cancel()
+            try:
+                await background_task
+            except asyncio.CancelledError:
+                pass
 
     # Send shutdown notifications
     logger.info("Lifespan shutdown: starting shutdown notifications")
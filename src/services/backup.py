@@ -0,0 +1,542 @@
+import asyncio
+import gzip
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Awaitable, Callable, Final, Optional
+
+import asyncpg
+from loguru import logger
+
+from src.core.utils.time import datetime_now
+from src.infrastructure.redis import delete_cache_keys
+
+from .base import BaseService
+from .plan import invalidate_plan_catalog
+
+APP_DIR: Final[Path] = Path("/opt/dfc-tg")
+LEGACY_BACKUP_DIR: Final[Path] = APP_DIR / "backups"
+BACKUP_DIR: Final[Path] = LEGACY_BACKUP_DIR / "db"
+BACKUP_SUFFIXES: Final[tuple[str, ...]] = (".sql", ".gz")
+BACKUP_CHUNK_SIZE: Final[int] = 1024 * 1024
+# Строки, которыми новые версии pg_dump защищают дамп от выполнения в psql
+RESTRICT_PREFIXES: Final[tuple[bytes, ...]] = (b"\\restrict", b"\\unrestrict")
+STDERR_TAIL_SIZE: Final[int] = 4096
+
+EXPORT_FORMAT_VERSION: Final[int] = 1
+EXPORT_MANIFEST: Final[str] = "manifest.json"
+EXPORT_EXCLUDED_TABLES: Final[frozenset[str]] = frozenset({"alembic_version"})
+# row_to_json экранирует управляющие символы, поэтому в CSV с такими разделителем
+# и кавычкой COPY отдаёт JSON строк как есть, без экранирования текстового формата
+JSON_COPY_OPTIONS: Final[dict[str, str]] = {"format": "csv", "delimiter": "\x02", "quote": "\x01"}
+IMPORT_STAGING_TABLE: Final[str] = "_import_rows"
+
+# (обработано байт, всего байт или None, если размер неизвестен)
+ProgressCallback = Callable[[int, Optional[int]], Awaitable[None]]
+
+
+class BackupError(Exception):
+    pass
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def open_dump(path: Path) -> IO[bytes]:
+    """Открывает дамп для чтения, сжатые `.gz` распаковываются на лету."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+class BackupService(BaseService):
+    """Бэкап и восстановление PostgreSQL через pg_dump/psql.
+
+    Процессы запускаются асинхронно, а данные идут через пайпы порциями по
+    `BACKUP_CHUNK_SIZE`, поэтому память не зависит от размера базы.
+
+    Выгрузка в архив (`export_archive`) и загрузка из него (`import_archive`)
+    идут через `COPY` по одному соединению asyncpg: каждая таблица пишется в
+    zip построчно как JSON (`<table>.jsonl`), описание таблиц лежит в манифесте.
+    """
+
+    def list_backups(self, limit: int = 10) -> list[Path]:
+        files = [
+            path
+            for directory in (BACKUP_DIR, LEGACY_BACKUP_DIR)
+            if directory.is_dir()
+            for path in directory.iterdir()
+            if path.is_file() and path.suffix in BACKUP_SUFFIXES
+        ]
+        files.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+        return files[:limit]
+
+    async def create_backup(self, on_progress: ProgressCallback) -> Path:
+        BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+        path = BACKUP_DIR / f"{datetime_now():%d-%m-%y_%H-%M}.sql.gz"
+        partial_path = path.with_name(f"{path.name}.part")
+
+        process = await asyncio.create_subprocess_exec(
+            "pg_dump",
+            *self._connection_args(),
+            "--clean",  # Добавляет DROP команды перед CREATE
+            "--if-exists",  # Использует IF EXISTS для DROP
+            "--no-owner",  # Не включает владельца объектов
+            "--no-acl",  # Не включает права доступа
+            self.config.database.name,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._env(),
+        )
+        assert process.stdout and process.stderr
+        stderr_task = asyncio.create_task(self._read_tail(process.stderr))
+        written = 0
+
+        try:
+            with gzip.open(partial_path, "wb", compresslevel=6) as output:
+                while chunk := await process.stdout.read(BACKUP_CHUNK_SIZE):
+                    output.write(chunk)
+                    written += len(chunk)
+                    await on_progress(written, None)
+
+            returncode = await process.wait()
+            stderr = await stderr_task
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            stderr_task.cancel()
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        if returncode != 0 or not written:
+            partial_path.unlink(missing_ok=True)
+            raise BackupError(f"pg_dump exited with code '{returncode}': {stderr}")
+
+        partial_path.rename(path)
+        logger.info(f"Database backup saved to '{path}' ({written} bytes uncompressed)")
+        return path
+
+    async def restore_backup(self, path: Path, on_progress: ProgressCallback) -> None:
+        saved_gateways = await self._get_gateways()
+
+        logger.info("Terminating active connections")
+        await self._psql(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            f"WHERE datname = '{self.config.database.name}' AND pid <> pg_backend_pid();",
+            database="postgres",
+        )
+
+        logger.info("Dropping and recreating schema")
+        returncode, _, stderr = await self._psql(
+            "DROP SCHEMA IF EXISTS public CASCADE; CREATE SCHEMA public; "
+            "GRANT ALL ON SCHEMA public TO public;"
+        )
+        if returncode != 0:
+            raise BackupError(f"Drop schema failed: {stderr}")
+
+        logger.info(f"Restoring database from backup '{path}'")
+        await self.load_dump(path, self.config.database.name, on_progress)
+
+        if saved_gateways:
+            await self._restore_missing_gateways(saved_gateways)
+
+        await self._apply_migrations()
+        await self._clear_cache()
+
+    async def load_dump(
+        self,
+        path: Path,
+        database: str,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        """Потоково выполняет SQL-дамп через stdin psql."""
+        total = path.stat().st_size
+        process = await asyncio.create_subprocess_exec(
+            "psql",
+            *self._connection_args(),
+            "-d",
+            database,
+            "-q",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._env(),
+        )
+        assert process.stdin and process.stderr
+        stderr_task = asyncio.create_task(self._read_tail(process.stderr))
+
+        try:
+            with open(path, "rb") as raw:
+                dump: IO[bytes] = gzip.GzipFile(fileobj=raw) if path.suffix == ".gz" else raw
+                buffer = bytearray()
+
+                for line in dump:
+                    if line.startswith(RESTRICT_PREFIXES):
+                        continue
+                    buffer += line
+                    if len(buffer) >= BACKUP_CHUNK_SIZE:
+                        process.stdin.write(bytes(buffer))
+                        buffer.clear()
+                        await process.stdin.drain()
+                        if on_progress:
+                            await on_progress(raw.tell(), total)
+
+                process.stdin.write(bytes(buffer))
+                await process.stdin.drain()
+
+            process.stdin.close()
+            await process.stdin.wait_closed()
+            returncode = await process.wait()
+            stderr = await stderr_task
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            stderr_task.cancel()
+            raise
+
+        if on_progress:
+            await on_progress(total, total)
+
+        if returncode != 0:
+            logger.warning(f"Restore completed with warnings: {stderr}")
+        logger.info("Database restored successfully")
+
+    async def export_archive(self, database: Optional[str] = None) -> Path:
+        BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+        name = database or self.config.database.name
+        path = BACKUP_DIR / f"{name}_{datetime_now():%d-%m-%y_%H-%M}.zip"
+        partial_path = path.with_name(f"{path.name}.part")
+        connection = await self._connect(database)
+
+        try:
+            with zipfile.ZipFile(
+                partial_path,
+                "w",
+                compression=zipfile.ZIP_DEFLATED,
+                compresslevel=6,
+            ) as archive:
+                # Один снимок данных на все таблицы
+                async with connection.transaction(isolation="repeatable_read", readonly=True):
+                    manifest = await self._export_tables(connection, archive)
+                archive.writestr(EXPORT_MANIFEST, json.dumps(manifest, ensure_ascii=False))
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        finally:
+            await connection.close()
+
+        partial_path.rename(path)
+        rows = sum(table["rows"] for table in manifest["tables"])
+        logger.info(f"Database exported to '{path}' ({rows} rows)")
+        return path
+
+    async def import_archive(self, path: Path) -> int:
+        """Заменяет данные всех таблиц данными из архива `export_archive`."""
+        connection = await self._connect()
+
+        try:
+            with zipfile.ZipFile(path) as archive:
+                manifest = json.loads(archive.read(EXPORT_MANIFEST))
+                if manifest.get("version") != EXPORT_FORMAT_VERSION:
+                    raise BackupError(f"Unsupported export version '{manifest.get('version')}'")
+
+                revision = await self._get_revision(connection)
+                if manifest.get("revision") != revision:
+                    logger.warning(
+                        f"Importing archive of revision '{manifest.get('revision')}' "
+                        f"into database of revision '{revision}', matching columns only"
+                    )
+
+                async with connection.transaction():
+                    rows = await self._import_tables(connection, archive, manifest["tables"])
+        finally:
+            await connection.close()
+
+        await self._clear_cache()
+        logger.info(f"Imported {rows} rows from archive '{path}'")
+        return rows
+
+    async def create_database(self, database: str) -> None:
+        connection = await self._connect("postgres")
+        try:
+            await connection.execute(f"DROP DATABASE IF EXISTS {quote_ident(database)}")
+            await connection.execute(f"CREATE DATABASE {quote_ident(database)}")
+        finally:
+            await connection.close()
+
+    async def drop_database(self, database: str) -> None:
+        connection = await self._connect("postgres")
+        try:
+            await connection.execute(f"DROP DATABASE IF EXISTS {quote_ident(database)}")
+        finally:
+            await connection.close()
+
+    #
+
+    async def _connect(self, database: Optional[str] = None) -> asyncpg.Connection:
+        config = self.config.database
+        return await asyncpg.connect(
+            host=config.host,
+            port=config.port,
+            user=config.user,
+            password=config.password.get_secret_value(),
+            database=database or config.name,
+        )
+
+    @staticmethod
+    async def _get_columns(connection: asyncpg.Connection) -> dict[str, list[str]]:
+        records = await connection.fetch(
+            """
+            SELECT c.relname AS table_name, a.attname AS column_name
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+              AND a.attnum > 0 AND NOT a.attisdropped AND a.attgenerated = ''
+            ORDER BY c.relname, a.attnum
+            """
+        )
+        columns: dict[str, list[str]] = {}
+        for record in records:
+            if record["table_name"] not in EXPORT_EXCLUDED_TABLES:
+                columns.setdefault(record["table_name"], []).append(record["column_name"])
+        return columns
+
+    @staticmethod
+    async def _get_revision(connection: asyncpg.Connection) -> Optional[str]:
+        # Проверка вместо перехвата ошибки, чтобы не прервать текущую транзакцию
+        if not await connection.fetchval("SELECT to_regclass('public.alembic_version')"):
+            return None
+        revision: Optional[str] = await connection.fetchval(
+            "SELECT version_num FROM alembic_version LIMIT 1"
+        )
+        return revision
+
+    async def _export_tables(
+        self,
+        connection: asyncpg.Connection,
+        archive: zipfile.ZipFile,
+    ) -> dict[str, Any]:
+        tables: list[dict[str, Any]] = []
+
+        for table, columns in (await self._get_columns(connection)).items():
+            rows = 0
+            with archive.open(f"{table}.jsonl", "w", force_zip64=True) as entry:
+
+                async def write(chunk: bytes) -> None:
+                    nonlocal rows
+                    rows += chunk.count(b"\n")
+                    entry.write(chunk)
+
+                await connection.copy_from_query(
+                    f"SELECT row_to_json(t) FROM public.{quote_ident(table)} t",
+                    output=write,
+                    **JSON_COPY_OPTIONS,
+                )
+
+            tables.append({"name": table, "columns": columns, "rows": rows})
+            logger.debug(f"Exported {rows} rows from table '{table}'")
+
+        return {
+            "version": EXPORT_FORMAT_VERSION,
+            "revision": await self._get_revision(connection),
+            "created_at": datetime_now().isoformat(),
+            "tables": tables,
+        }
+
+    async def _import_tables(
+        self,
+        connection: asyncpg.Connection,
+        archive: zipfile.ZipFile,
+        tables: list[dict[str, Any]],
+    ) -> int:
+        target_columns = await self._get_columns(connection)
+        if not target_columns:
+            raise BackupError("Database schema is empty, apply migrations before import")
+
+        # Порядок таблиц не важен: внешние ключи и триггеры отключены до конца транзакции
+        await connection.execute("SET LOCAL session_replication_role = replica")
+        await connection.execute(
+            "TRUNCATE " + ", ".join(f"public.{quote_ident(table)}" for table in target_columns)
+        )
+        await connection.execute(
+            f"CREATE TEMP TABLE {IMPORT_STAGING_TABLE} (data json) ON COMMIT DROP"
+        )
+
+        imported = 0
+        for table in tables:
+            name = table["name"]
+            if name not in target_columns:
+                logger.warning(f"Skipping table '{name}': not found in database")
+                continue
+
+            columns = [column for column in table["columns"] if column in target_columns[name]]
+            if not columns:
+                continue
+            insert_columns = ", ".join(quote_ident(column) for column in columns)
+            select_columns = ", ".join(f"r.{quote_ident(column)}" for column in columns)
+            await connection.copy_to_table(
+                IMPORT_STAGING_TABLE,
+                source=self._read_entry(archive, f"{name}.jsonl"),
+                **JSON_COPY_OPTIONS,
+            )
+            status = await connection.execute(
+                f"INSERT INTO public.{quote_ident(name)} ({insert_columns}) "
+                f"SELECT {select_columns} FROM {IMPORT_STAGING_TABLE} s, "
+                f"json_populate_record(NULL::public.{quote_ident(name)}, s.data) r"
+            )
+            await connection.execute(f"TRUNCATE {IMPORT_STAGING_TABLE}")
+
+            rows = int(status.rsplit(" ", 1)[-1])
+            imported += rows
+            logger.debug(f"Imported {rows} rows into table '{name}'")
+
+        await self._reset_sequences(connection)
+        return imported
+
+    @staticmethod
+    async def _read_entry(archive: zipfile.ZipFile, name: str) -> AsyncIterator[bytes]:
+        with archive.open(name) as entry:
+            while chunk := entry.read(BACKUP_CHUNK_SIZE):
+                yield chunk
+
+    @staticmethod
+    async def _reset_sequences(connection: asyncpg.Connection) -> None:
+        records = await connection.fetch(
+            """
+            SELECT s.oid::regclass::text AS sequence_name,
+                   t.relname AS table_name,
+                   a.attname AS column_name
+            FROM pg_depend d
+            JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+            JOIN pg_class t ON t.oid = d.refobjid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = d.refobjsubid
+            WHERE n.nspname = 'public' AND d.deptype IN ('a', 'i')
+            """
+        )
+        for record in records:
+            column = quote_ident(record["column_name"])
+            table = quote_ident(record["table_name"])
+            await connection.execute(
+                f"SELECT setval($1::regclass, "
+                f"COALESCE((SELECT MAX({column}) FROM public.{table}), 0) + 1, false)",
+                record["sequence_name"],
+            )
+
+    def _connection_args(self) -> list[str]:
+        database = self.config.database
+        return ["-h", database.host, "-p", str(database.port), "-U", database.user]
+
+    def _env(self) -> dict[str, str]:
+        env = os.environ.copy()
+        env["PGPASSWORD"] = self.config.database.password.get_secret_value()
+        return env
+
+    async def _psql(self, sql: str, database: Optional[str] = None) -> tuple[int, str, str]:
+        process = await asyncio.create_subprocess_exec(
+            "psql",
+            *self._connection_args(),
+            "-d",
+            database or self.config.database.name,
+            "-t",
+            "-A",
+            "-c",
+            sql,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._env(),
+        )
+        stdout, stderr = await process.communicate()
+        returncode = process.returncode if process.returncode is not None else -1
+        return returncode, stdout.decode().strip(), stderr.decode()
+
+    @staticmethod
+    async def _read_tail(stream: asyncio.StreamReader) -> str:
+        # Предупреждений psql может быть много, для лога достаточно последних
+        tail = b""
+        while chunk := await stream.read(BACKUP_CHUNK_SIZE):
+            tail = (tail + chunk)[-STDERR_TAIL_SIZE:]
+        return tail.decode(errors="replace")
+
+    async def _get_gateways(self) -> list[dict[str, Any]]:
+        """Текущие платёжные шлюзы, чтобы вернуть отсутствующие в бэкапе."""
+        try:
+            returncode, stdout, _ = await self._psql(
+                "SELECT json_agg(row_to_json(pg)) FROM payment_gateways pg"
+            )
+            if returncode == 0 and stdout:
+                gateways: list[dict[str, Any]] = json.loads(stdout) or []
+                logger.info(f"Saved {len(gateways)} payment gateways before restore")
+                return gateways
+        except Exception as exception:
+            logger.warning(f"Failed to save payment gateways before restore: {exception}")
+        return []
+
+    async def _restore_missing_gateways(self, saved_gateways: list[dict[str, Any]]) -> None:
+        try:
+            returncode, stdout, _ = await self._psql("SELECT type FROM payment_gateways")
+            restored_types = set(stdout.split("\n")) if returncode == 0 and stdout else set()
+
+            returncode, stdout, _ = await self._psql(
+                "SELECT COALESCE(MAX(order_index), 0) FROM payment_gateways"
+            )
+            next_order = int(stdout) + 1 if returncode == 0 else 1
+
+            restored_count = 0
+            for gateway in saved_gateways:
+                gateway_type = gateway.get("type")
+                if not gateway_type or gateway_type in restored_types:
+                    continue
+
+                # Этого шлюза нет в бэкапе — возвращаем его из сохранённых данных (неактивным)
+                settings = gateway.get("settings")
+                settings_json = json.dumps(settings) if settings else "null"
+                currency = gateway.get("currency", "USD")
+                returncode, _, stderr = await self._psql(
+                    "INSERT INTO payment_gateways "
+                    "(order_index, type, currency, is_active, settings) "
+                    f"VALUES ({next_order}, '{gateway_type}', '{currency}', false, "
+                    f"'{settings_json}'::jsonb)"
+                )
+                if returncode == 0:
+                    logger.info(f"Restored missing payment gateway '{gateway_type}' (inactive)")
+                    restored_count += 1
+                    next_order += 1
+                else:
+                    logger.warning(f"Failed to restore gateway '{gateway_type}': {stderr}")
+
+            if restored_count:
+                await self._psql(
+                    "SELECT setval('payment_gateways_id_seq', "
+                    "(SELECT COALESCE(MAX(id), 1) FROM payment_gateways))"
+                )
+                logger.info(f"Restored {restored_count} missing payment gateway(s) after backup")
+        except Exception as exception:
+            logger.warning(f"Failed to restore missing payment gateways: {exception}")
+
+    async def _apply_migrations(self) -> None:
+        logger.info("Applying database migrations after restore")
+        process = await asyncio.create_subprocess_exec(
+            "alembic",
+            "-c",
+            "src/infrastructure/database/alembic.ini",
+            "upgrade",
+            "head",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=APP_DIR,
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise BackupError(f"Migration failed: {stderr.decode()}")
+        logger.info("Migrations applied successfully")
+
+    async def _clear_cache(self) -> None:
+        keys = [key.decode() async for key in self.redis_client.scan_iter("cache:*")]
+        await delete_cache_keys(self.redis_client, *keys)
+        # Планы заменены вместе с базой, каталог в памяти процессов устарел
+        await invalidate_plan_catalog(self.redis_client)
+        logger.info(f"Cleared {len(keys)} cache keys")
@@ -0,0 +1,288 @@
+from typing import Optional
+
+from aiogram import Bot
+from fluentogram import TranslatorHub
+from loguru import logger
+from redis.asyncio import Redis
+from sqlalchemy.exc import IntegrityError
+
+from src.core.config import AppConfig
+from src.core.enums import BalanceEntryReason, ReferralRewardType
+from src.infrastructure.database import UnitOfWork
+from src.infrastructure.database.models.dto import ExtraDevicePurchaseDto
+from src.infrastructure.database.models.sql import BalanceTransfer
+from src.infrastructure.redis import RedisRepository
+
+from .base import BaseService
+from .extra_device import ExtraDeviceService
+from .referral import ReferralService
+from .user import UserService
+
+
+class InsufficientBalanceError(ValueError):
+    pass
+
+
+class DuplicateBalanceOperationError(Exception):
+    pass
+
+
+class BalanceService(BaseService):
+    """Операции с балансом из нескольких шагов.
+
+    Все шаги операции (списание с основного и бонусного баланса, зачисление,
+    сопутствующие записи) выполняются в одной транзакции: при любой ошибке
+    откатываются все сразу. Основной баланс меняется запросами журнала
+    `balance_entries` без отдельной блокировки строки, ключ идемпотентности
+    не даёт провести повтор той же операции.
+    """
+
+    uow: UnitOfWork
+    user_service: UserService
+    referral_service: ReferralService
+    extra_device_service: ExtraDeviceService
+
+    def __init__(
+        self,
+        config: AppConfig,
+        bot: Bot,
+        redis_client: Redis,
+        redis_repository: RedisRepository,
+        translator_hub: TranslatorHub,
+        #
+        uow: UnitOfWork,
+        user_service: UserService,
+        referral_service: ReferralService,
+        extra_device_service: ExtraDeviceService,
+    ) -> None:
+        super().__init__(config, bot, redis_client, redis_repository, translator_hub)
+        self.uow = uow
+        self.user_service = user_service
+        self.referral_service = referral_service
+        self.extra_device_service = extra_device_service
+
+    async def debit(
+        self,
+        telegram_id: int,
+        amount: int,
+        is_combined: bool,
+        reason: BalanceEntryReason,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[int, int]:
+        """Списать сумму: в режиме COMBINED сначала с основного баланса, затем с бонусного.
+
+        Returns:
+            tuple[int, int]: (списано_с_основного, списано_с_бонусного)
+
+        Raises:
+            InsufficientBalanceError: Если недостаточно средств
+        """
+        try:
+            result = await self._debit(telegram_id, amount, is_combined, reason, idempotency_key)
+            await self.uow.commit()
+        except Exception:
+            await self.uow.rollback()
+            raise
+
+        await self.user_service.clear_user_cache(telegram_id)
+        logger.info(
+            f"Subtracted '{amount}' ({reason}) from user '{telegram_id}': "
+            f"{result[0]} from main, {result[1]} from bonus (combined={is_combined})"
+        )
+        return result
+
+    async def refund(
+        self,
+        telegram_id: int,
+        from_main: int,
+        from_bonus: int,
+        idempotency_key: Optional[str] = None,
+    ) -> None:
+        """Вернуть списанное через `debit`: на основной баланс и в бонусные награды."""
+        try:
+            if from_main > 0:
+                await self._apply(
+                    telegram_id, from_main, BalanceEntryReason.REFUND, idempotency_key
+                )
+            if from_bonus > 0:
+                await self.referral_service.restore_pending_rewards(
+                    telegram_id=telegram_id,
+                    reward_type=ReferralRewardType.MONEY,
+                    amount=from_bonus,
+                )
+            await self.uow.commit()
+        except Exception:
+            await self.uow.rollback()
+            raise
+
+        await self.user_service.clear_user_cache(telegram_id)
+        logger.info(f"Refunded '{from_main}' main and '{from_bonus}' bonus to user '{telegram_id}'")
+
+    async def withdraw_bonus(self, telegram_id: int, amount: Optional[int] = None) -> int:
+        """Перевести бонусные награды на основной баланс (все или не больше amount)."""
+        try:
+            withdrawn = await self.referral_service.withdraw_pending_rewards(
+                telegram_id=telegram_id,
+                reward_type=ReferralRewardType.MONEY,
+                amount=amount,
+            )
+            if withdrawn > 0:
+                await self._apply(telegram_id, withdrawn, BalanceEntryReason.BONUS_WITHDRAWAL)
+            await self.uow.commit()
+        except Exception:
+            await self.uow.rollback()
+            raise
+
+        await self.user_service.clear_user_cache(telegram_id)
+        logger.info(f"Withdrew '{withdrawn}' bonus to main balance for user '{telegram_id}'")
+        return withdrawn
+
+    async def transfer(
+        self,
+        sender_telegram_id: int,
+        recipient_telegram_id: int,
+        amount: int,
+        commission: int,
+        is_combined: bool,
+        message: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[int, int]:
+        """Перевести amount другому пользователю, комиссия списывается у отправителя.
+
+        Списание, зачисление и запись в историю переводов проходят вместе или
+        не проходят вовсе. Возвращает разбивку списания как `debit`.
+        """
+        out_key = f"{idempotency_key}:out" if idempotency_key else None
+        in_key = f"{idempotency_key}:in" if idempotency_key else None
+
+        try:
+            result = await self._debit(
+                sender_telegram_id,
+                amount + commission,
+                is_combined,
+                BalanceEntryReason.TRANSFER,
+                out_key,
+            )
+            await self._apply(recipient_telegram_id, amount, BalanceEntryReason.TRANSFER, in_key)
+            await self.uow.repository.balance_transfers.create(
+                BalanceTransfer(
+                    sender_telegram_id=sender_telegram_id,
+                    recipient_telegram_id=recipient_telegram_id,
+                    amount=amount,
+                    commission=commission,
+                    message=message,
+                )
+            )
+            await self.uow.commit()
+        except Exception:
+            await self.uow.rollback()
+            raise
+
+        await self.user_service.clear_user_cache(sender_telegram_id)
+        await self.user_service.clear_user_cache(recipient_telegram_id)
+        logger.info(
+            f"Balance transfer: {sender_telegram_id} -> {recipient_telegram_id}, "
+            f"amount={amount}, commission={commission}, from_main={result[0]}, "
+            f"from_bonus={result[1]}"
+        )
+        return result
+
+    async def renew_extra_devices(
+        self,
+        purchase: ExtraDevicePurchaseDto,
+        duration_days: int = 30,
+    ) -> bool:
+        """Автопродление доп. устройств: списание и продление одной транзакцией.
+
+        Ключ включает текущий срок покупки, поэтому один период не оплачивается дважды.
+        Возвращает False, если на основном балансе недостаточно средств.
+        """
+        idempotency_key = f"extra_devices:{purchase.id}:{purchase.expires_at.isoformat()}"
+
+        try:
+            await self._apply(
+                purchase.user_telegram_id,
+                -purchase.price,
+                BalanceEntryReason.EXTRA_DEVICES,
+                idempotency_key,
+            )
+            renewed = await self.extra_device_service.renew_purchase(
+                purchase.id,  # type: ignore[arg-type]
+                duration_days,
+            )
+            if not renewed:
+                raise ValueError(f"Extra device purchase '{purchase.id}' not found")
+            await self.uow.commit()
+        except InsufficientBalanceError:
+            await self.uow.rollback()
+            return False
+        except Exception:
+            await self.uow.rollback()
+            raise
+
+        await self.user_service.clear_user_cache(purchase.user_telegram_id)
+        return True
+
+    #
+
+    async def _debit(
+        self,
+        telegram_id: int,
+        amount: int,
+        is_combined: bool,
+        reason: BalanceEntryReason,
+        idempotency_key: Optional[str],
+    ) -> tuple[int, int]:
+        if not is_combined:
+            await self._apply(telegram_id, -amount, reason, idempotency_key)
+            return amount, 0
+
+        from_main = -await self._apply(telegram_id, -amount, reason, idempotency_key, up_to=True)
+        from_bonus = amount - from_main
+
+        if from_bonus > 0:
+            withdrawn = await self.referral_service.withdraw_pending_rewards(
+                telegram_id=telegram_id,
+                reward_type=ReferralRewardType.MONEY,
+                amount=from_bonus,
+            )
+            if withdrawn < from_bonus:
+                raise InsufficientBalanceError(
+                    f"Insufficient balance for user '{telegram_id}': "
+                    f"available={from_main + withdrawn}, required={amount}"
+                )
+
+        return from_main, from_bonus
+
+    async def _apply(
+        self,
+        telegram_id: int,
+        amount: int,
+        reason: BalanceEntryReason,
+        idempotency_key: Optional[str] = None,
+        up_to: bool = False,
+    ) -> int:
+        """Один шаг операции без фиксации транзакции, возвращает фактическое изменение."""
+        try:
+            entry = await self.uow.repository.balance_entries.apply(
+                telegram_id=telegram_id,
+                amount=amount,
+                reason=reason,
+                idempotency_key=idempotency_key,
+                up_to=up_to,
+            )
+        except IntegrityError as exception:
+            raise DuplicateBalanceOperationError(idempotency_key) from exception
+
+        if entry is not None:
+            return entry.amount
+
+        if idempotency_key and await self.uow.repository.balance_entries.get_by_idempotency_key(
+            idempotency_key
+        ):
+            raise DuplicateBalanceOperationError(idempotency_key)
+
+        raise InsufficientBalanceError(
+            f"Balance change '{amount}' not applied for user '{telegram_id}': "
+            f"insufficient balance or user not found"
+        )
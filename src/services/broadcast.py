@@ -1,27 +1,43 @@
-from typing import Optional
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Final, Optional
 from uuid import UUID
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
 from loguru import logger
 from redis.asyncio import Redis
-from sqlalchemy import and_
+from sqlalchemy import ColumnElement, and_, exists
 
 from src.core.config import AppConfig
+from src.core.constants import TIME_1D, TIME_1M
 from src.core.enums import (
     BroadcastAudience,
+    BroadcastMessageStatus,
     BroadcastStatus,
     PlanAvailability,
     SubscriptionStatus,
 )
+from src.core.storage.keys import BroadcastCheckpointKey, BroadcastClaimsKey, BroadcastLockKey
 from src.infrastructure.database import UnitOfWork
-from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto, UserDto
+from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto
+from src.infrastructure.database.models.dto.user import BaseUserDto
 from src.infrastructure.database.models.sql import Broadcast, BroadcastMessage, Subscription, User
 from src.infrastructure.database.models.sql.plan import Plan
 from src.infrastructure.redis import RedisRepository
 
 from .base import BaseService
 
+AUDIENCE_CHUNK_SIZE: Final[int] = 500
+BROADCAST_LOCK_TTL: Final[int] = TIME_1M
+BROADCAST_STATE_TTL: Final[int] = TIME_1D * 7
+
+
+@dataclass
+class BroadcastCheckpoint:
+    plan_id: Optional[int] = None
+    # Все получатели с Telegram ID не больше курсора уже обработаны
+    cursor: Optional[int] = None
+
 
 class BroadcastService(BaseService):
     uow: UnitOfWork
@@ -46,21 +62,27 @@ class BroadcastService(BaseService):
         logger.info(f"Created broadcast '{broadcast.task_id}'")
         return BroadcastDto.from_model(db_created_broadcast)  # type: ignore[return-value]
 
-    async def create_messages(
+    async def add_messages(
         self,
         broadcast_id: int,
         messages: list[BroadcastMessageDto],
-    ) -> list[BroadcastMessageDto]:
-        db_messages = [
-            BroadcastMessage(
-                broadcast_id=broadcast_id,
-                user_id=m.user_id,
-                status=m.status,
-            )
-            for m in messages
-        ]
-        db_created_messages = await self.uow.repository.broadcasts.create_messages(db_messages)
-        return BroadcastMessageDto.from_model_list(db_created_messages)
+    ) -> None:
+        await self.uow.repository.broadcasts.insert_messages(
+            data=[
+                {
+                    "broadcast_id": broadcast_id,
+                    "user_id": m.user_id,
+                    "message_id": m.message_id,
+                    "status": m.status,
+                }
+                for m in messages
+            ],
+        )
+        # Фиксируем сразу: записанные получатели пропускаются при возобновлении
+        await self.uow.commit()
+
+    async def count_messages(self, broadcast_id: int) -> dict[BroadcastMessageStatus, int]:
+        return await self.uow.repository.broadcasts.count_messages(broadcast_id)
 
     async def get(self, task_id: UUID) -> Optional[BroadcastDto]:
         db_broadcast = await self.uow.repository.broadcasts.get(task_id)
@@ -72,6 +94,14 @@ class BroadcastService(BaseService):
 
         return BroadcastDto.from_model(db_broadcast)
 
+    async def get_by_id(self, broadcast_id: int) -> Optional[BroadcastDto]:
+        db_broadcast = await self.uow.repository.broadcasts.get_by_id(broadcast_id)
+        return BroadcastDto.from_model(db_broadcast)
+
+    async def get_processing(self) -> list[tuple[int, BroadcastAudience]]:
+        rows = await self.uow.repository.broadcasts.get_processing()
+        return [(row.id, row.audience) for row in rows]
+
     async def get_all(self) -> list[BroadcastDto]:
         db_broadcasts = await self.uow.repository.broadcasts.get_all()
         return BroadcastDto.from_model_list(list(reversed(db_broadcasts)))
@@ -108,8 +138,54 @@ class BroadcastService(BaseService):
         await self.uow.repository.broadcasts._delete(Broadcast, Broadcast.id == broadcast_id)
 
     async def get_status(self, task_id: UUID) -> Optional[BroadcastStatus]:
-        db_broadcast = await self.uow.repository.broadcasts.get(task_id)
-        return db_broadcast.status if db_broadcast else None
+        return await self.uow.repository.broadcasts.get_status(task_id)
+
+    #
+
+    async def acquire_lock(self, broadcast_id: int) -> bool:
+        key = BroadcastLockKey(broadcast_id=broadcast_id).pack()
+        return bool(await self.redis_client.set(key, 1, nx=True, ex=BROADCAST_LOCK_TTL))
+
+    async def refresh_lock(self, broadcast_id: int) -> None:
+        key = BroadcastLockKey(broadcast_id=broadcast_id).pack()
+        await self.redis_client.expire(key, BROADCAST_LOCK_TTL)
+
+    async def release_lock(self, broadcast_id: int) -> None:
+        await self.redis_client.delete(BroadcastLockKey(broadcast_id=broadcast_id).pack())
+
+    async def is_locked(self, broadcast_id: int) -> bool:
+        key = BroadcastLockKey(broadcast_id=broadcast_id).pack()
+        return bool(await self.redis_client.exists(key))
+
+    async def save_checkpoint(self, broadcast_id: int, checkpoint: BroadcastCheckpoint) -> None:
+        key = BroadcastCheckpointKey(broadcast_id=broadcast_id).pack()
+        mapping = {k: "" if v is None else v for k, v in asdict(checkpoint).items()}
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, BROADCAST_STATE_TTL)
+            await pipe.execute()
+
+    async def get_checkpoint(self, broadcast_id: int) -> Optional[BroadcastCheckpoint]:
+        key = BroadcastCheckpointKey(broadcast_id=broadcast_id).pack()
+        raw: dict[bytes, bytes] = await self.redis_client.hgetall(key)  # type: ignore[misc]
+        if not raw:
+            return None
+        return BroadcastCheckpoint(**{k.decode(): int(v) if v else None for k, v in raw.items()})
+
+    async def claim_recipient(self, broadcast_id: int, lane: str, telegram_id: int) -> bool:
+        """Отмечает получателя перед отправкой, чтобы повтор задачи не отправил ему снова."""
+        key = BroadcastClaimsKey(broadcast_id=broadcast_id).pack()
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.sadd(key, f"{lane}:{telegram_id}")
+            pipe.expire(key, BROADCAST_STATE_TTL)
+            added, _ = await pipe.execute()
+        return bool(added)
+
+    async def clear_state(self, broadcast_id: int) -> None:
+        await self.redis_client.delete(
+            BroadcastCheckpointKey(broadcast_id=broadcast_id).pack(),
+            BroadcastClaimsKey(broadcast_id=broadcast_id).pack(),
+        )
 
     #
 
@@ -120,23 +196,7 @@ class BroadcastService(BaseService):
     ) -> int:
         logger.debug(f"Counting audience '{audience}' for plan '{plan_id}'")
 
-        is_not_block = and_(
-            User.is_blocked.is_(False),
-            User.is_bot_blocked.is_(False),
-        )
-
-        if audience == BroadcastAudience.PLAN:
-            if plan_id:
-                db_subs = await self.uow.repository.subscriptions.filter_by_plan_id(plan_id)
-                active_subs = [
-                    s
-                    for s in db_subs
-                    if s.status == SubscriptionStatus.ACTIVE
-                    and not s.user.is_blocked
-                    and not s.user.is_bot_blocked
-                ]
-                return len(active_subs)
-
+        if audience == BroadcastAudience.PLAN and not plan_id:
             count = await self.uow.repository.plans._count(
                 Plan,
                 Plan.availability != PlanAvailability.TRIAL,
@@ -144,102 +204,94 @@ class BroadcastService(BaseService):
             logger.debug(f"Audience count for '{audience}' (plan={plan_id}) is '{count}'")
             return count
 
-        if audience == BroadcastAudience.ALL:
-            # Для рассылки "Всем" включаем всех пользователей кроме заблокированных администратором.
-            # is_bot_blocked не фильтруем — сообщение попытаемся доставить, провал обработается как FAILED.
-            return await self.uow.repository.users._count(User, User.is_blocked.is_(False))
-
-        if audience == BroadcastAudience.SUBSCRIBED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.ACTIVE),
-            )
-            return await self.uow.repository.users._count(User, conditions)
+        conditions = self._get_audience_conditions(audience, plan_id)
+        return await self.uow.repository.users._count(User, *conditions)
 
-        if audience == BroadcastAudience.UNSUBSCRIBED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription_id.is_(None),
+    async def iter_audience(
+        self,
+        audience: BroadcastAudience,
+        plan_id: Optional[int] = None,
+        chunk_size: int = AUDIENCE_CHUNK_SIZE,
+        after_telegram_id: Optional[int] = None,
+        skip_broadcast_id: Optional[int] = None,
+    ) -> AsyncIterator[list[BaseUserDto]]:
+        """Получатели рассылки порциями по Telegram ID, без загрузки связей.
+
+        `skip_broadcast_id` исключает получателей, уже записанных в рассылке.
+        """
+        logger.debug(f"Streaming users for audience '{audience}', plan_id: {plan_id}")
+        conditions = self._get_audience_conditions(audience, plan_id)
+        if skip_broadcast_id is not None:
+            conditions.append(
+                ~exists().where(
+                    BroadcastMessage.broadcast_id == skip_broadcast_id,
+                    BroadcastMessage.user_id == User.telegram_id,
+                )
             )
-            return await self.uow.repository.users._count(User, conditions)
 
-        if audience == BroadcastAudience.EXPIRED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.EXPIRED),
+        while True:
+            rows = await self.uow.repository.users.get_recipients(
+                *conditions,
+                limit=chunk_size,
+                after_telegram_id=after_telegram_id,
             )
-            return await self.uow.repository.users._count(User, conditions)
+            if not rows:
+                return
 
-        if audience == BroadcastAudience.TRIAL:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.is_trial.is_(True)),
-            )
-            return await self.uow.repository.users._count(User, conditions)
+            yield [
+                BaseUserDto(telegram_id=row.telegram_id, name=row.name, language=row.language)
+                for row in rows
+            ]
 
-        raise Exception(f"Unknown broadcast audience: {audience}")
+            if len(rows) < chunk_size:
+                return
+            after_telegram_id = rows[-1].telegram_id
 
-    async def get_audience_users(
+    def _get_audience_conditions(
         self,
         audience: BroadcastAudience,
         plan_id: Optional[int] = None,
-    ) -> list[UserDto]:
-        logger.debug(f"Retrieving users for audience '{audience}', plan_id: {plan_id}")
-
-        is_not_block = and_(
+    ) -> list[ColumnElement[bool]]:
+        is_not_block = [
             User.is_blocked.is_(False),
             User.is_bot_blocked.is_(False),
-        )
+        ]
 
         if audience == BroadcastAudience.PLAN and plan_id:
-            db_subscriptions = await self.uow.repository.subscriptions.filter_by_plan_id(plan_id)
-            active_subs = [
-                s
-                for s in db_subscriptions
-                if s.status == SubscriptionStatus.ACTIVE
-                and not s.user.is_blocked
-                and not s.user.is_bot_blocked
+            return [
+                *is_not_block,
+                User.subscriptions.any(
+                    and_(
+                        Subscription.plan["id"].as_integer() == plan_id,
+                        Subscription.status == SubscriptionStatus.ACTIVE,
+                    )
+                ),
             ]
-            user_ids = [sub.user_telegram_id for sub in active_subs]
-            db_users = await self.uow.repository.users.get_by_ids(telegram_ids=user_ids)
-            logger.debug(
-                f"Retrieved '{len(db_users)}' users for audience '{audience}' (plan={plan_id})"
-            )
-            return UserDto.from_model_list(db_users)
 
         if audience == BroadcastAudience.ALL:
             # Для рассылки "Всем" включаем всех пользователей кроме заблокированных администратором.
             # is_bot_blocked не фильтруем — сообщение попытаемся доставить, провал обработается как FAILED.
-            db_users = await self.uow.repository.users._get_many(User, User.is_blocked.is_(False))
-            return UserDto.from_model_list(db_users)
+            return [User.is_blocked.is_(False)]
 
         if audience == BroadcastAudience.SUBSCRIBED:
-            conditions = and_(
-                is_not_block,
+            return [
+                *is_not_block,
                 User.current_subscription.has(Subscription.status == SubscriptionStatus.ACTIVE),
-            )
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
+            ]
 
         if audience == BroadcastAudience.UNSUBSCRIBED:
-            conditions = and_(is_not_block, User.current_subscription_id.is_(None))
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
+            return [*is_not_block, User.current_subscription_id.is_(None)]
 
         if audience == BroadcastAudience.EXPIRED:
-            conditions = and_(
-                is_not_block,
+            return [
+                *is_not_block,
                 User.current_subscription.has(Subscription.status == SubscriptionStatus.EXPIRED),
-            )
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
+            ]
 
         if audience == BroadcastAudience.TRIAL:
-            conditions = and_(
-                is_not_block,
+            return [
+                *is_not_block,
                 User.current_subscription.has(Subscription.is_trial.is_(True)),
-            )
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
+            ]
 
         raise Exception(f"Unknown broadcast audience: {audience}")
@@ -0,0 +1,115 @@
+import asyncio
+from typing import Final, Optional, Union
+
+from aiogram import Bot
+from aiogram.enums import ChatMemberStatus
+from aiogram.types import Chat
+from loguru import logger
+
+from src.core.constants import TIME_1H, TIME_1M
+from src.core.storage.keys import ChannelMemberKey
+from src.infrastructure.database.models.dto import SettingsDto
+
+from .base import BaseService
+
+ChatId = Union[str, int]
+
+MEMBER_STATUSES: Final[tuple[ChatMemberStatus, ...]] = (
+    ChatMemberStatus.CREATOR,
+    ChatMemberStatus.ADMINISTRATOR,
+    ChatMemberStatus.MEMBER,
+)
+
+MEMBER_TTL: Final[int] = TIME_1H
+NOT_MEMBER_TTL: Final[int] = TIME_1M
+# Доля TTL, после которой статус участника обновляется в фоне
+REFRESH_THRESHOLD: Final[float] = 0.2
+
+
+class ChannelMembershipService(BaseService):
+    """Кэш статуса подписки пользователя на обязательный канал.
+
+    Статусы хранятся в Redis по ключу (бот, канал, пользователь): участники
+    на `MEMBER_TTL`, остальные на `NOT_MEMBER_TTL`. Незадолго до истечения
+    статус участника перепроверяется в фоне, а апдейты `chat_member`
+    записывают новый статус сразу.
+    """
+
+    _refreshing: set[str] = set()
+    _background_tasks: set[asyncio.Task[None]] = set()
+
+    @staticmethod
+    def get_chat_id(settings: SettingsDto) -> Optional[ChatId]:
+        if settings.channel_has_username:
+            return settings.channel_link.get_secret_value()
+        return settings.channel_id or None
+
+    @staticmethod
+    def is_member(status: ChatMemberStatus) -> bool:
+        return status in MEMBER_STATUSES
+
+    @classmethod
+    def matches_chat(cls, settings: SettingsDto, chat: Chat) -> bool:
+        chat_id = cls.get_chat_id(settings)
+        if isinstance(chat_id, str):
+            return bool(chat.username) and chat_id[1:].lower() == chat.username.lower()
+        return chat_id == chat.id
+
+    async def get_status(
+        self,
+        bot: Bot,
+        chat_id: ChatId,
+        telegram_id: int,
+        force: bool = False,
+    ) -> ChatMemberStatus:
+        key = ChannelMemberKey(bot_id=bot.id, chat_id=str(chat_id), telegram_id=telegram_id)
+
+        if not force:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key.pack())
+                pipe.ttl(key.pack())
+                cached_status, ttl = await pipe.execute()
+
+            if cached_status is not None:
+                status = ChatMemberStatus(cached_status.decode())
+                if self.is_member(status) and ttl < MEMBER_TTL * REFRESH_THRESHOLD:
+                    self._schedule_refresh(bot, chat_id, telegram_id)
+                return status
+
+        return await self._fetch(bot, chat_id, telegram_id)
+
+    async def set_status(
+        self,
+        bot_id: int,
+        chat_id: ChatId,
+        telegram_id: int,
+        status: ChatMemberStatus,
+    ) -> None:
+        key = ChannelMemberKey(bot_id=bot_id, chat_id=str(chat_id), telegram_id=telegram_id)
+        ttl = MEMBER_TTL if self.is_member(status) else NOT_MEMBER_TTL
+        await self.redis_client.set(key.pack(), status.value, ex=ttl)
+        logger.debug(f"Cached channel status '{status}' for user '{telegram_id}' ({ttl}s)")
+
+    async def _fetch(self, bot: Bot, chat_id: ChatId, telegram_id: int) -> ChatMemberStatus:
+        member = await bot.get_chat_member(chat_id=chat_id, user_id=telegram_id)
+        status = ChatMemberStatus(member.status)
+        await self.set_status(bot.id, chat_id, telegram_id, status)
+        return status
+
+    def _schedule_refresh(self, bot: Bot, chat_id: ChatId, telegram_id: int) -> None:
+        refresh_id = f"{bot.id}:{chat_id}:{telegram_id}"
+        if refresh_id in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._fetch(bot, chat_id, telegram_id)
+            except Exception as exception:
+                logger.warning(f"Failed to refresh channel status for '{telegram_id}': {exception}")
+            finally:
+                self._refreshing.discard(refresh_id)
+
+        self._refreshing.add(refresh_id)
+        task = asyncio.create_task(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
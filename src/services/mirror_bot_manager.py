@@ -7,9 +7,8 @@ bots to function identically (same menus, handlers, logic) but under
 different bot usernames.
 """
 
-import asyncio
 import secrets
-from typing import Any, Optional
+from typing import Optional
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
@@ -22,18 +21,24 @@ from pydantic import SecretStr
 from typing_extensions import Annotated
 
 from src.bot.storage import current_bot_id_var
+from src.bot.update_scheduler import UpdateScheduler
 from src.infrastructure.database.models.dto.mirror_bot import MirrorBotDto
 
 
 class MirrorBotManager:
     """Manages mirror bot instances, webhooks, and update routing."""
 
-    def __init__(self, dispatcher: Dispatcher, domain: SecretStr) -> None:
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        domain: SecretStr,
+        scheduler: UpdateScheduler,
+    ) -> None:
         self.dispatcher = dispatcher
         self.domain = domain
+        self.scheduler = scheduler  # shared with the main bot webhook endpoint
         self._bots: dict[int, Bot] = {}  # mirror_bot_id -> Bot instance
         self._secrets: dict[int, str] = {}  # mirror_bot_id -> secret token
-        self._feed_tasks: set[asyncio.Task[Any]] = set()
 
     @property
     def active_bots(self) -> dict[int, Bot]:
@@ -105,13 +110,6 @@ class MirrorBotManager:
         for mirror_id in list(self._bots.keys()):
             await self.stop_mirror_bot(mirror_id)
 
-        # Cancel any pending feed tasks
-        for task in list(self._feed_tasks):
-            if not task.done():
-                task.cancel()
-        await asyncio.gather(*self._feed_tasks, return_exceptions=True)
-        self._feed_tasks.clear()
-
     def register_routes(self, app: FastAPI) -> None:
         """Register webhook routes for mirror bots."""
         app.add_api_route(
@@ -139,9 +137,9 @@ class MirrorBotManager:
             logger.warning(f"Invalid secret token for mirror bot {mirror_id}, update {update.update_id}")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-        task = asyncio.create_task(self._feed_update(bot, update))
-        self._feed_tasks.add(task)
-        task.add_done_callback(self._feed_tasks.discard)
+        if not self.scheduler.submit(bot, update, self._feed_update):
+            # Telegram will redeliver the update once the queue drains
+            return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response(status_code=status.HTTP_200_OK)
 
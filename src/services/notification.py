@@ -1,6 +1,6 @@
 import asyncio
 import uuid
-from typing import Any, ClassVar, Optional, Union, cast
+from typing import Any, Awaitable, ClassVar, Final, Iterable, NamedTuple, Optional, Union, cast
 
 from aiogram import Bot
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
@@ -30,10 +30,12 @@ from src.core.enums import (
     UserRole,
 )
 from src.core.i18n.translator import get_translated_kwargs
+from src.core.storage.keys import MirrorUnreachableKey
 from src.core.utils.formatters import i18n_postprocess_text
 from src.core.utils.message_payload import MessagePayload
+from src.core.utils.rate_limit import AdaptiveTokenBucket
 from src.core.utils.types import AnyKeyboard
-from src.infrastructure.database.models.dto import UserDto
+from src.infrastructure.database.models.dto import SettingsDto, UserDto
 from src.infrastructure.database.models.dto.user import BaseUserDto
 from src.infrastructure.redis.repository import RedisRepository
 from src.services.settings import SettingsService
@@ -41,11 +43,25 @@ from src.services.settings import SettingsService
 from .base import BaseService
 from .user import UserService
 
+NOTIFY_INITIAL_RATE: Final[float] = 10.0
+# Telegram допускает ~30 сообщений в секунду на бота, оставляем запас
+NOTIFY_MAX_RATE: Final[float] = 25.0
+NOTIFY_WORKERS: Final[int] = 5
+NOTIFY_MAX_ATTEMPTS: Final[int] = 3
+
+
+class RenderedMessage(NamedTuple):
+    text: Optional[str]
+    reply_markup: Optional[AnyKeyboard]
+
 
 class NotificationService(BaseService):
     # Module-level singleton for the mirror bot manager.
     # Set once during app startup via set_mirror_bot_manager().
     _mirror_bot_manager: ClassVar[Optional[Any]] = None  # type: MirrorBotManager
+    # Общий на процесс token bucket для каждого бота, чтобы параллельные
+    # рассылки делили один лимит Telegram.
+    _buckets: ClassVar[dict[int, AdaptiveTokenBucket]] = {}
 
     @classmethod
     def set_mirror_bot_manager(cls, manager: Optional[Any]) -> None:  # type: MirrorBotManager
@@ -118,6 +134,71 @@ class NotificationService(BaseService):
 
         return await self._send_message(user, payload, locale_override=locale_override)
 
+    async def notify_users(
+        self,
+        telegram_ids: Iterable[int],
+        payload: MessagePayload,
+        ntf_type: Optional[UserNotificationType] = None,
+    ) -> int:
+        """Адресное уведомление списку пользователей, возвращает число доставленных.
+
+        Получатели выбираются одним запросом без связей, заблокированные
+        пропускаются. Подходит и для одного пользователя из фоновой задачи.
+        """
+        settings = await self.settings_service.get()
+        if not settings.features.notifications_enabled:
+            logger.debug(
+                f"Skipping notification '{payload.i18n_key}': "
+                f"global notifications are disabled in settings"
+            )
+            return 0
+
+        if ntf_type and not await self.settings_service.is_notification_enabled(ntf_type):
+            logger.debug(
+                f"Skipping notification '{payload.i18n_key}': "
+                f"notification type is disabled in settings"
+            )
+            return 0
+
+        recipients = await self.user_service.get_recipients(telegram_ids)
+        results = await self._deliver(recipients, payload, settings)
+        delivered = sum(results)
+
+        logger.info(
+            f"Notification '{payload.i18n_key}' delivered to '{delivered}' "
+            f"of '{len(recipients)}' recipients"
+        )
+        return delivered
+
+    async def send_broadcast_message(
+        self,
+        user: BaseUserDto,
+        payload: MessagePayload,
+        settings: SettingsDto,
+        bot: Optional[Bot] = None,
+    ) -> Optional[Message]:
+        """Отправка сообщения рассылки одним ботом, без копий в зеркала.
+
+        Настройки передаются снаружи, чтобы отправка не обращалась к БД.
+        `TelegramRetryAfter` пробрасывается: рассылка повторит сообщение после паузы.
+        """
+        if not settings.features.notifications_enabled:
+            return None
+
+        if settings.features.language_enabled:
+            locale = user.language
+        else:
+            locale = settings.bot_locale
+
+        return await self._send_message(
+            user,
+            payload,
+            locale_override=locale,
+            bot=bot,
+            with_mirrors=False,
+            raise_retry_after=True,
+        )
+
     async def system_notify(
         self,
         payload: MessagePayload,
@@ -138,20 +219,7 @@ class NotificationService(BaseService):
             f"Attempting to send system notification '{payload.i18n_key}' to '{len(devs)}' devs"
         )
 
-        async def send_to_dev(dev: UserDto) -> bool:
-            # Определяем язык в зависимости от мультиязычности
-            if settings.features.language_enabled:
-                # Мультиязычность включена - используем язык dev пользователя
-                locale = dev.language
-            else:
-                # Мультиязычность выключена - используем bot_locale
-                locale = settings.bot_locale
-            return bool(await self._send_message(user=dev, payload=payload, locale_override=locale))
-
-        tasks = [send_to_dev(dev) for dev in devs]
-        results = await asyncio.gather(*tasks)
-
-        return cast(list[bool], results)
+        return await self._deliver(devs, payload, settings)
 
     async def notify_super_dev(self, payload: MessagePayload) -> bool:
         dev = await self.user_service.get(telegram_id=self.config.bot.dev_id)
@@ -190,51 +258,163 @@ class NotificationService(BaseService):
         payload.i18n_kwargs.update(self.config.build.data)
         await self.notify_super_dev(payload=payload)
 
+    def is_mirror_bot(self, bot: Bot) -> bool:
+        return bot.id != self.bot.id
+
+    async def set_mirror_reachable(self, bot_id: int, telegram_id: int, reachable: bool) -> None:
+        """Отмечает, может ли зеркало писать пользователю.
+
+        Недоступные чаты (зеркало не запускали или заблокировали) пропускаются
+        при отправке, пока пользователь снова не напишет зеркалу.
+        """
+        await set_mirror_reachable(self.redis_client, bot_id, telegram_id, reachable)
+
+    async def get_mirror_unreachable(self, bot_id: int, telegram_ids: list[int]) -> set[int]:
+        """Пользователи из списка, которым зеркало сейчас не может писать."""
+        if not telegram_ids:
+            return set()
+        key = MirrorUnreachableKey(bot_id=bot_id).pack()
+        try:
+            flags = await cast(
+                Awaitable[list[int]],
+                self.redis_client.smismember(key, telegram_ids),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to check mirror reachability for bot {bot_id}: {e}")
+            return set()
+        return {telegram_id for telegram_id, flag in zip(telegram_ids, flags) if flag}
+
     #
 
+    async def _deliver(
+        self,
+        recipients: list[BaseUserDto],
+        payload: MessagePayload,
+        settings: SettingsDto,
+    ) -> list[bool]:
+        """Отправка одного сообщения получателям с общим ограничением скорости.
+
+        Текст и клавиатура рендерятся один раз на язык. Получателей обрабатывают
+        несколько воркеров через общий для бота token bucket: `RetryAfter`
+        замедляет отправку и повторяет сообщение после паузы.
+        """
+        if not recipients:
+            return []
+
+        bucket = self._get_bucket()
+        rendered: dict[Locale, RenderedMessage] = {}
+        results = [False] * len(recipients)
+        pending = iter(enumerate(recipients))
+
+        async def worker() -> None:
+            for index, recipient in pending:
+                if settings.features.language_enabled:
+                    locale = recipient.language
+                else:
+                    locale = settings.bot_locale
+
+                if locale not in rendered:
+                    rendered[locale] = self._render(payload, locale)
+
+                results[index] = await self._send_paced(
+                    bucket, recipient, payload, locale, rendered[locale]
+                )
+
+        await asyncio.gather(*(worker() for _ in range(min(NOTIFY_WORKERS, len(recipients)))))
+        return results
+
+    def _get_bucket(self) -> AdaptiveTokenBucket:
+        bucket = NotificationService._buckets.get(self.bot.id)
+        if bucket is None:
+            bucket = AdaptiveTokenBucket(rate=NOTIFY_INITIAL_RATE, max_rate=NOTIFY_MAX_RATE)
+            NotificationService._buckets[self.bot.id] = bucket
+        return bucket
+
+    async def _send_paced(
+        self,
+        bucket: AdaptiveTokenBucket,
+        user: BaseUserDto,
+        payload: MessagePayload,
+        locale: Locale,
+        rendered: RenderedMessage,
+    ) -> bool:
+        for _ in range(NOTIFY_MAX_ATTEMPTS):
+            await bucket.acquire()
+            try:
+                sent_message = await self._send_message(
+                    user,
+                    payload,
+                    locale_override=locale,
+                    raise_retry_after=True,
+                    rendered=rendered,
+                )
+            except TelegramRetryAfter as exception:
+                bucket.on_retry_after(exception.retry_after)
+                continue
+            except Exception as exception:
+                logger.error(
+                    f"Failed to send notification '{payload.i18n_key}' "
+                    f"to '{user.telegram_id}': {exception}"
+                )
+                return False
+
+            bucket.on_success()
+            return sent_message is not None
+
+        logger.warning(
+            f"Notification '{payload.i18n_key}' to '{user.telegram_id}' dropped "
+            f"after {NOTIFY_MAX_ATTEMPTS} rate limited attempts"
+        )
+        return False
+
     async def _send_message(
         self,
         user: BaseUserDto,
         payload: MessagePayload,
         locale_override: Optional[Locale] = None,
         mirror_sent_out: Optional[list[tuple[int, Message]]] = None,
+        bot: Optional[Bot] = None,
+        with_mirrors: bool = True,
+        raise_retry_after: bool = False,
+        rendered: Optional[RenderedMessage] = None,
     ) -> Optional[Message]:
         # Используем переопределённую локаль или язык пользователя
         locale = locale_override or user.language
-        
-        reply_markup = self._prepare_reply_markup(
-            payload.reply_markup,
-            payload.add_close_button,
-            payload.auto_delete_after,
-            locale,
-            user.telegram_id,
-            payload.close_button_style,
-        )
+        _bot = bot or self.bot
+
+        is_mirror = self.is_mirror_bot(_bot)
+        if is_mirror and await self._get_unreachable_mirrors([_bot], user.telegram_id):
+            logger.debug(f"Mirror bot {_bot.id}: '{user.telegram_id}' is unreachable, skipped")
+            return None
+
+        if rendered is None:
+            rendered = self._render(payload, locale)
         try:
             if (payload.media or payload.media_id) and payload.media_type:
-                sent_message = await self._send_media_message(user, payload, reply_markup, locale)
+                sent_message = await self._send_media_message(user, payload, rendered, bot=_bot)
             else:
                 if (payload.media or payload.media_id) and not payload.media_type:
                     logger.warning(
                         f"Validation warning: Media provided without media_type "
                         f"for chat '{user.telegram_id}'. Sending as text message"
                     )
-                sent_message = await self._send_text_message(user, payload, reply_markup, locale)
+                sent_message = await self._send_text_message(user, payload, rendered, bot=_bot)
 
             if payload.auto_delete_after is not None and sent_message:
-                asyncio.create_task(
-                    self._schedule_message_deletion(
-                        chat_id=user.telegram_id,
-                        message_id=sent_message.message_id,
-                        delay=payload.auto_delete_after,
-                    )
+                await self._schedule_message_deletion(
+                    chat_id=user.telegram_id,
+                    message_id=sent_message.message_id,
+                    delay=payload.auto_delete_after,
+                    bot=_bot,
                 )
 
             # Track closeable messages in Redis for auto-cleanup after 45h
+            # (cleanup deletes them via the main bot only)
             if (
                 payload.add_close_button
                 and payload.auto_delete_after is None
                 and sent_message
+                and _bot is self.bot
             ):
                 await self._track_closeable_message(
                     chat_id=user.telegram_id,
@@ -242,36 +422,18 @@ class NotificationService(BaseService):
                 )
 
             # ── Also send via any active mirror bots ───────────────────
-            if self._mirror_bot_manager:
-                for mirror_db_id, mirror_bot in self._mirror_bot_manager.active_bots.items():
-                    try:
-                        if (payload.media or payload.media_id) and payload.media_type:
-                            mirror_sent = await self._send_media_message(user, payload, reply_markup, locale, bot=mirror_bot)
-                        else:
-                            mirror_sent = await self._send_text_message(user, payload, reply_markup, locale, bot=mirror_bot)
-                        if mirror_sent:
-                            # Expose to caller (e.g. for storing shutdown message IDs per mirror)
-                            if mirror_sent_out is not None:
-                                mirror_sent_out.append((mirror_db_id, mirror_sent))
-                            # Schedule auto-deletion for the mirror bot message using its own bot instance
-                            if payload.auto_delete_after is not None:
-                                asyncio.create_task(
-                                    self._schedule_message_deletion(
-                                        chat_id=user.telegram_id,
-                                        message_id=mirror_sent.message_id,
-                                        delay=payload.auto_delete_after,
-                                        bot=mirror_bot,
-                                    )
-                                )
-                    except (TelegramBadRequest, TelegramForbiddenError):
-                        pass  # User never started this mirror bot — expected
-                    except Exception as e:
-                        logger.debug(f"Mirror bot {mirror_db_id}: notification to {user.telegram_id} skipped: {e}")
+            if with_mirrors and self._mirror_bot_manager:
+                mirror_sent = await self._send_to_mirrors(user, payload, rendered)
+                # Expose to caller (e.g. for storing shutdown message IDs per mirror)
+                if mirror_sent_out is not None:
+                    mirror_sent_out.extend(mirror_sent)
 
             return sent_message
 
         except TelegramBadRequest as exception:
-            if "chat not found" in str(exception).lower():
+            if self._is_unreachable_error(exception):
+                if is_mirror:
+                    await self.set_mirror_reachable(_bot.id, user.telegram_id, reachable=False)
                 logger.warning(
                     f"Chat not found for user '{user.telegram_id}'. "
                     f"User may have deleted the chat or blocked the bot."
@@ -283,6 +445,8 @@ class NotificationService(BaseService):
                 )
             return None
         except TelegramForbiddenError as exception:
+            if is_mirror:
+                await self.set_mirror_reachable(_bot.id, user.telegram_id, reachable=False)
             logger.warning(
                 f"User '{user.telegram_id}' blocked the bot. "
                 f"Cannot send notification '{payload.i18n_key}'"
@@ -293,22 +457,107 @@ class NotificationService(BaseService):
                 f"Telegram rate limit for '{payload.i18n_key}' "
                 f"to '{user.telegram_id}'. Retry after {exception.retry_after}s"
             )
+            if raise_retry_after:
+                raise
+            return None
+
+    async def _send_to_mirrors(
+        self,
+        user: BaseUserDto,
+        payload: MessagePayload,
+        rendered: RenderedMessage,
+    ) -> list[tuple[int, Message]]:
+        mirror_bots = self._mirror_bot_manager.active_bots if self._mirror_bot_manager else {}
+        if not mirror_bots:
+            return []
+
+        unreachable = await self._get_unreachable_mirrors(mirror_bots.values(), user.telegram_id)
+        targets = [
+            (mirror_db_id, mirror_bot)
+            for mirror_db_id, mirror_bot in mirror_bots.items()
+            if mirror_bot.id not in unreachable
+        ]
+        results = await asyncio.gather(
+            *(
+                self._send_to_mirror(mirror_db_id, mirror_bot, user, payload, rendered)
+                for mirror_db_id, mirror_bot in targets
+            )
+        )
+        return [
+            (mirror_db_id, message)
+            for (mirror_db_id, _), message in zip(targets, results)
+            if message
+        ]
+
+    async def _send_to_mirror(
+        self,
+        mirror_db_id: int,
+        mirror_bot: Bot,
+        user: BaseUserDto,
+        payload: MessagePayload,
+        rendered: RenderedMessage,
+    ) -> Optional[Message]:
+        try:
+            if (payload.media or payload.media_id) and payload.media_type:
+                mirror_sent = await self._send_media_message(
+                    user, payload, rendered, bot=mirror_bot
+                )
+            else:
+                mirror_sent = await self._send_text_message(
+                    user, payload, rendered, bot=mirror_bot
+                )
+        except (TelegramBadRequest, TelegramForbiddenError) as e:
+            if self._is_unreachable_error(e):
+                # User never started or blocked this mirror bot — expected
+                await self.set_mirror_reachable(mirror_bot.id, user.telegram_id, reachable=False)
+            else:
+                logger.debug(
+                    f"Mirror bot {mirror_db_id}: notification to {user.telegram_id} failed: {e}"
+                )
+            return None
+        except Exception as e:
+            logger.debug(
+                f"Mirror bot {mirror_db_id}: notification to {user.telegram_id} skipped: {e}"
+            )
             return None
 
+        # Schedule auto-deletion for the mirror bot message using its own bot instance
+        if mirror_sent and payload.auto_delete_after is not None:
+            await self._schedule_message_deletion(
+                chat_id=user.telegram_id,
+                message_id=mirror_sent.message_id,
+                delay=payload.auto_delete_after,
+                bot=mirror_bot,
+            )
+        return mirror_sent
+
+    async def _get_unreachable_mirrors(self, bots: Iterable[Bot], telegram_id: int) -> set[int]:
+        bot_ids = [bot.id for bot in bots]
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for bot_id in bot_ids:
+                    pipe.sismember(MirrorUnreachableKey(bot_id=bot_id).pack(), telegram_id)
+                flags = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to check mirror reachability for '{telegram_id}': {e}")
+            return set()
+        return {bot_id for bot_id, flag in zip(bot_ids, flags) if flag}
+
+    @staticmethod
+    def _is_unreachable_error(exception: Exception) -> bool:
+        if isinstance(exception, TelegramForbiddenError):
+            return True
+        if isinstance(exception, TelegramBadRequest):
+            return "chat not found" in str(exception).lower()
+        return False
+
     async def _send_media_message(
         self,
         user: BaseUserDto,
         payload: MessagePayload,
-        reply_markup: Optional[AnyKeyboard],
-        locale: Optional[Locale] = None,
+        rendered: RenderedMessage,
         bot: Optional[Bot] = None,
     ) -> Message:
-        message_text = self._get_translated_text(
-            locale=locale or user.language,
-            i18n_key=payload.i18n_key,
-            i18n_kwargs=payload.i18n_kwargs,
-        )
-
         assert payload.media_type
         _bot = bot or self.bot
         send_func = payload.media_type.get_function(_bot)
@@ -320,8 +569,8 @@ class NotificationService(BaseService):
 
         tg_payload = {
             "chat_id": user.telegram_id,
-            "caption": message_text,
-            "reply_markup": reply_markup,
+            "caption": rendered.text,
+            "reply_markup": rendered.reply_markup,
             "message_effect_id": payload.message_effect,
             media_arg_name: media_input,
         }
@@ -331,30 +580,50 @@ class NotificationService(BaseService):
         self,
         user: BaseUserDto,
         payload: MessagePayload,
-        reply_markup: Optional[AnyKeyboard],
-        locale: Optional[Locale] = None,
+        rendered: RenderedMessage,
         bot: Optional[Bot] = None,
     ) -> Message:
+        _bot = bot or self.bot
+        return await _bot.send_message(
+            chat_id=user.telegram_id,
+            text=cast(str, rendered.text),
+            message_effect_id=payload.message_effect,
+            reply_markup=rendered.reply_markup,
+            disable_web_page_preview=True,
+        )
+
+    def _render(self, payload: MessagePayload, locale: Locale) -> RenderedMessage:
+        """Текст и клавиатура сообщения на языке locale.
+
+        Клавиатура копируется перед переводом: один payload рендерится для разных языков.
+        """
         # Используем raw text если он предоставлен, иначе переводим i18n ключ
-        effective_locale = locale or user.language
         if payload.text:
-            message_text = payload.text
+            text: Optional[str] = payload.text
         elif payload.i18n_key:
-            message_text = self._get_translated_text(
-                locale=effective_locale,
+            text = self._get_translated_text(
+                locale=locale,
                 i18n_key=payload.i18n_key,
                 i18n_kwargs=payload.i18n_kwargs,
             )
+        elif (payload.media or payload.media_id) and payload.media_type:
+            text = None
         else:
             raise ValueError("Either 'text' or 'i18n_key' must be provided in MessagePayload")
 
-        _bot = bot or self.bot
-        return await _bot.send_message(
-            chat_id=user.telegram_id,
-            text=message_text,
-            message_effect_id=payload.message_effect,
-            reply_markup=reply_markup,
-            disable_web_page_preview=True,
+        reply_markup = payload.reply_markup
+        if reply_markup is not None:
+            reply_markup = reply_markup.model_copy(deep=True)
+
+        return RenderedMessage(
+            text=text,
+            reply_markup=self._prepare_reply_markup(
+                reply_markup,
+                payload.add_close_button,
+                payload.auto_delete_after,
+                locale,
+                payload.close_button_style,
+            ),
         )
 
     def _prepare_reply_markup(
@@ -363,7 +632,6 @@ class NotificationService(BaseService):
         add_close_button: bool,
         auto_delete_after: Optional[int],
         locale: Locale,
-        chat_id: int,
         close_button_style: str = "danger",
     ) -> Optional[AnyKeyboard]:
         if reply_markup is None:
@@ -388,8 +656,8 @@ class NotificationService(BaseService):
             return self._translate_keyboard_texts(reply_markup, locale)
 
         logger.warning(
-            f"Unsupported reply_markup type '{type(reply_markup).__name__}' "
-            f"for chat '{chat_id}'. Close button will not be added"
+            f"Unsupported reply_markup type '{type(reply_markup).__name__}'. "
+            f"Close button will not be added"
         )
         return reply_markup
 
@@ -429,6 +697,33 @@ class NotificationService(BaseService):
         member = f"{chat_id}:{message_id}"
         await self.redis_repository.sorted_collection_remove(key, member)
 
+    async def delete_message(
+        self,
+        chat_id: int,
+        message_id: int,
+        bot_id: Optional[int] = None,
+    ) -> None:
+        """Удаляет сообщение через бота, который его отправил (основной или зеркало)."""
+        bot = self._get_bot(bot_id)
+        if not bot:
+            logger.warning(f"Bot '{bot_id}' not found, message '{message_id}' is not deleted")
+            return
+
+        try:
+            await bot.delete_message(chat_id=chat_id, message_id=message_id)
+            logger.debug(f"Message '{message_id}' in chat '{chat_id}' deleted (bot={bot.id})")
+        except Exception as exception:
+            logger.error(
+                f"Failed to delete message '{message_id}' in chat '{chat_id}': {exception}"
+            )
+
+    def _get_bot(self, bot_id: Optional[int]) -> Optional[Bot]:
+        if bot_id is None or bot_id == self.bot.id:
+            return self.bot
+
+        mirror_bots = self._mirror_bot_manager.active_bots if self._mirror_bot_manager else {}
+        return next((bot for bot in mirror_bots.values() if bot.id == bot_id), None)
+
     async def _schedule_message_deletion(
         self,
         chat_id: int,
@@ -436,19 +731,27 @@ class NotificationService(BaseService):
         delay: int,
         bot: Optional[Bot] = None,
     ) -> None:
+        from src.infrastructure.taskiq.schedule_source import kiq_delayed  # noqa: PLC0415
+        from src.infrastructure.taskiq.tasks.notifications import (  # noqa: PLC0415
+            delete_message_task,
+        )
+
         _bot = bot or self.bot
         logger.debug(
             f"Scheduling message '{message_id}' for auto-deletion in '{delay}' (chat '{chat_id}', bot={_bot.id})"
         )
         try:
-            await asyncio.sleep(delay)
-            await _bot.delete_message(chat_id=chat_id, message_id=message_id)
-            logger.debug(
-                f"Message '{message_id}' in chat '{chat_id}' deleted after '{delay}' seconds"
+            await kiq_delayed(
+                delete_message_task,
+                delay,
+                chat_id=chat_id,
+                message_id=message_id,
+                bot_id=_bot.id,
             )
         except Exception as exception:
             logger.error(
-                f"Failed to delete message '{message_id}' in chat '{chat_id}': {exception}"
+                f"Failed to schedule deletion of message '{message_id}' in chat '{chat_id}': "
+                f"{exception}"
             )
 
     def _get_translated_text(
@@ -512,3 +815,17 @@ class NotificationService(BaseService):
 
         logger.warning("Fallback to temporary dev user from environment for notifications")
         return temp_dev
+
+
+async def set_mirror_reachable(
+    redis_client: Redis,
+    bot_id: int,
+    telegram_id: int,
+    reachable: bool,
+) -> None:
+    key = MirrorUnreachableKey(bot_id=bot_id).pack()
+    if reachable:
+        await cast(Awaitable[int], redis_client.srem(key, telegram_id))
+    else:
+        await cast(Awaitable[int], redis_client.sadd(key, telegram_id))
+        logger.debug(f"Mirror bot {bot_id}: '{telegram_id}' marked as unreachable")
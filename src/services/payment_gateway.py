@@ -11,6 +11,7 @@ from redis.asyncio import Redis
 from src.bot.keyboards import get_user_keyboard
 from src.core.config import AppConfig
 from src.core.enums import (
+    BalanceEntryReason,
     Currency,
     PaymentGatewayType,
     PurchaseType,
@@ -682,6 +683,9 @@ class PaymentGatewayService(BaseService):
                 await self.user_service.add_to_balance(
                     user=transaction.user,
                     amount=int(transaction.pricing.final_amount),
+                    reason=BalanceEntryReason.TOPUP,
+                    # Повторный вебхук того же платежа не зачислит сумму второй раз
+                    idempotency_key=f"topup:{transaction.payment_id}",
                 )
             
             # Assign referral rewards (only for external payment gateways)
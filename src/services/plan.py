@@ -1,4 +1,8 @@
-from typing import Optional
+import time
+from copy import deepcopy
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import ClassVar, Final, Mapping, Optional
 from uuid import UUID
 
 from aiogram import Bot
@@ -8,17 +12,70 @@ from redis.asyncio import Redis
 
 from src.core.config import AppConfig
 from src.core.enums import PlanAvailability
+from src.core.storage.keys import PlanCatalogVersionKey
 from src.infrastructure.database import UnitOfWork
 from src.infrastructure.database.models.dto import PlanDto, UserDto
 from src.infrastructure.database.models.sql import Plan, PlanDuration, PlanPrice
 from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis.local_cache import local_cache
 
 from .base import BaseService
 
+# Как часто сверять версию каталога планов с Redis
+CATALOG_CHECK_INTERVAL: Final[float] = 1.0
+
+
+@dataclass(frozen=True)
+class PlanCatalog:
+    """Неизменяемый снимок всех планов с длительностями и ценами одной версии.
+
+    Объекты планов наружу не отдаются: `PlanService` возвращает их копии.
+    """
+
+    version: int
+    plans: tuple[PlanDto, ...]
+    active: tuple[PlanDto, ...]
+    by_id: Mapping[int, PlanDto]
+    by_name: Mapping[str, PlanDto]
+    by_tag: Mapping[str, PlanDto]
+    allowed_user_ids: Mapping[int, frozenset[int]]
+
+    @classmethod
+    def build(cls, version: int, plans: list[PlanDto]) -> "PlanCatalog":
+        plans.sort(key=lambda p: p.order_index)
+        return cls(
+            version=version,
+            plans=tuple(plans),
+            active=tuple(p for p in plans if p.is_active),
+            by_id=MappingProxyType({p.id: p for p in plans if p.id is not None}),
+            by_name=MappingProxyType({p.name: p for p in plans}),
+            by_tag=MappingProxyType({p.tag: p for p in plans if p.tag}),
+            allowed_user_ids=MappingProxyType(
+                {p.id: frozenset(p.allowed_user_ids) for p in plans if p.id is not None}
+            ),
+        )
+
+    def get_first_active(self, availability: PlanAvailability) -> Optional[PlanDto]:
+        return next((p for p in self.active if p.availability == availability), None)
+
+    def is_allowed(self, plan: PlanDto, telegram_id: int) -> bool:
+        return telegram_id in self.allowed_user_ids.get(plan.id, frozenset())  # type: ignore[arg-type]
+
 
 class PlanService(BaseService):
+    """Планы читаются из каталога в памяти процесса.
+
+    Каталог загружается целиком и сверяется с версией в Redis, которую
+    увеличивает любая запись планов, поэтому выборки и проверка доступности
+    не обращаются к БД, пока планы не изменились.
+    """
+
     uow: UnitOfWork
 
+    _catalog: ClassVar[Optional[PlanCatalog]] = None
+    _catalog_checked_at: ClassVar[float] = 0.0
+    _catalog_generation: ClassVar[int] = 0
+
     def __init__(
         self,
         config: AppConfig,
@@ -120,55 +177,63 @@ class PlanService(BaseService):
 
         db_plan = self._dto_to_model(plan)
         db_created_plan = await self.uow.repository.plans.create(db_plan)
+        created_plan = PlanDto.from_model(db_created_plan)
+        await self._invalidate_catalog()
         logger.info(f"Created plan '{plan.name}' with ID '{db_created_plan.id}'")
-        return PlanDto.from_model(db_created_plan)  # type: ignore[return-value]
+        return created_plan  # type: ignore[return-value]
 
     async def get(self, plan_id: int) -> Optional[PlanDto]:
-        db_plan = await self.uow.repository.plans.get(plan_id)
+        catalog = await self._get_catalog()
+        plan = catalog.by_id.get(plan_id)
 
-        if not db_plan:
+        if not plan:
             logger.warning(f"Plan '{plan_id}' not found")
 
-        return PlanDto.from_model(db_plan)
+        return deepcopy(plan)
 
     async def get_by_name(self, plan_name: str) -> Optional[PlanDto]:
-        db_plan = await self.uow.repository.plans.get_by_name(plan_name)
+        catalog = await self._get_catalog()
+        plan = catalog.by_name.get(plan_name)
 
-        if not db_plan:
+        if not plan:
             logger.warning(f"Plan with name '{plan_name}' not found")
 
-        return PlanDto.from_model(db_plan)
+        return deepcopy(plan)
 
     async def get_by_tag(self, tag: str) -> Optional[PlanDto]:
-        db_plan = await self.uow.repository.plans.get_by_tag(tag)
+        catalog = await self._get_catalog()
+        plan = catalog.by_tag.get(tag)
 
-        if not db_plan:
+        if not plan:
             logger.debug(f"Plan with tag '{tag}' not found")
 
-        return PlanDto.from_model(db_plan)
+        return deepcopy(plan)
 
     async def get_all(self) -> list[PlanDto]:
-        db_plans = await self.uow.repository.plans.get_all()
-        return PlanDto.from_model_list(db_plans)
+        catalog = await self._get_catalog()
+        return deepcopy(list(catalog.plans))
 
     async def update(self, plan: PlanDto) -> Optional[PlanDto]:
         db_plan = self._dto_to_model(plan)
         db_updated_plan = await self.uow.repository.plans.update(db_plan)
 
         if db_updated_plan:
+            updated_plan = PlanDto.from_model(db_updated_plan)
+            await self._invalidate_catalog()
             logger.info(f"Updated plan '{plan.name}' (ID: '{plan.id}') successfully")
-        else:
-            logger.warning(
-                f"Attempted to update plan '{plan.name}' (ID: '{plan.id}'), "
-                "but plan was not found or update failed"
-            )
+            return updated_plan
 
-        return PlanDto.from_model(db_updated_plan)
+        logger.warning(
+            f"Attempted to update plan '{plan.name}' (ID: '{plan.id}'), "
+            "but plan was not found or update failed"
+        )
+        return None
 
     async def delete(self, plan_id: int) -> bool:
         result = await self.uow.repository.plans.delete(plan_id)
 
         if result:
+            await self._invalidate_catalog()
             logger.info(f"Plan '{plan_id}' deleted successfully")
         else:
             logger.warning(f"Failed to delete plan '{plan_id}'")
@@ -176,7 +241,8 @@ class PlanService(BaseService):
         return result
 
     async def count(self) -> int:
-        return await self.uow.repository.plans.count()
+        catalog = await self._get_catalog()
+        return len(catalog.plans)
 
     # ---------------------------------------------------------------------
 
@@ -184,15 +250,8 @@ class PlanService(BaseService):
         """DEPRECATED: Используйте get_appropriate_trial_plan(user)"""
         logger.warning("get_trial_plan() is deprecated")
 
-        db_plans: list[Plan] = await self.uow.repository.plans.filter_by_availability(
-            availability=PlanAvailability.TRIAL
-        )
-
-        active_plans = [p for p in db_plans if p.is_active]
-        if active_plans:
-            return PlanDto.from_model(active_plans[0])
-
-        return None
+        catalog = await self._get_catalog()
+        return deepcopy(catalog.get_first_active(PlanAvailability.TRIAL))
 
     async def get_appropriate_trial_plan(self, user: UserDto, is_invited: bool = False) -> Optional[PlanDto]:
         """
@@ -200,33 +259,26 @@ class PlanService(BaseService):
         Приглашённые пользователи получают INVITED подписку.
         Остальные пользователи получают TRIAL подписку.
         """
+        catalog = await self._get_catalog()
+
         # Если пользователь приглашён - ищем INVITED план
         if is_invited:
-            invited_plans: list[Plan] = await self.uow.repository.plans.filter_by_availability(
-                availability=PlanAvailability.INVITED
-            )
-            active_invited = [p for p in invited_plans if p.is_active]
-            if active_invited:
-                plan = active_invited[0]
+            plan = catalog.get_first_active(PlanAvailability.INVITED)
+            if plan:
                 logger.debug(
                     f"Available INVITED plan '{plan.name}' found "
                     f"for invited user '{user.telegram_id}' (for trial eligibility check)"
                 )
-                return PlanDto.from_model(plan)
+                return deepcopy(plan)
 
         # 🎁 TRIAL - базовая подписка для остальных пользователей
-        trial_plans: list[Plan] = await self.uow.repository.plans.filter_by_availability(
-            availability=PlanAvailability.TRIAL
-        )
-
-        active_trial = [p for p in trial_plans if p.is_active]
-        if active_trial:
-            plan = active_trial[0]
+        plan = catalog.get_first_active(PlanAvailability.TRIAL)
+        if plan:
             logger.debug(
                 f"Available TRIAL plan '{plan.name}' found "
                 f"for user '{user.telegram_id}' (for trial eligibility check)"
             )
-            return PlanDto.from_model(plan)
+            return deepcopy(plan)
 
         logger.debug(
             f"No TRIAL plan found for user '{user.telegram_id}'"
@@ -235,15 +287,12 @@ class PlanService(BaseService):
 
     async def get_invited_plan(self) -> Optional[PlanDto]:
         """Get the INVITED plan for users who use a referral code."""
-        invited_plans: list[Plan] = await self.uow.repository.plans.filter_by_availability(
-            availability=PlanAvailability.INVITED
-        )
+        catalog = await self._get_catalog()
 
-        active_plans = [p for p in invited_plans if p.is_active]
-        if active_plans:
-            plan = active_plans[0]
+        plan = catalog.get_first_active(PlanAvailability.INVITED)
+        if plan:
             logger.info(f"Selected INVITED plan '{plan.name}'")
-            return PlanDto.from_model(plan)
+            return deepcopy(plan)
 
         logger.warning("No active INVITED plan found")
         return None
@@ -251,10 +300,10 @@ class PlanService(BaseService):
     # ---------------------------------------------------------------------
 
     async def get_available_plans(self, user: UserDto) -> list[PlanDto]:
-        db_plans: list[Plan] = await self.uow.repository.plans.filter_active(is_active=True)
-        result: list[Plan] = []
+        catalog = await self._get_catalog()
+        result: list[PlanDto] = []
 
-        for plan in db_plans:
+        for plan in catalog.active:
             match plan.availability:
                 case PlanAvailability.ALL:
                     result.append(plan)
@@ -264,36 +313,73 @@ class PlanService(BaseService):
                     result.append(plan)
                 case PlanAvailability.INVITED if user.is_invited_user:
                     result.append(plan)
-                case PlanAvailability.ALLOWED if user.telegram_id in plan.allowed_user_ids:
+                case PlanAvailability.ALLOWED if catalog.is_allowed(plan, user.telegram_id):
                     result.append(plan)
 
-        return PlanDto.from_model_list(result)
+        return deepcopy(result)
 
     async def get_allowed_plans(self) -> list[PlanDto]:
-        db_plans = await self.uow.repository.plans.filter_by_availability(
-            availability=PlanAvailability.ALLOWED,
+        catalog = await self._get_catalog()
+        return deepcopy(
+            [plan for plan in catalog.plans if plan.availability == PlanAvailability.ALLOWED]
         )
-        return PlanDto.from_model_list(db_plans)
 
     async def move_plan_up(self, plan_id: int) -> bool:
-        db_plans = await self.uow.repository.plans.get_all()
-        db_plans.sort(key=lambda p: p.order_index)
+        catalog = await self._get_catalog()
+        plans = list(catalog.plans)
 
-        index = next((i for i, p in enumerate(db_plans) if p.id == plan_id), None)
+        index = next((i for i, p in enumerate(plans) if p.id == plan_id), None)
         if index is None:
             return False
 
         if index == 0:
-            db_plans.append(db_plans.pop(0))
+            plans.append(plans.pop(0))
         else:
-            db_plans[index - 1], db_plans[index] = db_plans[index], db_plans[index - 1]
+            plans[index - 1], plans[index] = plans[index], plans[index - 1]
 
-        for i, plan in enumerate(db_plans, start=1):
-            plan.order_index = i
+        # Обновляются только планы, у которых изменилась позиция
+        for i, plan in enumerate(plans, start=1):
+            if plan.order_index != i:
+                await self.uow.repository.plans.set_order_index(plan.id, i)  # type: ignore[arg-type]
 
+        await self._invalidate_catalog()
         logger.info(f"Plan '{plan_id}' reorder successfully")
         return True
 
+    #
+
+    async def _get_catalog(self) -> PlanCatalog:
+        """Каталог текущей версии: версия в Redis сверяется не чаще `CATALOG_CHECK_INTERVAL`."""
+        catalog = PlanService._catalog
+        now = time.monotonic()
+
+        # L1 очищен целиком (FLUSHALL, переподключение к каналу): каталог тоже перечитывается
+        if catalog and PlanService._catalog_generation != local_cache.generation:
+            catalog = None
+
+        if catalog and now - PlanService._catalog_checked_at < CATALOG_CHECK_INTERVAL:
+            return catalog
+
+        # Версия читается до загрузки планов: запись, закоммиченная во время
+        # загрузки, увеличит версию и каталог перечитается при следующей сверке
+        version = int(await self.redis_client.get(PlanCatalogVersionKey().pack()) or 0)
+
+        if catalog is None or catalog.version != version:
+            generation = local_cache.generation
+            db_plans = await self.uow.repository.plans.get_all()
+            catalog = PlanCatalog.build(version, PlanDto.from_model_list(db_plans))
+            PlanService._catalog = catalog
+            PlanService._catalog_generation = generation
+            logger.debug(f"Loaded plan catalog version '{version}' ({len(catalog.plans)} plans)")
+
+        PlanService._catalog_checked_at = now
+        return catalog
+
+    async def _invalidate_catalog(self) -> None:
+        # Версия увеличивается только после коммита, иначе другой процесс
+        # может закэшировать старые планы под новой версией
+        await self.uow.commit()
+        await invalidate_plan_catalog(self.redis_client)
 
     def _dto_to_model(self, plan_dto: PlanDto) -> Plan:
         db_plan = Plan(**plan_dto.model_dump(exclude={"durations"}))
@@ -309,3 +395,9 @@ class PlanService(BaseService):
                 db_price.plan_duration = db_duration
 
         return db_plan
+
+
+async def invalidate_plan_catalog(redis_client: Redis) -> None:
+    """Все процессы перечитают планы: вызывается после любой записи в таблицы планов."""
+    await redis_client.incr(PlanCatalogVersionKey().pack())
+    PlanService._catalog = None
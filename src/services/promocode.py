@@ -7,10 +7,11 @@ from redis.asyncio import Redis
 
 from src.core.config import AppConfig
 from src.core.enums import PromocodeRewardType
+from src.core.storage.key_builder import build_key
 from src.infrastructure.database import UnitOfWork
 from src.infrastructure.database.models.dto import PromocodeDto
 from src.infrastructure.database.models.sql import Promocode
-from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis import RedisRepository, delete_cache_keys
 
 from .base import BaseService
 
@@ -138,7 +139,10 @@ class PromocodeService(BaseService):
                         )
                     
                     # Очищаем кэш пользователя для обновления данных
-                    await self.redis_client.delete(f"cache:get_user:{activation.user_telegram_id}")
+                    await delete_cache_keys(
+                        self.redis_client,
+                        build_key("cache", "get_user", activation.user_telegram_id),
+                    )
                 
                 # Коммитим изменения скидок пользователей до удаления промокода
                 await self.uow.commit()
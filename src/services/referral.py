@@ -13,6 +13,7 @@ from redis.asyncio import Redis
 from src.core.config import AppConfig
 from src.core.constants import ASSETS_DIR, REFERRAL_PREFIX, T_ME
 from src.core.enums import (
+    BalanceEntryReason,
     MessageEffect,
     PurchaseType,
     ReferralAccrualStrategy,
@@ -263,7 +264,12 @@ class ReferralService(BaseService):
         if should_issue_immediately:
             user = await self.user_service.get(user_telegram_id)
             if user:
-                await self.user_service.add_to_balance(user, amount)
+                await self.user_service.add_to_balance(
+                    user,
+                    amount,
+                    reason=BalanceEntryReason.REFERRAL_REWARD,
+                    idempotency_key=f"referral_reward:{reward.id}",
+                )
                 logger.info(
                     f"ReferralReward '{referral_id}' created and immediately issued to balance "
                     f"for user '{user_telegram_id}' (COMBINED mode)"
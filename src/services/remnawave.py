@@ -1,5 +1,7 @@
+import asyncio
+import time
 from datetime import timedelta
-from typing import Optional, cast
+from typing import ClassVar, Final, Optional, cast
 from uuid import UUID
 
 from aiogram import Bot
@@ -24,7 +26,7 @@ from remnapy.models.webhook import NodeDto
 
 from src.bot.keyboards import get_user_keyboard
 from src.core.config import AppConfig
-from src.core.constants import DATETIME_FORMAT, IMPORTED_TAG
+from src.core.constants import DATETIME_FORMAT, IMPORTED_TAG, TIME_1M, TIME_10M
 from src.core.enums import (
     PlanType,
     RemnaNodeEvent,
@@ -35,6 +37,7 @@ from src.core.enums import (
     UserNotificationType,
 )
 from src.core.i18n.keys import ByteUnitKey
+from src.core.storage.key_builder import build_key
 from src.core.utils.formatters import (
     format_bytes_to_gb,
     format_country_code,
@@ -53,10 +56,12 @@ from src.core.utils.types import RemnaUserDto
 from src.infrastructure.database.models.dto import (
     PlanSnapshotDto,
     RemnaSubscriptionDto,
+    SquadCatalogDto,
+    SquadDto,
     SubscriptionDto,
     UserDto,
 )
-from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis import RedisRepository, delete_cache_keys, redis_cache
 from src.infrastructure.taskiq.tasks.notifications import (
     send_subscription_expire_notification_task,
     send_subscription_limited_notification_task,
@@ -69,6 +74,10 @@ from src.services.user import UserService
 
 from .base import BaseService
 
+SQUAD_CATALOG_CACHE_PREFIX: Final[str] = "get_squad_catalog"
+# Принудительное обновление каталога из-за неизвестного сквада не чаще раза за интервал
+SQUAD_CATALOG_REFRESH_INTERVAL: Final[float] = 60.0
+
 
 class RemnawaveService(BaseService):
     remnawave: RemnawaveSDK
@@ -76,6 +85,8 @@ class RemnawaveService(BaseService):
     subscription_service: SubscriptionService
     plan_service: PlanService
 
+    _squad_catalog_refreshed_at: ClassVar[float] = 0.0
+
     def __init__(
         self,
         config: AppConfig,
@@ -103,6 +114,71 @@ class RemnawaveService(BaseService):
         if not isinstance(response, GetStatsResponseDto):
             raise ValueError(f"Invalid response from Remnawave panel: {response}")
 
+    @redis_cache(prefix=SQUAD_CATALOG_CACHE_PREFIX, ttl=TIME_10M, local_ttl=TIME_1M)
+    async def get_squad_catalog(self) -> SquadCatalogDto:
+        """Каталог сквадов панели. Обновляется задачей `refresh_squad_catalog_task`."""
+        internal_response, external_response = await asyncio.gather(
+            self.remnawave.internal_squads.get_internal_squads(),
+            self.remnawave.external_squads.get_external_squads(),
+            return_exceptions=True,
+        )
+
+        # Без внутренних сквадов каталог бесполезен, ошибку не кэшируем
+        if isinstance(internal_response, BaseException):
+            raise internal_response
+
+        catalog = SquadCatalogDto(
+            internal_squads=[
+                SquadDto(uuid=squad.uuid, name=squad.name)
+                for squad in internal_response.internal_squads
+            ]
+        )
+
+        if isinstance(external_response, BaseException):
+            logger.warning(f"Failed to get external squads: {external_response}")
+        elif external_response:
+            catalog.external_squads = [
+                SquadDto(uuid=squad.uuid, name=squad.name)
+                for squad in external_response.external_squads
+            ]
+
+        logger.debug(
+            f"Loaded squad catalog: {len(catalog.internal_squads)} internal, "
+            f"{len(catalog.external_squads)} external"
+        )
+        return catalog
+
+    async def refresh_squad_catalog(self) -> SquadCatalogDto:
+        await self.invalidate_squad_catalog()
+        return await self.get_squad_catalog()
+
+    async def invalidate_squad_catalog(self) -> None:
+        await delete_cache_keys(self.redis_client, build_key("cache", SQUAD_CATALOG_CACHE_PREFIX))
+        logger.debug("Squad catalog cache cleared")
+
+    async def _check_squad_catalog(self, remna_user: RemnaUserDto) -> None:
+        """Сбрасывает каталог, если панель прислала пользователя с неизвестным сквадом."""
+        internal_uuids = {squad.uuid for squad in remna_user.active_internal_squads or []}
+        external_uuid = remna_user.external_squad_uuid
+        if not internal_uuids and not external_uuid:
+            return
+
+        try:
+            catalog = await self.get_squad_catalog()
+        except Exception as exception:
+            logger.warning(f"Failed to check squad catalog: {exception}")
+            return
+
+        unknown = internal_uuids - catalog.internal_uuids
+        # Без списка внешних сквадов (ошибка при его получении) проверять нечего
+        has_external = bool(catalog.external_squads)
+        if external_uuid and has_external and external_uuid not in catalog.external_uuids:
+            unknown.add(external_uuid)
+
+        if unknown:
+            logger.info(f"Panel reported unknown squads {unknown}, refreshing squad catalog")
+            await self.invalidate_squad_catalog()
+
     async def _validate_and_get_squads(
         self,
         internal_squads: list[UUID] | None,
@@ -118,60 +194,86 @@ class RemnawaveService(BaseService):
         valid_external_squad_uuid: UUID | None = None
         
         try:
-            # Get all squads from panel
-            panel_squads = await self.remnawave.internal_squads.get_internal_squads()
-            
-            if not panel_squads or not panel_squads.internal_squads:
-                logger.warning("No internal squads found in panel")
-                return [], None
-            
-            # Create set of valid squad UUIDs for quick lookup
-            valid_squad_uuids = {squad.uuid for squad in panel_squads.internal_squads}
-            
-            # Validate internal_squads
-            if internal_squads:
-                for squad_uuid in internal_squads:
-                    if squad_uuid in valid_squad_uuids:
-                        valid_internal_squads.append(squad_uuid)
-                    else:
-                        logger.warning(
-                            f"Internal squad {squad_uuid} not found in panel, skipping"
-                        )
-            
-            # If no valid internal squads found, use first squad from panel as default
-            if not valid_internal_squads:
-                default_squad = panel_squads.internal_squads[0]
-                valid_internal_squads = [default_squad.uuid]
-                logger.info(
-                    f"No valid internal squads provided or found, using default: "
-                    f"{default_squad.name} ({default_squad.uuid})"
-                )
-            
-            # Validate external_squad if provided
-            if external_squad_uuid:
-                try:
-                    external_squads_response = await self.remnawave.external_squads.get_external_squads()
-                    if external_squads_response and external_squads_response.external_squads:
-                        valid_external_uuids = {squad.uuid for squad in external_squads_response.external_squads}
-                        if external_squad_uuid in valid_external_uuids:
-                            valid_external_squad_uuid = external_squad_uuid
-                            logger.debug(f"External squad {external_squad_uuid} validated successfully")
-                        else:
-                            logger.warning(
-                                f"External squad {external_squad_uuid} not found in panel, skipping"
-                            )
-                    else:
-                        logger.warning("No external squads found in panel")
-                except Exception as e:
-                    logger.warning(f"Failed to validate external squad: {e}")
-            
+            catalog = await self.get_squad_catalog()
         except Exception as e:
             logger.error(f"Failed to validate squads: {e}")
             # Return empty list on error - let the API handle it
             return [], None
+
+        # Каталог мог устареть: сквад только что создан в панели
+        if self._has_unknown_squads(catalog, internal_squads, external_squad_uuid):
+            catalog = await self._refresh_stale_squad_catalog(catalog)
+
+        if not catalog.internal_squads:
+            logger.warning("No internal squads found in panel")
+            return [], None
+        
+        # Validate internal_squads
+        valid_squad_uuids = catalog.internal_uuids
+        for squad_uuid in internal_squads or []:
+            if squad_uuid in valid_squad_uuids:
+                valid_internal_squads.append(squad_uuid)
+            else:
+                logger.warning(f"Internal squad {squad_uuid} not found in panel, skipping")
+        
+        # If no valid internal squads found, use first squad from panel as default
+        if not valid_internal_squads:
+            default_squad = catalog.internal_squads[0]
+            valid_internal_squads = [default_squad.uuid]
+            if internal_squads:
+                logger.warning(
+                    f"Internal squads {[str(s) for s in internal_squads]} not found in panel, "
+                    f"replaced with default: {default_squad.name} ({default_squad.uuid})"
+                )
+            else:
+                logger.info(
+                    f"No internal squads provided, using default: "
+                    f"{default_squad.name} ({default_squad.uuid})"
+                )
+        
+        # Validate external_squad if provided
+        if external_squad_uuid:
+            if not catalog.external_squads:
+                logger.warning("No external squads found in panel")
+            elif external_squad_uuid in catalog.external_uuids:
+                valid_external_squad_uuid = external_squad_uuid
+                logger.debug(f"External squad {external_squad_uuid} validated successfully")
+            else:
+                logger.warning(
+                    f"External squad {external_squad_uuid} not found in panel, skipping"
+                )
         
         return valid_internal_squads, valid_external_squad_uuid
 
+    async def _refresh_stale_squad_catalog(self, catalog: SquadCatalogDto) -> SquadCatalogDto:
+        # Сквады из старого снимка подписки (например, после переноса на другую панель)
+        # не должны обновлять каталог при каждом создании пользователя
+        now = time.monotonic()
+        if now - RemnawaveService._squad_catalog_refreshed_at < SQUAD_CATALOG_REFRESH_INTERVAL:
+            return catalog
+        RemnawaveService._squad_catalog_refreshed_at = now
+
+        try:
+            return await self.refresh_squad_catalog()
+        except Exception as e:
+            logger.warning(f"Failed to refresh squad catalog: {e}")
+            return catalog
+
+    @staticmethod
+    def _has_unknown_squads(
+        catalog: SquadCatalogDto,
+        internal_squads: list[UUID] | None,
+        external_squad_uuid: UUID | None,
+    ) -> bool:
+        if any(uuid not in catalog.internal_uuids for uuid in internal_squads or []):
+            return True
+        # Пустой список внешних сквадов означает, что их не удалось получить
+        return bool(
+            external_squad_uuid
+            and catalog.external_squads
+            and external_squad_uuid not in catalog.external_uuids
+        )
+
     async def create_user(
         self,
         user: UserDto,
@@ -1056,6 +1158,7 @@ class RemnawaveService(BaseService):
         )
 
         logger.info(f"Received event '{event}' for RemnaUser '{remna_user.telegram_id}'")
+        await self._check_squad_catalog(remna_user)
 
         if not remna_user.telegram_id:
             logger.debug(f"Skipping RemnaUser '{remna_user.username}': telegram_id is empty")
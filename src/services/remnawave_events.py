@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Final, Optional
+
+from loguru import logger
+from redis.exceptions import ResponseError
+from remnapy.controllers import WebhookUtility
+from remnapy.models.webhook import UserDto, WebhookPayloadDto
+
+from src.core.enums import RemnaUserEvent
+from src.core.storage.keys import (
+    RemnawaveEventIdKey,
+    RemnawaveEventsKey,
+    RemnawaveUserModifiedKey,
+    RemnawaveUserModifiedPendingKey,
+)
+
+from .base import BaseService
+
+EventHandler = Callable[[WebhookPayloadDto], Awaitable[None]]
+
+EVENTS_GROUP: Final[str] = "remnawave"
+EVENTS_MAXLEN: Final[int] = 100_000
+EVENTS_BATCH_SIZE: Final[int] = 100
+EVENTS_BLOCK_MS: Final[int] = 5_000
+# Сообщения, которые потребитель взял и не подтвердил за это время, забирают другие
+EVENTS_CLAIM_IDLE_MS: Final[int] = 5 * 60 * 1000
+EVENTS_CLAIM_INTERVAL: Final[float] = 60.0
+EVENTS_STATS_INTERVAL: Final[float] = 60.0
+EVENTS_LAG_WARNING: Final[float] = 60.0
+EVENTS_RECONNECT_DELAY: Final[int] = 5
+# Повтор того же вебхука панелью в течение этого времени отбрасывается
+EVENT_ID_TTL: Final[int] = 60 * 60
+# Окно, в течение которого user.modified одного пользователя схлопываются в последний
+MODIFIED_WINDOW: Final[float] = 2.0
+MODIFIED_TTL: Final[int] = 60 * 60
+
+
+class RemnawaveEventQueue(BaseService):
+    """Очередь вебхуков Remnawave в Redis Stream.
+
+    Эндпоинт только проверяет подпись и кладёт событие в стрим, обработка идёт
+    в фоне через группу потребителей. Повторы одного вебхука отбрасываются по
+    хэшу тела, а из серии `user.modified` одного пользователя обрабатывается
+    только последнее: в стриме остаётся одна запись, тело хранится отдельно и
+    перезаписывается до обработки.
+    """
+
+    async def push(self, body: str, payload: WebhookPayloadDto) -> bool:
+        digest = hashlib.sha256(body.encode()).hexdigest()
+        event_id_key = RemnawaveEventIdKey(digest=digest).pack()
+        if not await self.redis_client.set(event_id_key, 1, nx=True, ex=EVENT_ID_TTL):
+            logger.debug(f"Duplicate Remnawave webhook '{payload.event}' skipped")
+            return False
+
+        try:
+            await self._enqueue(body, payload)
+        except Exception:
+            # Иначе повтор вебхука панелью был бы отброшен как дубликат
+            await self.redis_client.delete(event_id_key)
+            raise
+        return True
+
+    async def _enqueue(self, body: str, payload: WebhookPayloadDto) -> None:
+        fields: dict[str, str]
+        pending_key: Optional[str] = None
+
+        if payload.event == RemnaUserEvent.MODIFIED and isinstance(payload.data, UserDto):
+            uuid = str(payload.data.uuid)
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(RemnawaveUserModifiedKey(uuid=uuid).pack(), body, ex=MODIFIED_TTL)
+                pipe.set(
+                    RemnawaveUserModifiedPendingKey(uuid=uuid).pack(),
+                    1,
+                    nx=True,
+                    ex=MODIFIED_TTL,
+                )
+                _, is_new = await pipe.execute()
+
+            if not is_new:
+                logger.debug(f"Remnawave event '{payload.event}' for '{uuid}' coalesced")
+                return
+            fields = {"uuid": uuid}
+            pending_key = RemnawaveUserModifiedPendingKey(uuid=uuid).pack()
+        else:
+            fields = {"body": body}
+
+        try:
+            await self.redis_client.xadd(
+                RemnawaveEventsKey().pack(),
+                fields,  # type: ignore[arg-type]
+                maxlen=EVENTS_MAXLEN,
+                approximate=True,
+            )
+        except Exception:
+            # Без записи в стриме следующие user.modified не должны схлопываться в неё
+            if pending_key:
+                await self.redis_client.delete(pending_key)
+            raise
+
+    async def consume(self, handler: EventHandler) -> None:
+        """Бесконечный цикл обработки событий, запускается фоновой задачей."""
+        stream = RemnawaveEventsKey().pack()
+        consumer = f"{socket.gethostname()}:{os.getpid()}"
+        loop = asyncio.get_running_loop()
+        claimed_at = 0.0
+        stats_at = loop.time()
+        has_group = False
+
+        while True:
+            try:
+                if not has_group:
+                    await self._ensure_group(stream)
+                    has_group = True
+
+                entries: list[tuple[bytes, dict[bytes, bytes]]] = []
+
+                if loop.time() - claimed_at >= EVENTS_CLAIM_INTERVAL:
+                    claimed_at = loop.time()
+                    response = await self.redis_client.xautoclaim(
+                        stream,
+                        EVENTS_GROUP,
+                        consumer,
+                        min_idle_time=EVENTS_CLAIM_IDLE_MS,
+                        count=EVENTS_BATCH_SIZE,
+                    )
+                    entries = [entry for entry in response[1] if entry[1]]
+
+                if not entries:
+                    response = await self.redis_client.xreadgroup(
+                        EVENTS_GROUP,
+                        consumer,
+                        {stream: ">"},
+                        count=EVENTS_BATCH_SIZE,
+                        block=EVENTS_BLOCK_MS,
+                    )
+                    entries = response[0][1] if response else []
+
+                for entry_id, fields in entries:
+                    await self._process(stream, entry_id, fields, handler)
+
+                if loop.time() - stats_at >= EVENTS_STATS_INTERVAL:
+                    stats_at = loop.time()
+                    await self._log_stats()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.exception(f"Remnawave events consumer failed: {exception}")
+                # Стрим или группа могли пропасть вместе с данными Redis
+                has_group = False
+                await asyncio.sleep(EVENTS_RECONNECT_DELAY)
+
+    async def get_stats(self) -> dict[str, Any]:
+        """Размер очереди и её отставание: сколько и как давно ждёт самое старое событие."""
+        stream = RemnawaveEventsKey().pack()
+        length = await self.redis_client.xlen(stream)
+        stats: dict[str, Any] = {"length": length, "pending": 0, "lag": 0, "lag_seconds": 0.0}
+        if not length:
+            return stats
+
+        try:
+            groups = await self.redis_client.xinfo_groups(stream)
+        except ResponseError:
+            groups = []
+        group = next((g for g in groups if _decode(g["name"]) == EVENTS_GROUP), None)
+
+        # Самое старое событие: первое неподтверждённое или первое ещё не выданное
+        oldest_id: Optional[str] = None
+        if group and group["pending"]:
+            stats["pending"] = group["pending"]
+            summary = await self.redis_client.xpending(stream, EVENTS_GROUP)
+            oldest_id = _decode(summary["min"])
+        else:
+            last_id = _decode(group["last-delivered-id"]) if group else "0-0"
+            entries = await self.redis_client.xrange(stream, min=f"({last_id}", count=1)
+            if entries:
+                oldest_id = _decode(entries[0][0])
+
+        stats["lag"] = (group.get("lag") or 0) if group else length
+        if oldest_id:
+            stats["lag_seconds"] = max(time.time() - _entry_time(oldest_id), 0.0)
+        return stats
+
+    async def _process(
+        self,
+        stream: str,
+        entry_id: bytes,
+        fields: dict[bytes, bytes],
+        handler: EventHandler,
+    ) -> None:
+        body: Optional[bytes] = fields.get(b"body")
+
+        if b"uuid" in fields:
+            uuid = fields[b"uuid"].decode()
+            delay = _entry_time(entry_id.decode()) + MODIFIED_WINDOW - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Сначала снимается отметка, иначе новое событие может потеряться
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(RemnawaveUserModifiedPendingKey(uuid=uuid).pack())
+                pipe.getdel(RemnawaveUserModifiedKey(uuid=uuid).pack())
+                _, body = await pipe.execute()
+
+        if body:
+            try:
+                payload = WebhookUtility.parse_webhook(
+                    body=body.decode(),
+                    headers={},
+                    webhook_secret="",
+                    validate=False,
+                )
+                if payload:
+                    await handler(payload)
+            except Exception as exception:
+                logger.exception(f"Failed to handle Remnawave event '{entry_id!r}': {exception}")
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(stream, EVENTS_GROUP, entry_id)
+            pipe.xdel(stream, entry_id)
+            await pipe.execute()
+
+    async def _ensure_group(self, stream: str) -> None:
+        try:
+            await self.redis_client.xgroup_create(stream, EVENTS_GROUP, id="0", mkstream=True)
+            logger.info(f"Created consumer group '{EVENTS_GROUP}' for '{stream}'")
+        except ResponseError as exception:
+            if "BUSYGROUP" not in str(exception):
+                raise
+
+    async def _log_stats(self) -> None:
+        stats = await self.get_stats()
+        if stats["lag_seconds"] >= EVENTS_LAG_WARNING:
+            logger.warning(f"Remnawave events queue is lagging: {stats}")
+        else:
+            logger.debug(f"Remnawave events queue: {stats}")
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _entry_time(entry_id: str) -> float:
+    return int(entry_id.split("-", 1)[0]) / 1000
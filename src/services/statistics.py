@@ -0,0 +1,264 @@
+from collections import defaultdict
+from typing import Any, AsyncIterator, Sequence
+
+from aiogram import Bot
+from fluentogram import TranslatorHub
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.config import AppConfig
+from src.core.constants import TIME_1M
+from src.core.enums import Currency, PaymentGatewayType, PromocodeRewardType
+from src.core.storage.key_builder import StorageKey
+from src.core.storage.keys import (
+    StatisticsConvertedUsersKey,
+    StatisticsPayersKey,
+    StatisticsTrialUsersKey,
+)
+from src.core.utils.time import datetime_now
+from src.infrastructure.database import UnitOfWork
+from src.infrastructure.database.models.dto import (
+    GatewayStatisticsDto,
+    PlansStatisticsDto,
+    PlanStatisticsDto,
+    PromocodesStatisticsDto,
+    ReferralsStatisticsDto,
+    SubscriptionsStatisticsDto,
+    TransactionsStatisticsDto,
+    UsersStatisticsDto,
+)
+from src.infrastructure.redis import RedisRepository, StatisticsRollups, redis_cache
+from src.infrastructure.redis.rollups import (
+    ROLLUP_RETENTION_DAYS,
+    TOTAL_BUCKET,
+    Counters,
+    currency_field,
+    gateway_field,
+    plan_field,
+    recent_buckets,
+)
+
+from .base import BaseService
+
+
+class StatisticsService(BaseService):
+    """Статистика панели управления.
+
+    Накопительные показатели (регистрации, транзакции, доход, уникальные
+    плательщики) читаются из счётчиков `StatisticsRollups`, текущие срезы
+    (блокировки, активные подписки) считаются запросами к БД.
+    """
+
+    uow: UnitOfWork
+    rollups: StatisticsRollups
+
+    def __init__(
+        self,
+        config: AppConfig,
+        bot: Bot,
+        redis_client: Redis,
+        redis_repository: RedisRepository,
+        translator_hub: TranslatorHub,
+        #
+        uow: UnitOfWork,
+    ) -> None:
+        super().__init__(config, bot, redis_client, redis_repository, translator_hub)
+        self.uow = uow
+        self.rollups = StatisticsRollups(redis_client)
+
+    @redis_cache(prefix="statistics_users", ttl=TIME_1M)
+    async def get_users_statistics(self) -> UsersStatisticsDto:
+        await self._ensure_rollups()
+        users = await self.uow.repository.statistics.get_users_statistics()
+        windows = await self.rollups.read_windows()
+
+        logger.debug("Calculated users statistics")
+        return UsersStatisticsDto(
+            **users._mapping,
+            new_users_daily=int(windows["daily"].get("new_users", 0)),
+            new_users_weekly=int(windows["weekly"].get("new_users", 0)),
+            new_users_monthly=int(windows["monthly"].get("new_users", 0)),
+            paying_users=await self.rollups.count_unique(StatisticsPayersKey, [TOTAL_BUCKET]),
+            trial_users=await self.rollups.count_unique(StatisticsTrialUsersKey, [TOTAL_BUCKET]),
+            converted_from_trial=await self.rollups.count_unique(
+                StatisticsConvertedUsersKey, [TOTAL_BUCKET]
+            ),
+        )
+
+    @redis_cache(prefix="statistics_transactions", ttl=TIME_1M)
+    async def get_transactions_statistics(self) -> TransactionsStatisticsDto:
+        await self._ensure_rollups()
+        windows = await self.rollups.read_windows()
+        total = windows["total"]
+        gateways: list[GatewayStatisticsDto] = []
+
+        for gateway_type in PaymentGatewayType:
+            if gateway_field(gateway_type, "completed") not in total:
+                continue
+
+            gateways.append(
+                GatewayStatisticsDto(
+                    gateway_type=gateway_type,
+                    total=total.get(gateway_field(gateway_type, "total"), 0),
+                    daily=windows["daily"].get(gateway_field(gateway_type, "total"), 0),
+                    weekly=windows["weekly"].get(gateway_field(gateway_type, "total"), 0),
+                    monthly=windows["monthly"].get(gateway_field(gateway_type, "total"), 0),
+                    discount=total.get(gateway_field(gateway_type, "discount"), 0),
+                    completed=int(total.get(gateway_field(gateway_type, "completed"), 0)),
+                    paid_count=int(total.get(gateway_field(gateway_type, "paid_count"), 0)),
+                )
+            )
+
+        logger.debug(f"Calculated transactions statistics for '{len(gateways)}' gateways")
+        return TransactionsStatisticsDto(
+            total_transactions=int(total.get("transactions", 0)),
+            completed_transactions=int(total.get("completed_transactions", 0)),
+            free_transactions=int(total.get("free_transactions", 0)),
+            gateways=gateways,
+        )
+
+    @redis_cache(prefix="statistics_subscriptions", ttl=TIME_1M)
+    async def get_subscriptions_statistics(self) -> SubscriptionsStatisticsDto:
+        row = await self.uow.repository.statistics.get_subscriptions_statistics(
+            now=datetime_now()
+        )
+        logger.debug("Calculated subscriptions statistics")
+        return SubscriptionsStatisticsDto(**row._mapping)
+
+    @redis_cache(prefix="statistics_plans", ttl=TIME_1M)
+    async def get_plans_statistics(self) -> PlansStatisticsDto:
+        repository = self.uow.repository.statistics
+        plans: dict[int, PlanStatisticsDto] = {}
+
+        for row in await repository.get_plans_subscriptions():
+            plans[row.plan_id] = PlanStatisticsDto(
+                plan_id=row.plan_id,
+                total_subscriptions=row.total_subscriptions,
+                active_subscriptions=row.active_subscriptions,
+            )
+
+        durations: dict[int, tuple[int, int]] = {}
+        for row in await repository.get_plans_durations():
+            _, best_count = durations.get(row.plan_id, (0, 0))
+            if row.count > best_count:
+                durations[row.plan_id] = (row.duration, row.count)
+
+        for plan_id, (duration, _) in durations.items():
+            plans.setdefault(plan_id, PlanStatisticsDto(plan_id=plan_id))
+            plans[plan_id].popular_duration = duration
+
+        await self._ensure_rollups()
+        total = (await self.rollups.read_windows())["total"]
+
+        for plan_id, plan in plans.items():
+            for currency in Currency:
+                income = total.get(plan_field(plan_id, f"income:{currency}"))
+                if income is not None:
+                    plan.income[currency] = income
+
+        logger.debug(f"Calculated statistics for '{len(plans)}' plans")
+        return PlansStatisticsDto(plans=list(plans.values()))
+
+    @redis_cache(prefix="statistics_promocodes", ttl=TIME_1M)
+    async def get_promocodes_statistics(self) -> PromocodesStatisticsDto:
+        rows = await self.uow.repository.statistics.get_promocodes_activations()
+        statistics = PromocodesStatisticsDto()
+        most_popular_activations = -1
+
+        for row in rows:
+            statistics.total_promo_activations += row.activations
+
+            if row.activations > most_popular_activations:
+                most_popular_activations = row.activations
+                statistics.most_popular_promo = row.code
+
+            reward_type = PromocodeRewardType(row.reward_type)
+            statistics.rewards[reward_type] = (
+                statistics.rewards.get(reward_type, 0) + (row.reward or 0) * row.activations
+            )
+
+        logger.debug(f"Calculated statistics for '{len(rows)}' promocodes")
+        return statistics
+
+    @redis_cache(prefix="statistics_referrals", ttl=TIME_1M)
+    async def get_referrals_statistics(self) -> ReferralsStatisticsDto:
+        repository = self.uow.repository.statistics
+
+        referrals = await repository.get_referrals_statistics()
+        rewards = await repository.get_referral_rewards_statistics()
+
+        logger.debug("Calculated referrals statistics")
+        return ReferralsStatisticsDto(**referrals._mapping, **rewards._mapping)
+
+    async def reconcile_rollups(self) -> None:
+        """Пересчитывает счётчики статистики из БД и заменяет ими данные в Redis."""
+        repository = self.uow.repository.statistics
+        buckets = recent_buckets(ROLLUP_RETENTION_DAYS)
+        counters: dict[str, Counters] = {bucket: defaultdict(float) for bucket in buckets}
+        counters[TOTAL_BUCKET] = defaultdict(float, new_users=0)
+
+        def add(day: Any, field: str, value: float) -> None:
+            counters[TOTAL_BUCKET][field] += value
+            if str(day) in counters:
+                counters[str(day)][field] += value
+
+        for row in await repository.get_daily_new_users():
+            add(row.day, "new_users", row.new_users)
+
+        for row in await repository.get_daily_transactions():
+            add(row.day, "transactions", row.transactions)
+            add(row.day, "free_transactions", row.free_transactions)
+
+        for row in await repository.get_daily_payments():
+            gateway_type = PaymentGatewayType(row.gateway_type)
+            currency = Currency(row.currency)
+
+            add(row.day, "completed_transactions", row.completed)
+            add(row.day, gateway_field(gateway_type, "total"), row.total)
+            add(row.day, gateway_field(gateway_type, "discount"), row.discount)
+            add(row.day, gateway_field(gateway_type, "completed"), row.completed)
+            add(row.day, gateway_field(gateway_type, "paid_count"), row.paid_count)
+            add(row.day, currency_field(currency), row.total)
+
+            if row.plan_id:
+                add(row.day, plan_field(row.plan_id, "sales"), row.completed)
+                add(row.day, plan_field(row.plan_id, f"income:{currency}"), row.total)
+
+        await self.rollups.replace_counters(
+            {bucket: dict(values) for bucket, values in counters.items()}
+        )
+
+        unique_sources: dict[type[StorageKey], AsyncIterator[Sequence[Any]]] = {
+            StatisticsPayersKey: repository.stream_daily_payers(),
+            StatisticsTrialUsersKey: repository.stream_daily_trial_users(),
+            StatisticsConvertedUsersKey: repository.stream_daily_converted_users(),
+        }
+
+        for key_type, partitions in unique_sources.items():
+            await self._rebuild_unique(key_type, partitions, buckets)
+
+        logger.info(f"Reconciled statistics rollups for '{len(buckets)}' days")
+
+    async def _rebuild_unique(
+        self,
+        key_type: type[StorageKey],
+        partitions: AsyncIterator[Sequence[Any]],
+        buckets: list[str],
+    ) -> None:
+        """Пересобирает множества уникальных пользователей одного вида."""
+        days = set(buckets)
+
+        async for partition in partitions:
+            values_by_bucket: dict[str, list[int]] = defaultdict(list)
+            for row in partition:
+                values_by_bucket[TOTAL_BUCKET].append(row.telegram_id)
+                if str(row.day) in days:
+                    values_by_bucket[str(row.day)].append(row.telegram_id)
+            await self.rollups.add_unique_for_rebuild(key_type, values_by_bucket)
+
+        await self.rollups.commit_unique_rebuild(key_type, [TOTAL_BUCKET, *buckets])
+
+    async def _ensure_rollups(self) -> None:
+        # Первое обращение после деплоя или очистки Redis: заполняем счётчики из БД
+        if not await self.rollups.is_ready():
+            await self.reconcile_rollups()
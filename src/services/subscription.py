@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional, TypeVar, Union
+from typing import Any, Final, Iterable, Optional, TypeVar, Union
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
@@ -22,18 +22,21 @@ from src.infrastructure.database.models.dto import (
     UserDto,
 )
 from src.infrastructure.database.models.sql import Subscription
-from src.infrastructure.redis import RedisRepository
-from src.infrastructure.redis.cache import redis_cache
+from src.infrastructure.redis import RedisRepository, StatisticsRollups
+from src.infrastructure.redis.cache import delete_cache_keys, redis_cache
 from src.services.user import UserService
 
 from .base import BaseService
 
 T = TypeVar("T", SubscriptionDto, RemnaSubscriptionDto)
 
+CURRENT_CHUNK_SIZE: Final[int] = 1000
+
 
 class SubscriptionService(BaseService):
     uow: UnitOfWork
     user_service: UserService
+    rollups: StatisticsRollups
 
     def __init__(
         self,
@@ -49,10 +52,12 @@ class SubscriptionService(BaseService):
         super().__init__(config, bot, redis_client, redis_repository, translator_hub)
         self.uow = uow
         self.user_service = user_service
+        self.rollups = StatisticsRollups(redis_client)
 
     async def create(self, user: UserDto, subscription: SubscriptionDto) -> SubscriptionDto:
         data = subscription.model_dump(exclude={"user"})
         data["plan"] = subscription.plan.model_dump(mode="json")
+        had_trial = not subscription.is_trial and await self.has_used_trial(user.telegram_id)
 
         db_subscription = Subscription(**data, user_telegram_id=user.telegram_id)
         db_created_subscription = await self.uow.repository.subscriptions.create(db_subscription)
@@ -63,6 +68,12 @@ class SubscriptionService(BaseService):
         )
         await self.uow.commit()
 
+        await self.rollups.record_subscription(
+            telegram_id=user.telegram_id,
+            is_trial=subscription.is_trial,
+            had_trial=had_trial,
+            created_at=db_created_subscription.created_at,
+        )
         await self.clear_subscription_cache(db_subscription.id, db_subscription.user_telegram_id)
         logger.info(f"Created subscription '{db_subscription.id}' for user '{user.telegram_id}'")
         return SubscriptionDto.from_model(db_created_subscription)  # type: ignore[return-value]
@@ -80,29 +91,37 @@ class SubscriptionService(BaseService):
 
     @redis_cache(prefix="get_current_subscription", ttl=TIME_1M)
     async def get_current(self, telegram_id: int) -> Optional[SubscriptionDto]:
-        db_user = await self.uow.repository.users.get(telegram_id)
+        db_subscription = await self.uow.repository.subscriptions.get_current(telegram_id)
 
-        if not db_user or not db_user.current_subscription_id:
+        if not db_subscription:
             logger.debug(
                 f"Current subscription check: User '{telegram_id}' has no active subscription"
             )
             return None
 
-        subscription_id = db_user.current_subscription_id
-        db_active_subscription = await self.uow.repository.subscriptions.get(subscription_id)
+        logger.debug(
+            f"Current subscription check: Subscription '{db_subscription.id}' "
+            f"retrieved for user '{telegram_id}'"
+        )
+        return SubscriptionDto.from_model(db_subscription)
 
-        if db_active_subscription:
-            logger.debug(
-                f"Current subscription check: Subscription '{subscription_id}' "
-                f"retrieved for user '{telegram_id}'"
-            )
-        else:
-            logger.warning(
-                f"User '{telegram_id}' linked to subscription ID '{subscription_id}', "
-                f"but subscription object was not found"
+    async def get_current_many(self, telegram_ids: Iterable[int]) -> dict[int, SubscriptionDto]:
+        """Текущие подписки пользователей по telegram_id, без подписки в словарь не попадают."""
+        ids = list(dict.fromkeys(telegram_ids))
+        subscriptions: dict[int, SubscriptionDto] = {}
+
+        for start in range(0, len(ids), CURRENT_CHUNK_SIZE):
+            chunk = ids[start : start + CURRENT_CHUNK_SIZE]
+            rows = await self.uow.repository.subscriptions.get_current_many(chunk)
+            subscriptions.update(
+                (telegram_id, SubscriptionDto.from_model(db_subscription))  # type: ignore[misc]
+                for telegram_id, db_subscription in rows
             )
 
-        return SubscriptionDto.from_model(db_active_subscription)
+        logger.debug(
+            f"Retrieved '{len(subscriptions)}' current subscriptions for '{len(ids)}' users"
+        )
+        return subscriptions
 
     async def get_all_by_user(self, telegram_id: int) -> list[SubscriptionDto]:
         db_subscriptions = await self.uow.repository.subscriptions.get_all_by_user(telegram_id)
@@ -142,6 +161,73 @@ class SubscriptionService(BaseService):
 
         return SubscriptionDto.from_model(db_updated_subscription)
 
+    async def update_many(self, subscriptions: dict[int, SubscriptionDto]) -> int:
+        """Сохраняет изменённые поля подписок (telegram_id -> подписка) одной транзакцией."""
+        values: list[dict[str, Any]] = []
+        cache_keys: list[str] = []
+
+        for telegram_id, subscription in subscriptions.items():
+            data = subscription.changed_data.copy()
+            if subscription.plan.changed_data or "plan" in data:
+                data["plan"] = subscription.plan.model_dump(mode="json")
+            if not data:
+                continue
+
+            values.append({"id": subscription.id, **data})
+            cache_keys += self._get_cache_keys(subscription.id, telegram_id)  # type: ignore[arg-type]
+
+        if not values:
+            return 0
+
+        await self.uow.repository.subscriptions.update_many(values)
+        await self.uow.commit()
+        await delete_cache_keys(self.redis_client, *cache_keys)
+        logger.info(f"Updated '{len(values)}' subscriptions in bulk")
+        return len(values)
+
+    async def get_all_by_plan(self, plan_id: int) -> list[SubscriptionDto]:
+        db_subscriptions = await self.uow.repository.subscriptions.filter_by_plan_id(plan_id)
+        logger.debug(f"Retrieved '{len(db_subscriptions)}' subscriptions for plan '{plan_id}'")
+        return SubscriptionDto.from_model_list(db_subscriptions)
+
+    async def apply_plan(self, plan: PlanDto) -> int:
+        """Переносит лимиты, теги и сквады плана во все его активные подписки."""
+        data: dict[str, Any] = {
+            "internal_squads": list(plan.internal_squads or []),
+            "traffic_limit": plan.traffic_limit,
+            "device_limit": plan.device_limit,
+            "tag": plan.tag,
+            "traffic_limit_strategy": plan.traffic_limit_strategy,
+        }
+        if plan.external_squad:
+            data["external_squad"] = list(plan.external_squad)
+
+        plan_data = plan.model_dump(mode="json", include=set(data))
+        rows = await self.uow.repository.subscriptions.apply_plan(
+            plan.id,  # type: ignore[arg-type]
+            plan_data,
+            **data,
+        )
+        await self.uow.commit()
+
+        cache_keys = [
+            key
+            for subscription_id, telegram_id in rows
+            for key in self._get_cache_keys(subscription_id, telegram_id)
+        ]
+        await delete_cache_keys(self.redis_client, *cache_keys)
+        logger.info(f"Applied plan '{plan.id}' to '{len(rows)}' active subscriptions")
+        return len(rows)
+
+    async def get_current_index(self) -> dict[int, Optional[SubscriptionDto]]:
+        """Текущие подписки всех пользователей по telegram_id одним запросом."""
+        rows = await self.uow.repository.subscriptions.get_current_index()
+        logger.debug(f"Retrieved current subscriptions index for '{len(rows)}' users")
+        return {
+            telegram_id: SubscriptionDto.from_model(subscription)
+            for telegram_id, subscription in rows
+        }
+
     @redis_cache(prefix="has_used_trial", ttl=TIME_10M)
     async def has_used_trial(self, user_telegram_id: int) -> bool:
         """
@@ -167,6 +253,14 @@ class SubscriptionService(BaseService):
         await self.redis_client.delete(*list_cache_keys_to_invalidate)
         logger.debug(f"Cache for subscription '{subscription_id}' invalidated")
 
+    @staticmethod
+    def _get_cache_keys(subscription_id: int, telegram_id: int) -> list[str]:
+        return [
+            build_key("cache", "get_subscription", subscription_id),
+            build_key("cache", "get_current_subscription", telegram_id),
+            build_key("cache", "get_user", telegram_id),
+        ]
+
     @staticmethod
     def subscriptions_match(
         bot_subscription: Optional[SubscriptionDto],
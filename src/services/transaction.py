@@ -11,13 +11,14 @@ from src.core.enums import TransactionStatus
 from src.infrastructure.database import UnitOfWork
 from src.infrastructure.database.models.dto import TransactionDto, UserDto
 from src.infrastructure.database.models.sql import Transaction
-from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis import RedisRepository, StatisticsRollups
 
 from .base import BaseService
 
 
 class TransactionService(BaseService):
     uow: UnitOfWork
+    rollups: StatisticsRollups
 
     def __init__(
         self,
@@ -31,6 +32,7 @@ class TransactionService(BaseService):
     ) -> None:
         super().__init__(config, bot, redis_client, redis_repository, translator_hub)
         self.uow = uow
+        self.rollups = StatisticsRollups(redis_client)
 
     async def create(self, user: UserDto, transaction: TransactionDto) -> TransactionDto:
         data = transaction.model_dump(exclude={"user"})
@@ -40,6 +42,11 @@ class TransactionService(BaseService):
         db_transaction = Transaction(**data, user_telegram_id=user.telegram_id)
         db_created_transaction = await self.uow.repository.transactions.create(db_transaction)
         await self.uow.commit()
+
+        await self.rollups.record_transaction(
+            is_free=transaction.pricing.is_free,
+            created_at=db_created_transaction.created_at,
+        )
         logger.info(f"Created transaction '{transaction.payment_id}' for user '{user.telegram_id}'")
         return TransactionDto.from_model(db_created_transaction)  # type: ignore[return-value]
 
@@ -76,6 +83,17 @@ class TransactionService(BaseService):
 
         if db_updated_transaction:
             logger.info(f"Updated transaction '{transaction.payment_id}' successfully")
+
+            if transaction.changed_data.get("status") == TransactionStatus.COMPLETED:
+                await self.rollups.record_payment(
+                    telegram_id=db_updated_transaction.user_telegram_id,
+                    gateway_type=transaction.gateway_type,
+                    currency=transaction.currency,
+                    final_amount=float(transaction.pricing.final_amount),
+                    original_amount=float(transaction.pricing.original_amount),
+                    plan_id=transaction.plan.id,
+                    created_at=db_updated_transaction.created_at,
+                )
         else:
             logger.warning(
                 f"Attempted to update transaction '{transaction.payment_id}', "
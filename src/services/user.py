@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Final, Iterable, Optional, Union
 
 from aiogram import Bot
 from aiogram.types import Message
@@ -6,32 +6,44 @@ from aiogram.types import User as AiogramUser
 from fluentogram import TranslatorHub
 from loguru import logger
 from redis.asyncio import Redis
+from sqlalchemy.exc import IntegrityError
 
 from src.core.config import AppConfig
 from src.core.constants import (
     RECENT_ACTIVITY_MAX_COUNT,
     RECENT_REGISTERED_MAX_COUNT,
     DFC_SHOP_PREFIX,
+    TIME_1M,
     TIME_5M,
     TIME_10M,
 )
-from src.core.enums import Locale, UserRole
+from src.core.enums import BalanceEntryReason, Locale, UserRole
 from src.core.storage.key_builder import StorageKey, build_key
 from src.core.storage.keys import RecentActivityUsersKey
 from src.core.utils.formatters import format_user_name
 from src.core.utils.generators import generate_referral_code
+from src.core.utils.iterables import chunked
 from src.core.utils.types import RemnaUserDto
 from src.infrastructure.database import UnitOfWork
 from src.infrastructure.database.models.dto import UserDto, SettingsDto
 from src.infrastructure.database.models.dto.user import BaseUserDto
 from src.infrastructure.database.models.sql import User
-from src.infrastructure.redis import RedisRepository, redis_cache
+from src.infrastructure.redis import (
+    RedisRepository,
+    StatisticsRollups,
+    delete_cache_keys,
+    invalidate_cache_dependents,
+    redis_cache,
+)
 
 from .base import BaseService
 
+RECIPIENTS_CHUNK_SIZE: Final[int] = 1000
+
 
 class UserService(BaseService):
     uow: UnitOfWork
+    rollups: StatisticsRollups
 
     def __init__(
         self,
@@ -45,6 +57,7 @@ class UserService(BaseService):
     ) -> None:
         super().__init__(config, bot, redis_client, redis_repository, translator_hub)
         self.uow = uow
+        self.rollups = StatisticsRollups(redis_client)
 
     async def create(self, aiogram_user: AiogramUser, settings: Optional[SettingsDto] = None) -> UserDto:
         # Определяем язык пользователя
@@ -89,7 +102,9 @@ class UserService(BaseService):
         db_created_user = await self.uow.repository.users.create(db_user)
         await self.uow.commit()
 
+        await self.rollups.record_new_user(db_created_user.created_at)
         await self.clear_user_cache(user.telegram_id)
+        await self._clear_list_caches()
         logger.info(f"Created new user '{user.telegram_id}' with language '{language.value}'")
         return UserDto.from_model(db_created_user)  # type: ignore[return-value]
 
@@ -125,11 +140,13 @@ class UserService(BaseService):
         db_created_user = await self.uow.repository.users.create(db_user)
         await self.uow.commit()
 
+        await self.rollups.record_new_user(db_created_user.created_at)
         await self.clear_user_cache(user.telegram_id)
+        await self._clear_list_caches()
         logger.info(f"Created new user '{user.telegram_id}' from panel")
         return UserDto.from_model(db_created_user)  # type: ignore[return-value]
 
-    @redis_cache(prefix="get_user", ttl=TIME_5M)
+    @redis_cache(prefix="get_user", ttl=TIME_5M, local_ttl=TIME_1M)
     async def get(self, telegram_id: int) -> Optional[UserDto]:
         db_user = await self.uow.repository.users.get(telegram_id)
 
@@ -159,13 +176,14 @@ class UserService(BaseService):
             return None
 
     async def update(self, user: UserDto) -> Optional[UserDto]:
+        changed_data = user.prepare_changed_data()
         db_updated_user = await self.uow.repository.users.update(
             telegram_id=user.telegram_id,
-            **user.prepare_changed_data(),
+            **changed_data,
         )
 
         if db_updated_user:
-            await self.clear_user_cache(db_updated_user.telegram_id)
+            await self.clear_user_cache(db_updated_user.telegram_id, changed_data)
             logger.info(f"Updated user '{user.telegram_id}' successfully")
         else:
             logger.warning(
@@ -233,6 +251,7 @@ class UserService(BaseService):
 
         if result:
             await self.clear_user_cache(user.telegram_id)
+            await self._clear_list_caches()
             await self._remove_from_recent_activity(user.telegram_id)
 
         logger.info(f"Deleted user '{user.telegram_id}': '{result}'")
@@ -259,37 +278,78 @@ class UserService(BaseService):
             return UserDto.from_model(subscription.user)
         return None
 
-    @redis_cache(prefix="users_count", ttl=TIME_10M)
+    @redis_cache(prefix="users_count", ttl=TIME_10M, depends_on=("user",))
     async def count(self) -> int:
         count = await self.uow.repository.users.count()
         logger.debug(f"Total users count: '{count}'")
         return count
 
-    @redis_cache(prefix="get_by_role", ttl=TIME_10M)
+    @redis_cache(prefix="get_by_role", ttl=TIME_10M, depends_on=("user.role",))
     async def get_by_role(self, role: UserRole) -> list[UserDto]:
         db_users = await self.uow.repository.users.filter_by_role(role)
         logger.debug(f"Retrieved '{len(db_users)}' users with role '{role}'")
         return UserDto.from_model_list(db_users)
 
-    @redis_cache(prefix="get_blocked_users", ttl=TIME_10M)
+    async def get_recipients(self, telegram_ids: Iterable[int]) -> list[BaseUserDto]:
+        """Получатели адресных уведомлений: только поля для отправки, без связей.
+
+        Заблокированные (админом или заблокировавшие бота) пропускаются.
+        """
+        recipients: list[BaseUserDto] = []
+
+        for chunk in chunked(list(dict.fromkeys(telegram_ids)), RECIPIENTS_CHUNK_SIZE):
+            rows = await self.uow.repository.users.get_recipients(
+                User.telegram_id.in_(chunk),
+                User.is_blocked.is_(False),
+                User.is_bot_blocked.is_(False),
+                limit=len(chunk),
+            )
+            recipients.extend(
+                BaseUserDto(telegram_id=row.telegram_id, name=row.name, language=row.language)
+                for row in rows
+            )
+
+        logger.debug(f"Resolved '{len(recipients)}' notification recipients")
+        return recipients
+
+    @redis_cache(
+        prefix="get_blocked_users",
+        ttl=TIME_10M,
+        depends_on=("user.is_blocked",),
+    )
     async def get_blocked_users(self) -> list[UserDto]:
         db_users = await self.uow.repository.users.filter_by_blocked(blocked=True)
         logger.debug(f"Retrieved '{len(db_users)}' blocked users")
         return UserDto.from_model_list(list(reversed(db_users)))
 
-    @redis_cache(prefix="get_all", ttl=TIME_10M)
     async def get_all(self) -> list[UserDto]:
         db_users = await self.uow.repository.users.get_all()
         logger.debug(f"Retrieved '{len(db_users)}' users")
         return UserDto.from_model_list(db_users)
 
+    async def get_page(
+        self,
+        limit: int,
+        before_telegram_id: Optional[int] = None,
+    ) -> list[UserDto]:
+        db_users = await self.uow.repository.users.get_page(limit, before_telegram_id)
+        logger.debug(f"Retrieved page of '{len(db_users)}' users before '{before_telegram_id}'")
+        return UserDto.from_model_list(db_users)
+
+    async def get_page_cursor(
+        self,
+        skip: int,
+        before_telegram_id: Optional[int] = None,
+    ) -> Optional[int]:
+        return await self.uow.repository.users.get_page_cursor(skip, before_telegram_id)
+
     async def set_block(self, user: UserDto, blocked: bool) -> None:
         user.is_blocked = blocked
         await self.uow.repository.users.update(
             user.telegram_id,
             **user.prepare_changed_data(),
         )
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, ["is_blocked"])
         logger.info(f"Set block={blocked} for user '{user.telegram_id}'")
 
     async def set_bot_blocked(self, user: UserDto, blocked: bool) -> None:
@@ -298,7 +358,7 @@ class UserService(BaseService):
             user.telegram_id,
             **user.prepare_changed_data(),
         )
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, ["is_bot_blocked"])
         logger.info(f"Set bot_blocked={blocked} for user '{user.telegram_id}'")
 
     async def set_role(self, user: UserDto, role: UserRole) -> None:
@@ -307,7 +367,7 @@ class UserService(BaseService):
             user.telegram_id,
             **user.prepare_changed_data(),
         )
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, ["role"])
         logger.info(f"Set role='{role.name}' for user '{user.telegram_id}'")
 
     #
@@ -424,87 +484,54 @@ class UserService(BaseService):
         await self.clear_user_cache(telegram_id)
         logger.info(f"Delete current subscription for user '{telegram_id}'")
 
-    async def add_to_balance(self, user: Union[BaseUserDto, UserDto], amount: int) -> None:
-        """Пополнить баланс пользователя"""
-        await self.uow.repository.users.update(
-            telegram_id=user.telegram_id,
-            balance=user.balance + amount,
-        )
-        await self.uow.commit()
-        await self.clear_user_cache(user.telegram_id)
-        logger.info(f"Add '{amount}' to balance for user '{user.telegram_id}'")
-
-    async def subtract_from_balance(self, user: Union[BaseUserDto, UserDto], amount: int) -> bool:
-        """Вычесть из баланса пользователя. Возвращает True если успешно"""
-        if user.balance < amount:
-            logger.warning(f"Insufficient balance for user '{user.telegram_id}': {user.balance} < {amount}")
-            return False
-        
-        await self.uow.repository.users.update(
-            telegram_id=user.telegram_id,
-            balance=user.balance - amount,
-        )
-        await self.uow.commit()
-        await self.clear_user_cache(user.telegram_id)
-        logger.info(f"Subtract '{amount}' from balance for user '{user.telegram_id}'")
-        return True
-
-    async def subtract_from_combined_balance(
+    async def add_to_balance(
         self,
         user: Union[BaseUserDto, UserDto],
         amount: int,
-        referral_balance: int,
-        is_combined: bool
-    ) -> tuple[int, int]:
-        """
-        Вычесть сумму из баланса с учётом режима баланса.
-        В COMBINED режиме списывает сначала с основного баланса, потом с бонусного.
-        В SEPARATE режиме списывает только с основного баланса.
-        
-        Args:
-            user: Пользователь
-            amount: Сумма для списания
-            referral_balance: Доступный бонусный баланс
-            is_combined: Режим COMBINED или нет
-            
-        Returns:
-            tuple[int, int]: (списано_с_основного, списано_с_бонусного)
-            
-        Raises:
-            ValueError: Если недостаточно средств
+        reason: BalanceEntryReason,
+        idempotency_key: Optional[str] = None,
+    ) -> Optional[int]:
+        """Изменить баланс на amount атомарно, с записью в журнал баланса.
+
+        Отрицательная сумма списывается, только если хватает средств.
+        Возвращает новый баланс или None, если операция не проведена.
         """
-        from src.services.referral import ReferralService
-        from src.core.enums import ReferralRewardType
-        
-        # Вычисляем доступный баланс
-        available = user.balance + referral_balance if is_combined else user.balance
-        
-        if available < amount:
-            raise ValueError(
-                f"Insufficient balance for user '{user.telegram_id}': "
-                f"available={available}, required={amount}"
-            )
-        
-        # Списываем сначала с основного баланса
-        from_main = min(user.balance, amount)
-        from_bonus = amount - from_main
-        
-        # Обновляем основной баланс
-        if from_main > 0:
-            await self.uow.repository.users.update(
-                telegram_id=user.telegram_id,
-                balance=user.balance - from_main,
-            )
+        try:
+            # Точка сохранения: дубликат откатывает только запись журнала,
+            # а не остальную работу вызывающего кода в этой транзакции
+            async with self.uow.session.begin_nested():  # type: ignore[union-attr]
+                entry = await self.uow.repository.balance_entries.apply(
+                    telegram_id=user.telegram_id,
+                    amount=amount,
+                    reason=reason,
+                    idempotency_key=idempotency_key,
+                )
+        except IntegrityError:
+            # Та же операция параллельно проведена другим процессом
+            entry = None
+        else:
             await self.uow.commit()
-        
-        logger.info(
-            f"Subtracted '{amount}' from user '{user.telegram_id}': "
-            f"{from_main} from main, {from_bonus} from bonus (combined={is_combined})"
-        )
-        
+
+        if entry is None:
+            logger.warning(
+                f"Balance change '{amount}' ({reason}) for user '{user.telegram_id}' not applied: "
+                f"insufficient balance or duplicate operation '{idempotency_key}'"
+            )
+            return None
+
         await self.clear_user_cache(user.telegram_id)
-        
-        return (from_main, from_bonus)
+        logger.info(f"Add '{amount}' ({reason}) to balance for user '{user.telegram_id}'")
+        return entry.balance_after
+
+    async def subtract_from_balance(
+        self,
+        user: Union[BaseUserDto, UserDto],
+        amount: int,
+        reason: BalanceEntryReason,
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Вычесть из баланса пользователя. Возвращает True если успешно"""
+        return await self.add_to_balance(user, -amount, reason, idempotency_key) is not None
 
     async def get_balance(self, telegram_id: int) -> int:
         """Получить текущий баланс пользователя"""
@@ -542,30 +569,29 @@ class UserService(BaseService):
 
     #
 
-    async def clear_user_cache(self, telegram_id: int) -> None:
+    async def clear_user_cache(self, telegram_id: int, changed_fields: Iterable[str] = ()) -> None:
+        """Сбрасывает кэш пользователя и списки, зависящие от изменённых полей."""
         user_cache_key: str = build_key("cache", "get_user", telegram_id)
-        await self.redis_client.delete(user_cache_key)
-        await self._clear_list_caches()
-        logger.debug(f"User cache for '{telegram_id}' invalidated")
+        await delete_cache_keys(self.redis_client, user_cache_key)
 
-    async def _clear_list_caches(self) -> None:
-        list_cache_keys_to_invalidate = [
-            build_key("cache", "get_blocked_users"),
-            build_key("cache", "count"),
-            build_key("cache", "get_all"),
-        ]
+        changed_fields = list(changed_fields)
+        if changed_fields:
+            await invalidate_cache_dependents(self.redis_client, "user", changed_fields)
 
-        for role in UserRole:
-            key = build_key("cache", "get_by_role", role=role)
-            list_cache_keys_to_invalidate.append(key)
+        logger.debug(f"User cache for '{telegram_id}' invalidated (fields: {changed_fields})")
 
-        await self.redis_client.delete(*list_cache_keys_to_invalidate)
+    async def _clear_list_caches(self) -> None:
+        # Создание или удаление пользователя: сбрасываем все зависимые списки
+        await invalidate_cache_dependents(self.redis_client, "user")
         logger.debug("List caches invalidated")
 
     async def _add_to_recent_activity(self, key: StorageKey, telegram_id: int) -> None:
-        await self.redis_repository.list_remove(key, value=telegram_id, count=0)
-        await self.redis_repository.list_push(key, telegram_id)
-        await self.redis_repository.list_trim(key, start=0, end=RECENT_ACTIVITY_MAX_COUNT - 1)
+        # Одна транзакция вместо трёх обращений к Redis
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.lrem(key.pack(), 0, str(telegram_id))
+            pipe.lpush(key.pack(), str(telegram_id))
+            pipe.ltrim(key.pack(), 0, RECENT_ACTIVITY_MAX_COUNT - 1)
+            await pipe.execute()
         logger.debug(f"User '{telegram_id}' activity updated in recent cache")
 
     async def _remove_from_recent_activity(self, telegram_id: int) -> None: